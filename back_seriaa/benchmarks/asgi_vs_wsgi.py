@@ -0,0 +1,81 @@
+# benchmarks/asgi_vs_wsgi.py
+"""
+Throughput of the read endpoints: WSGI (sync viewsets) vs ASGI.
+
+Three paths are compared for every entity:
+  * WSGI  - django.test.Client on /api/<entity>/, N worker threads
+  * ASGI  - AsyncClient on the same sync viewset (sync_to_async hop)
+  * ASGI native - AsyncClient on /api/async/<entity>/
+
+Both clients go through the real WSGIHandler / ASGIHandler in-process,
+so the numbers exclude the network and server-loop overhead.
+
+    python -m benchmarks.asgi_vs_wsgi [requests] [concurrency]
+"""
+import asyncio
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .common import test_database, seed_league, create_api_user, report
+
+from django.test import Client, AsyncClient
+
+
+ENDPOINTS = ['teams', 'match', 'player-technical']
+
+
+def run_wsgi(url, requests, concurrency, user):
+    def worker(count):
+        client = Client()
+        client.force_login(user)
+        for _ in range(count):
+            assert client.get(url).status_code == 200
+
+    per_worker = requests // concurrency
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(worker, [per_worker] * concurrency))
+    return per_worker * concurrency / (time.perf_counter() - started)
+
+
+def run_asgi(url, requests, concurrency, user):
+    async def worker(client, count):
+        for _ in range(count):
+            response = await client.get(url)
+            assert response.status_code == 200
+
+    client = AsyncClient()
+    client.force_login(user)
+
+    async def main():
+        per_worker = requests // concurrency
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(client, per_worker) for _ in range(concurrency)))
+        return per_worker * concurrency / (time.perf_counter() - started)
+
+    return asyncio.run(main())
+
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+
+    with test_database():
+        seed_league(teams=20, players_per_team=25, matches=380)
+        user = create_api_user()
+
+        for endpoint in ENDPOINTS:
+            rows = [
+                ("WSGI  /api/%s/" % endpoint,
+                 run_wsgi(f"/api/{endpoint}/", requests, concurrency, user), "req/s"),
+                ("ASGI  /api/%s/" % endpoint,
+                 run_asgi(f"/api/{endpoint}/", requests, concurrency, user), "req/s"),
+                ("ASGI  /api/async/%s/" % endpoint,
+                 run_asgi(f"/api/async/{endpoint}/", requests, concurrency, user), "req/s"),
+            ]
+            report(f"{endpoint}: {requests} requests, concurrency {concurrency}", rows)
+
+
+if __name__ == '__main__':
+    main()
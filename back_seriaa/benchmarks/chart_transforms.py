@@ -0,0 +1,153 @@
+# benchmarks/chart_transforms.py
+"""
+Chart data preparation on large category counts: the previous pandas /
+list code from dashboard.utils versus the vectorized dashboard.transforms.
+
+No database is involved, the inputs are synthetic columns:
+  * donut angles  - shares + start/end angles for N categories
+  * cumulative    - wins per (year, team) -> cumulative top-5 series
+  * binned pivot  - coaches per (country, experience bin) heatmap
+  * source        - feeding a ColumnDataSource from a DataFrame
+
+    python -m benchmarks.chart_transforms [categories ...]
+"""
+import sys
+
+import numpy as np
+import pandas as pd
+from bokeh.models import ColumnDataSource
+
+from dashboard import transforms
+from .common import measure, report, summary
+
+
+EXP_LEVELS = ['Початківці (1-7 років)', 'Досвідчені (8-15)', 'Ветерани (16+)']
+
+
+def make_frames(categories, seed=42):
+    rnd = np.random.default_rng(seed)
+    countries = pd.DataFrame({
+        'player_country': [f"C{i}" for i in range(categories)],
+        'player_count': rnd.integers(1, 500, categories),
+    })
+    wins = pd.DataFrame({
+        'year': rnd.integers(1994, 2024, categories),
+        'win_team__team_name': [f"Team {i}" for i in rnd.integers(0, categories // 10 + 1, categories)],
+        'win_count': rnd.integers(1, 3, categories),
+    })
+    coaches = pd.DataFrame({
+        'coach_country': [f"C{i}" for i in rnd.integers(0, categories // 5 + 1, categories)],
+        'coach_count': rnd.integers(1, 20, categories),
+        'avg_experience': rnd.uniform(1, 30, categories),
+    })
+    return countries, wins, coaches
+
+
+def donut_before(df):
+    df = df.copy()
+    df['percentage'] = df['player_count'] / df['player_count'].sum() * 100
+    df['angle'] = df['player_count'] / df['player_count'].sum() * 2 * np.pi
+    df['start_angle'] = [0] + list(df['angle'].cumsum()[:-1])
+    df['end_angle'] = df['angle'].cumsum()
+    return df
+
+
+def donut_after(df):
+    return transforms.wedge_angles(df['player_count'])
+
+
+def cumulative_before(df):
+    pivot_df = df.pivot_table(
+        index='year', columns='win_team__team_name', values='win_count', aggfunc='sum'
+    ).fillna(0).cumsum()
+    top_teams = pivot_df.iloc[-1].sort_values(ascending=False).head(5).index
+    return pivot_df[top_teams]
+
+
+def cumulative_after(df):
+    return transforms.cumulative_top(df['year'], df['win_team__team_name'], df['win_count'], top=5)
+
+
+def binned_before(df):
+    df = df.copy()
+    df['exp_level'] = pd.cut(df['avg_experience'], bins=3, labels=EXP_LEVELS)
+    pivot_df = df.pivot_table(
+        index='coach_country', columns='exp_level', values='coach_count',
+        aggfunc='sum', observed=False
+    ).fillna(0)
+    pivot_df['total'] = pivot_df.sum(axis=1)
+    return pivot_df.sort_values('total', ascending=False).drop('total', axis=1)
+
+
+def binned_after(df):
+    countries, _, counts = transforms.crosstab(
+        df['coach_country'],
+        transforms.equal_width_bins(df['avg_experience'], bins=3),
+        df['coach_count'],
+        col_labels=EXP_LEVELS
+    )
+    return transforms.sort_rows_by_total(countries, counts)
+
+
+def source_before(df):
+    return ColumnDataSource(donut_before(df))
+
+
+def source_after(df):
+    share, start_angle, end_angle = transforms.wedge_angles(df['player_count'])
+    return ColumnDataSource(data={
+        'player_country': df['player_country'].to_numpy(),
+        'player_count': df['player_count'].to_numpy(),
+        'percentage': share * 100,
+        'start_angle': start_angle,
+        'end_angle': end_angle,
+    })
+
+
+def check(countries, wins, coaches):
+    """Both versions must produce the same numbers"""
+    before = donut_before(countries)
+    share, start_angle, end_angle = donut_after(countries)
+    assert np.allclose(before['start_angle'], start_angle)
+    assert np.allclose(before['end_angle'], end_angle)
+    assert np.allclose(before['percentage'], share * 100)
+
+    before = binned_before(coaches)
+    countries_after, counts = binned_after(coaches)
+    assert np.allclose(before.sum(axis=1).to_numpy(), counts.sum(axis=1))
+    assert np.allclose(before.to_numpy().sum(axis=0), counts.sum(axis=0))
+
+    before = cumulative_before(wins)
+    years, _, cumulative = cumulative_after(wins)
+    assert np.array_equal(before.index.to_numpy(), years)
+    assert np.allclose(np.sort(before.iloc[-1].to_numpy()), np.sort(cumulative[-1]))
+
+
+CASES = [
+    ('donut angles', donut_before, donut_after, 0),
+    ('cumulative top-5', cumulative_before, cumulative_after, 1),
+    ('binned pivot', binned_before, binned_after, 2),
+    ('ColumnDataSource', source_before, source_after, 0),
+]
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1_000, 100_000, 1_000_000]
+
+    for categories in sizes:
+        frames = make_frames(categories)
+        check(*frames)
+
+        rows = []
+        for title, before, after, frame in CASES:
+            df = frames[frame]
+            before_ms, _ = summary(measure(lambda: before(df)))
+            after_ms, _ = summary(measure(lambda: after(df)))
+            rows.append((f"{title}: pandas/lists", before_ms, "ms"))
+            rows.append((f"{title}: transforms", after_ms, "ms"))
+            rows.append((f"{title}: speed-up", before_ms / after_ms, "x"))
+        report(f"Chart data preparation, {categories:,} categories (median)", rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+# benchmarks/columnar_formats.py
+"""
+/dashboard/api/players/top/ as JSON records vs Arrow IPC stream vs Parquet.
+
+For each format: server time per request (view + rendering), response
+size, and the client-side cost of turning the body back into a DataFrame
+(what an analytics notebook does after requests.get()).
+
+    python -m benchmarks.columnar_formats [players]
+"""
+import io
+import json
+import sys
+
+import pandas as pd
+import pyarrow as pa
+
+from .common import test_database, seed_league, create_api_user, measure, report, summary
+
+from django.test import Client
+
+
+FORMATS = [
+    ('JSON', 'application/json',
+     lambda body: pd.DataFrame(json.loads(body)['data'])),
+    ('Arrow', 'application/vnd.apache.arrow.stream',
+     lambda body: pa.ipc.open_stream(body).read_pandas()),
+    ('Parquet', 'application/vnd.apache.parquet',
+     lambda body: pd.read_parquet(io.BytesIO(body))),
+]
+
+
+def main():
+    players = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    teams = 20
+
+    with test_database():
+        seed_league(teams=teams, players_per_team=players // teams, matches=10, years=5, events=10)
+        client = Client()
+        client.force_login(create_api_user())
+        url = f"/dashboard/api/players/top/?limit={players}"
+
+        frames = {}
+        rows = []
+        for name, media_type, decode in FORMATS:
+            response = client.get(url, HTTP_ACCEPT=media_type)
+            assert response.status_code == 200, response.status_code
+            assert response['Content-Type'].startswith(media_type)
+            body = response.content
+            frames[name] = decode(body)
+
+            server_ms, _ = summary(measure(lambda: client.get(url, HTTP_ACCEPT=media_type), repeat=3))
+            client_ms, _ = summary(measure(lambda: decode(body)))
+            rows.append((f"{name}: server", server_ms, "ms"))
+            rows.append((f"{name}: client decode", client_ms, "ms"))
+            rows.append((f"{name}: size", len(body) / 1024, "KB"))
+
+        for name in ('Arrow', 'Parquet'):
+            pd.testing.assert_frame_equal(frames[name], frames['JSON'], check_dtype=False)
+
+        report(f"Top {players:,} players, median", rows)
+
+
+if __name__ == '__main__':
+    main()
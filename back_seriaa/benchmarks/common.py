@@ -0,0 +1,65 @@
+# benchmarks/common.py
+"""
+Shared helpers for the benchmark scripts.
+
+Run every benchmark from the project directory, e.g.:
+    python -m benchmarks.asgi_vs_wsgi
+
+Benchmarks never touch the real data: they create a throwaway test
+database (test_<NAME>) on the configured backend, seed it and drop it.
+"""
+import os
+import statistics
+import sys
+import time
+from contextlib import contextmanager
+
+import django
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'seriaa.settings')
+django.setup()
+
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+# Re-exported for the benchmark scripts
+from main.testing import seed_league, create_api_user  # noqa: F401
+
+
+@contextmanager
+def test_database():
+    """Create (and afterwards destroy) an empty test database"""
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def measure(fn, repeat=5, number=1):
+    """Run fn() number times per round, return per-call timings in ms"""
+    fn()  # warm-up
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        timings.append((time.perf_counter() - started) * 1000 / number)
+    return timings
+
+
+def report(title, rows):
+    """Print a small aligned table: rows are (label, value, unit)"""
+    print(f"\n{title}")
+    print("-" * len(title))
+    width = max(len(label) for label, _, _ in rows)
+    for label, value, unit in rows:
+        print(f"{label:<{width}}  {value:>12.2f} {unit}")
+
+
+def summary(timings):
+    return statistics.median(timings), min(timings)
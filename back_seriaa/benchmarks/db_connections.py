@@ -0,0 +1,101 @@
+# benchmarks/db_connections.py
+"""
+Per-request database connection cost: CONN_MAX_AGE=0 (a new connection
+for every request, the previous settings) vs persistent connections with
+health checks (seriaa/db_settings.py, WSGI mode).
+
+Requests go through the real WSGIHandler, which closes or keeps the
+connection on request_started/request_finished exactly as gunicorn would
+(django.test.Client disables that, so it is not used for the timed part).
+
+Runs against the configured backend: with SERIAA_DB_ENGINE=mysql and a
+reachable server it measures the real TCP + auth handshake; with
+SERIAA_DB_ENGINE=sqlite (the stand-in) the test database is a temporary
+file, so "connect" is just opening that file.
+
+    python -m benchmarks.db_connections [requests]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from .common import test_database, seed_league, create_api_user, report
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIHandler
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.test import Client, RequestFactory
+
+
+POLICIES = [
+    ("CONN_MAX_AGE=0 (before)", 0, False),
+    ("CONN_MAX_AGE=300 + health checks", 300, True),
+]
+
+
+def session_environ(url):
+    """WSGI environ of an authenticated GET (session cookie, no password hashing)"""
+    client = Client()
+    client.force_login(create_api_user())
+    cookie = f"{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}"
+    return RequestFactory().get(url, HTTP_COOKIE=cookie).environ
+
+
+def run(handler, environ, requests):
+    """Time requests through the WSGI handler; returns (ms/request, connections opened)"""
+    opened = []
+    counter = lambda sender, connection, **kwargs: opened.append(connection.alias)
+    connection_created.connect(counter)
+    try:
+        started = time.perf_counter()
+        for _ in range(requests):
+            statuses = []
+            response = handler(dict(environ), lambda status, headers: statuses.append(status))
+            b"".join(response)
+            response.close()
+            assert statuses[0].startswith('200'), statuses[0]
+        elapsed = time.perf_counter() - started
+    finally:
+        connection_created.disconnect(counter)
+    return elapsed * 1000 / requests, len(opened)
+
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+
+    with tempfile.TemporaryDirectory() as directory:
+        if connection.vendor == 'sqlite':
+            # In-memory SQLite never really closes, use a file instead
+            connection.settings_dict['TEST']['NAME'] = os.path.join(directory, 'bench.sqlite3')
+
+        with test_database():
+            seed_league(teams=20, players_per_team=5, matches=20)
+            environ = session_environ('/api/teams/')
+            handler = WSGIHandler()
+
+            rows = []
+            for label, max_age, health_checks in POLICIES:
+                connection.close()
+                connection.settings_dict['CONN_MAX_AGE'] = max_age
+                connection.settings_dict['CONN_HEALTH_CHECKS'] = health_checks
+                run(handler, environ, 10)  # warm-up
+
+                per_request, opened = run(handler, environ, requests)
+                rows.append((f"{label}: per request", per_request, "ms"))
+                rows.append((f"{label}: connections opened", opened, f"/ {requests} req"))
+
+            connection.close()
+            connection.settings_dict['CONN_MAX_AGE'] = 0
+            started = time.perf_counter()
+            for _ in range(requests):
+                connection.ensure_connection()
+                connection.close()
+            rows.append(("raw connect + close", (time.perf_counter() - started) * 1000 / requests, "ms"))
+
+            report(f"GET /api/teams/ through WSGIHandler, {connection.vendor}", rows)
+
+
+if __name__ == '__main__':
+    main()
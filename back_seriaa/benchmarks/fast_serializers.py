@@ -0,0 +1,67 @@
+# benchmarks/fast_serializers.py
+"""
+10k-row list endpoints: ModelSerializer(many=True).data vs the compiled
+ValuesSerializer (main/fast_serializers.py).
+
+For each endpoint: building the data alone (query + serialization) and
+the full GET through the test client with BaseViewSet.fast_list off and
+on. The rendered bodies of both paths are asserted byte-identical.
+
+    python -m benchmarks.fast_serializers [rows]
+"""
+import sys
+
+from .common import test_database, seed_league, create_api_user, measure, report, summary
+
+from django.test import Client
+
+from main import views
+from main.fast_serializers import ValuesSerializer
+from main.renderers import ORJSONRenderer
+
+
+VIEWSETS = [
+    ('/api/match/', views.MatchViewSet),
+    ('/api/player-technical/', views.PlayerTechnicalViewSet),
+    ('/api/calendar/', views.CalendarViewSet),
+]
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    teams = 20
+
+    with test_database():
+        seed_league(teams=teams, players_per_team=rows // teams, matches=rows, events=rows)
+        client = Client()
+        client.force_login(create_api_user())
+
+        results = []
+        for url, viewset in VIEWSETS:
+            serializer_class = viewset.base_serializer_class
+            queryset = viewset.repository_class().get_all()
+            fast = ValuesSerializer.for_serializer(serializer_class)
+
+            slow_body = ORJSONRenderer().render(serializer_class(queryset, many=True).data)
+            fast_body = ORJSONRenderer().render(fast.serialize(queryset))
+            assert slow_body == fast_body, url
+
+            slow_ms, _ = summary(measure(lambda: serializer_class(queryset.all(), many=True).data, repeat=3))
+            fast_ms, _ = summary(measure(lambda: fast.serialize(queryset.all()), repeat=3))
+            results.append((f"{url} ModelSerializer", slow_ms, "ms"))
+            results.append((f"{url} ValuesSerializer", fast_ms, "ms"))
+            results.append((f"{url} speedup", slow_ms / fast_ms, "x"))
+
+            for fast_list in (False, True):
+                viewset.fast_list = fast_list
+                response = client.get(url)
+                assert response.content == fast_body, url
+                request_ms, _ = summary(measure(lambda: client.get(url), repeat=3))
+                results.append((f"{url} GET, fast_list={fast_list}", request_ms, "ms"))
+            viewset.fast_list = True
+
+        report(f"{rows:,}-row list endpoints, median", results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+# benchmarks/fixtures.py
+"""
+Calendar -> Match: /api/calendar/?expand=matches_on_date with the
+matches of every date loaded in one query vs one query per event, and
+/api/calendar/fixtures/ pages at the start and at the end of a
+multi-season calendar (keyset) vs the same pages by OFFSET.
+
+    python -m benchmarks.fixtures [events] [matches]
+"""
+import sys
+
+from .common import test_database, seed_league, create_api_user, measure, report, summary
+
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from main.models import Calendar
+from main.repositories.calendar_repository import CalendarRepository
+from main.repositories.match_repository import MatchRepository
+from main.serializers import CalendarDetailSerializer, MatchBaseSerializer
+
+
+def per_event(events):
+    """What a get_matches_on_date querying (and serializing) for its own row costs"""
+    repository = MatchRepository()
+    return [MatchBaseSerializer(repository.on_dates([event.event_date]), many=True).data for event in events]
+
+
+def main():
+    events = int(sys.argv[1]) if len(sys.argv) > 1 else 6_000
+    matches = int(sys.argv[2]) if len(sys.argv) > 2 else 60_000
+    page = 100
+
+    with test_database():
+        seed_league(teams=20, players_per_team=5, matches=matches, events=events)
+        client = Client()
+        client.force_login(create_api_user())
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+        calendar_page = list(CalendarRepository().get_all().order_by('event_date')[:page])
+        with CaptureQueriesContext(connection) as batched:
+            CalendarDetailSerializer(calendar_page, many=True).data
+        rows = [
+            (f"{page} events, matches per event", summary(measure(lambda: per_event(calendar_page)))[0], "ms"),
+            (f"{page} events, batched", summary(measure(
+                lambda: CalendarDetailSerializer(calendar_page, many=True).data))[0], "ms"),
+            ("batched: queries", len(batched), ""),
+        ]
+
+        first_date = Calendar.objects.order_by('event_date').values_list('event_date', flat=True)[0]
+        repository = MatchRepository()
+        last = repository.fixtures(first_date).values_list('event__event_date', 'match_id')[matches - page - 1]
+        url = '/api/calendar/fixtures/'
+        start = {'date_from': first_date.isoformat(), 'limit': page}
+        end = {**start, 'after': f"{last[0].isoformat()}:{last[1]}"}
+        assert len(client.get(url, end).json()['results']) == page
+
+        rows += [
+            ("fixtures: first page", summary(measure(lambda: client.get(url, start)))[0], "ms"),
+            ("fixtures: last page (keyset)", summary(measure(lambda: client.get(url, end)))[0], "ms"),
+            ("last page by OFFSET", summary(measure(
+                lambda: list(repository.fixtures(first_date)[matches - page:matches])))[0], "ms"),
+        ]
+        report(f"{events:,} calendar events, {matches:,} matches, median", rows)
+
+
+if __name__ == '__main__':
+    main()
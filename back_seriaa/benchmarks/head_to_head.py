@@ -0,0 +1,69 @@
+# benchmarks/head_to_head.py
+"""
+Head-to-head and last-5 form: pulling /api/match/ and computing them on
+the client (what the frontend did) vs /api/match/head-to-head/ and
+/api/match/form/ (composite indexes + the team_form table).
+
+    python -m benchmarks.head_to_head [matches]
+"""
+import json
+import sys
+
+from .common import test_database, seed_league, create_api_user, measure, report, summary
+
+from django.test import Client
+
+from main.models import TeamForm
+
+
+def client_head_to_head(rows, team_a, team_b):
+    played = [row for row in rows if {row['home_team'], row['away_team']} == {team_a, team_b}]
+    wins = sum(
+        1 for row in played
+        if (row['home_team'] == team_a) == (row['home_team_score'] > row['away_team_score'])
+        and row['home_team_score'] != row['away_team_score']
+    )
+    return len(played), wins
+
+
+def client_form(rows, team):
+    played = sorted(
+        (row for row in rows if team in (row['home_team'], row['away_team'])),
+        key=lambda row: row['match_id'], reverse=True
+    )
+    return played[:TeamForm.FORM_MATCHES]
+
+
+def main():
+    matches = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+    with test_database():
+        seed_league(teams=20, players_per_team=5, matches=matches, events=10)
+        client = Client()
+        client.force_login(create_api_user())
+
+        def pull_all():
+            return json.loads(client.get('/api/match/').content)
+
+        # Fill team_form once (it is kept up to date on Match writes afterwards)
+        assert client.get('/api/match/form/').status_code == 200
+        h2h = client.get('/api/match/head-to-head/', {'team_a': 1, 'team_b': 2}).json()
+        assert h2h['summary']['played'] == client_head_to_head(pull_all(), 1, 2)[0]
+
+        rows = [
+            ("client: GET /api/match/ + head-to-head",
+             summary(measure(lambda: client_head_to_head(pull_all(), 1, 2), repeat=3))[0], "ms"),
+            ("/api/match/head-to-head/",
+             summary(measure(lambda: client.get('/api/match/head-to-head/', {'team_a': 1, 'team_b': 2})))[0], "ms"),
+            ("client: GET /api/match/ + form of one team",
+             summary(measure(lambda: client_form(pull_all(), 1), repeat=3))[0], "ms"),
+            ("/api/match/form/?team=1",
+             summary(measure(lambda: client.get('/api/match/form/', {'team': 1})))[0], "ms"),
+            ("/api/match/form/ (all teams)",
+             summary(measure(lambda: client.get('/api/match/form/')))[0], "ms"),
+        ]
+        report(f"{matches:,} matches, median", rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+# benchmarks/json_renderer.py
+"""
+10k-row list responses (/api/match/, /api/player-technical/) rendered by
+DRF's JSONRenderer vs main.renderers.ORJSONRenderer.
+
+For each endpoint: the rendering step alone (serializer.data -> bytes)
+and the full request through the test client with each renderer. The
+bodies of both renderers are checked to decode to the same data. Also
+times ORJSONParser vs JSONParser on the /api/match/ body.
+
+    python -m benchmarks.json_renderer [rows]
+"""
+import io
+import json
+import sys
+
+from .common import test_database, seed_league, create_api_user, measure, report, summary
+
+from django.test import Client
+from django.test.utils import override_settings
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from main.renderers import ORJSONRenderer, ORJSONParser
+from main.repositories.match_repository import MatchRepository
+from main.repositories.player_technical_repository import PlayerTechnicalRepository
+from main.serializers import MatchBaseSerializer, PlayerTechnicalBaseSerializer
+
+
+ENDPOINTS = [
+    ('/api/match/', MatchRepository, MatchBaseSerializer),
+    ('/api/player-technical/', PlayerTechnicalRepository, PlayerTechnicalBaseSerializer),
+]
+
+RENDERERS = [
+    ('JSONRenderer', 'rest_framework.renderers.JSONRenderer', JSONRenderer),
+    ('ORJSONRenderer', 'main.renderers.ORJSONRenderer', ORJSONRenderer),
+]
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    teams = 20
+
+    with test_database():
+        seed_league(teams=teams, players_per_team=rows // teams, matches=rows, events=10)
+        user = create_api_user()
+
+        results = []
+        for url, repository_class, serializer_class in ENDPOINTS:
+            data = serializer_class(repository_class().get_all(), many=True).data
+            bodies = {}
+            for label, path, renderer_class in RENDERERS:
+                renderer = renderer_class()
+                bodies[label] = renderer.render(data)
+                render_ms, _ = summary(measure(lambda: renderer.render(data)))
+
+                rest_framework = {'DEFAULT_RENDERER_CLASSES': [path]}
+                with override_settings(REST_FRAMEWORK=rest_framework):
+                    client = Client()
+                    client.force_login(user)
+                    response = client.get(url)
+                    assert response.status_code == 200, response.status_code
+                    request_ms, _ = summary(measure(lambda: client.get(url), repeat=3))
+
+                results.append((f"{url} {label}: render", render_ms, "ms"))
+                results.append((f"{url} {label}: request", request_ms, "ms"))
+
+            assert json.loads(bodies['ORJSONRenderer']) == json.loads(bodies['JSONRenderer'])
+
+        body = ORJSONRenderer().render(MatchBaseSerializer(MatchRepository().get_all(), many=True).data)
+        for label, parser in (('JSONParser', JSONParser()), ('ORJSONParser', ORJSONParser())):
+            parse_ms, _ = summary(measure(lambda: parser.parse(io.BytesIO(body))))
+            results.append((f"parse /api/match/ body {label}", parse_ms, "ms"))
+
+        report(f"{rows:,}-row list responses, median", results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+# benchmarks/league_snapshot.py
+"""
+The six dashboard reports: DashboardQueries on the database vs
+SnapshotQueries on a memory-mapped Arrow export of the same data.
+
+Reports the export time and size, then per report the DB time and the
+snapshot time (tables already mapped) and checks both return the same rows.
+
+    python -m benchmarks.league_snapshot [players]
+"""
+import os
+import sys
+import tempfile
+
+import pandas as pd
+
+from .common import test_database, seed_league, measure, report, summary
+
+from dashboard.league_snapshot import SnapshotQueries, export_league_snapshot
+from dashboard.queries import DashboardQueries
+
+
+REPORTS = [
+    ('teams_best_goal_difference', (0,)),
+    ('avg_player_age_by_team', ()),
+    ('team_wins_by_year', ()),
+    ('top_players_by_contributions', (100,)),
+    ('matches_by_month', ()),
+    ('coaches_by_country', ()),
+]
+
+
+def normalized(df):
+    """Tie order is unspecified on both sides: compare sorted rows"""
+    df = df.copy()
+    if 'month' in df:
+        df['month'] = pd.to_datetime(df['month'])
+    return df.sort_values(list(df.columns)).reset_index(drop=True)
+
+
+def main():
+    players = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    teams = 200
+
+    with test_database(), tempfile.TemporaryDirectory() as directory:
+        seed_league(
+            teams=teams, players_per_team=players // teams,
+            matches=20_000, years=100, events=20_000
+        )
+        directory = os.path.join(directory, 'league')
+
+        export_ms, _ = summary(measure(lambda: export_league_snapshot(directory), repeat=1))
+        size = sum(entry.stat().st_size for entry in os.scandir(directory))
+        rows = [("export", export_ms, "ms"), ("export size", size / 1024 / 1024, "MB")]
+
+        open_ms, _ = summary(measure(lambda: SnapshotQueries(directory).team_wins_by_year(), repeat=3))
+        rows.append(("snapshot: open + first report", open_ms, "ms"))
+
+        snapshot = SnapshotQueries(directory)
+        for name, args in REPORTS:
+            db = getattr(DashboardQueries, name)
+            mapped = getattr(snapshot, name)
+            pd.testing.assert_frame_equal(
+                normalized(DashboardQueries.to_dataframe(db(*args))),
+                normalized(snapshot.to_dataframe(mapped(*args))),
+                check_dtype=False
+            )
+            db_ms, _ = summary(measure(lambda: DashboardQueries.to_dataframe(db(*args))))
+            mapped_ms, _ = summary(measure(lambda: snapshot.to_dataframe(mapped(*args))))
+            rows.append((f"{name}: database", db_ms, "ms"))
+            rows.append((f"{name}: snapshot", mapped_ms, "ms"))
+
+        report(f"Dashboard reports, {players:,} players (median)", rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+# benchmarks/list_filters.py
+"""
+Fetching the whole /api/player-technical/ list and filtering on the
+client (what the frontend did) vs server-side filters on indexed columns
+(repositories/filtering.py): time per request and response size.
+
+    python -m benchmarks.list_filters [players]
+"""
+import json
+import sys
+
+from .common import test_database, seed_league, create_api_user, measure, report, summary
+
+from django.test import Client
+
+
+QUERIES = [
+    ("team + position", "?player_team=3&position=FW",
+     lambda row: row['player_team'] == 3 and row['position'] == 'FW'),
+    ("goal range", "?goal_scored__gte=29",
+     lambda row: row['goal_scored'] >= 29),
+    ("name prefix", "?search=Player 7-1",
+     lambda row: row['player_name'].lower().startswith('player 7-1')),
+]
+
+
+def main():
+    players = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    teams = 20
+
+    with test_database():
+        seed_league(teams=teams, players_per_team=players // teams, matches=10, events=10)
+        client = Client()
+        client.force_login(create_api_user())
+        url = '/api/player-technical/'
+
+        def fetch_all_and_filter(predicate):
+            return [row for row in json.loads(client.get(url).content) if predicate(row)]
+
+        rows = []
+        full_size = len(client.get(url).content)
+        full_ms, _ = summary(measure(lambda: client.get(url), repeat=3))
+        rows.append(("full list: request", full_ms, "ms"))
+        rows.append(("full list: size", full_size / 1024, "KB"))
+
+        for label, query, predicate in QUERIES:
+            response = client.get(url + query)
+            assert response.status_code == 200, response.content
+            server_rows = json.loads(response.content)
+            assert sorted(r['player_id'] for r in server_rows) == \
+                sorted(r['player_id'] for r in fetch_all_and_filter(predicate)), label
+
+            client_ms, _ = summary(measure(lambda: fetch_all_and_filter(predicate), repeat=3))
+            server_ms, _ = summary(measure(lambda: client.get(url + query), repeat=3))
+            rows.append((f"{label}: full list + client filter", client_ms, "ms"))
+            rows.append((f"{label}: server filter ({len(server_rows)} rows)", server_ms, "ms"))
+            rows.append((f"{label}: server filter size", len(response.content) / 1024, "KB"))
+
+        report(f"{players:,} players, median", rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+# benchmarks/live_stream.py
+"""
+What N viewers of live scores cost: polling GET /api/match/ once per
+interval each, vs one /api/async/stream/ subscriber each, where a score
+update is recorded once (a LiveEvent row), read once by the process's
+poller and fanned out to every subscriber's queue (main.live.broker).
+
+    python -m benchmarks.live_stream [viewers] [matches]
+"""
+import asyncio
+import sys
+import threading
+import time
+
+from .common import test_database, seed_league, create_api_user, measure, report, summary
+
+from django.test import Client
+
+from main import live
+
+
+def fan_out(viewers, updates=100):
+    """ms from publish() until every subscriber got the event"""
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+
+    subscribers = [live.broker.subscribe({'match'}, loop)[0] for _ in range(viewers)]
+
+    async def drain():
+        for subscriber in subscribers:
+            await subscriber.queue.get()
+
+    timings = []
+    for n in range(updates):
+        started = time.perf_counter()
+        live.publish('match', 'updated', {"id": n, "values": {"home_team_score": n}, "delta": {}})
+        asyncio.run_coroutine_threadsafe(drain(), loop).result()
+        timings.append((time.perf_counter() - started) * 1000)
+
+    for subscriber in subscribers:
+        live.broker.unsubscribe(subscriber)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
+    return summary(timings)[0]
+
+
+def main():
+    viewers = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    matches = int(sys.argv[2]) if len(sys.argv) > 2 else 380
+
+    with test_database():
+        seed_league(teams=20, players_per_team=5, matches=matches, events=50)
+        client = Client()
+        client.force_login(create_api_user())
+
+        poll_ms = summary(measure(lambda: client.get('/api/match/'), repeat=10))[0]
+        rows = [
+            ("one poll of /api/match/", poll_ms, "ms"),
+            (f"{viewers} viewers polling, per interval", poll_ms * viewers, "ms"),
+        ]
+        for count in (1, viewers // 10, viewers):
+            rows.append((f"publish + deliver to {count} subscribers", fan_out(count), "ms"))
+        report(f"{viewers} viewers, {matches} matches, median", rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+# benchmarks/repository_cache.py
+"""
+TeamRepository.get_by_id with and without the repository cache
+(main/repositories/cache.py), for each local cache backend.
+
+The workload mimics retrieve traffic: lookups of random team ids, 5% of
+them for ids that don't exist (negative cache), with one update through
+the repository every 100 lookups (invalidation). Reported per backend:
+time per lookup, database queries per lookup and the hit ratio.
+
+    python -m benchmarks.repository_cache [lookups]
+"""
+import random
+import sys
+import tempfile
+import time
+
+from .common import test_database, seed_league, report
+
+from django.core.cache import caches
+from django.db import connection
+from django.test.utils import override_settings
+
+from main.repositories.cache import cache_stats, reset_cache_stats
+from main.repositories.team_repository import TeamRepository
+
+
+def workload(team_ids, lookups, seed=7):
+    rnd = random.Random(seed)
+    missing = max(team_ids) + 1
+    return [
+        missing + rnd.randint(0, 10) if rnd.random() < 0.05 else rnd.choice(team_ids)
+        for _ in range(lookups)
+    ]
+
+
+def run(repo, pks):
+    """Returns (ms per lookup, queries per lookup)"""
+    queries = []
+
+    def count(execute, sql, params, many, context):
+        queries.append(sql)
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(count):
+        started = time.perf_counter()
+        for i, pk in enumerate(pks):
+            repo.get_by_id(pk)
+            if i % 100 == 99:
+                repo.update(pks[0], points=i)
+        elapsed = time.perf_counter() - started
+    return elapsed * 1000 / len(pks), len(queries) / len(pks)
+
+
+def main():
+    lookups = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+    with test_database(), tempfile.TemporaryDirectory() as directory:
+        seed_league(teams=200, players_per_team=1, matches=10)
+        team_ids = list(TeamRepository().get_all().values_list('team_id', flat=True))
+        pks = workload(team_ids, lookups)
+
+        backends = [
+            ("no cache", None),
+            ("locmem", {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}),
+            ("file", {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': directory}),
+        ]
+
+        rows = []
+        for label, backend in backends:
+            caches_setting = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+            if backend:
+                caches_setting['bench'] = backend
+            # Single process: locmem is allowed
+            with override_settings(CACHES=caches_setting, REPOSITORY_CACHE_ALIAS='bench', REPOSITORY_CACHE_LOCAL=True):
+                reset_cache_stats()
+                per_lookup, queries = run(TeamRepository(), pks)
+                if backend:
+                    caches['bench'].clear()
+
+            rows.append((f"{label}: per lookup", per_lookup * 1000, "us"))
+            rows.append((f"{label}: queries per lookup", queries, ""))
+            if backend:
+                rows.append((f"{label}: hit ratio", cache_stats()['main.Team']['hit_ratio'] * 100, "%"))
+
+        report(f"TeamRepository.get_by_id, {lookups:,} lookups over {len(team_ids)} teams", rows)
+
+
+if __name__ == '__main__':
+    main()
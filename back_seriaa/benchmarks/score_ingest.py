@@ -0,0 +1,99 @@
+# benchmarks/score_ingest.py
+"""
+Live score updates per second: PUT /api/match/<id>/ per update (the
+feed's current path) vs POST /api/match/scores/ batches, and batches
+from concurrent threads group-committed by main.score_ingest.writer.
+
+    python -m benchmarks.score_ingest [matches] [batch]
+"""
+import itertools
+import sys
+import threading
+import time
+
+from .common import test_database, seed_league, create_api_user, report
+
+from django.db import connections
+from django.test import Client
+
+from main import score_ingest
+from main.models import Match
+
+
+def events(keys, match_ids, size):
+    """size score events with new keys (and increasing seq) for random-ish matches"""
+    return [
+        {
+            'key': f"bench-{key}", 'seq': key + 1, 'match_id': match_ids[n % len(match_ids)],
+            'home_team_score': n % 5, 'away_team_score': n % 3,
+        }
+        for n, key in zip(range(size), keys)
+    ]
+
+
+def per_second(count, fn):
+    started = time.perf_counter()
+    fn()
+    return count / (time.perf_counter() - started)
+
+
+def main():
+    matches = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    batch = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    with test_database():
+        seed_league(teams=20, players_per_team=5, matches=matches, events=10)
+        client = Client()
+        client.force_login(create_api_user())
+        match_ids = list(Match.objects.values_list('pk', flat=True))
+        rows = list(Match.objects.values('match_id', 'home_team', 'away_team')[:500])
+        keys = itertools.count()
+
+        def put_each():
+            for n, row in enumerate(rows):
+                response = client.put(
+                    f"/api/match/{row['match_id']}/",
+                    {**row, 'home_team_score': n % 5, 'away_team_score': n % 3},
+                    content_type='application/json'
+                )
+                assert response.status_code == 200, response.content
+
+        batches = [events(keys, match_ids, batch) for _ in range(20)]
+
+        def post_batches():
+            for payload in batches:
+                response = client.post('/api/match/scores/', {'events': payload}, content_type='application/json')
+                assert response.status_code == 200, response.content
+
+        threads, per_thread = 8, 10
+        thread_batches = [[events(keys, match_ids, batch) for _ in range(per_thread)] for _ in range(threads)]
+
+        def concurrent():
+            def run(payloads):
+                for payload in payloads:
+                    score_ingest.ingest({'events': payload})
+                connections.close_all()
+
+            workers = [threading.Thread(target=run, args=(payloads,)) for payloads in thread_batches]
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+
+        single = per_second(len(rows), put_each)
+        batched = per_second(20 * batch, post_batches)
+        replay = per_second(20 * batch, post_batches)
+        score_ingest.writer.flushes = score_ingest.writer.requests = 0
+        parallel = per_second(threads * per_thread * batch, concurrent)
+
+        report(f"Score updates, {matches:,} matches, batches of {batch}", [
+            ("PUT /api/match/<id>/", single, "updates/s"),
+            ("POST /api/match/scores/", batched, "updates/s"),
+            ("replayed batches (all duplicates)", replay, "events/s"),
+            (f"{threads} threads, group commit", parallel, "updates/s"),
+            ("  requests per transaction", score_ingest.writer.requests / score_ingest.writer.flushes, ""),
+        ])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+# benchmarks/search_index.py
+"""
+main.search index on synthetic names: build time, memory and query
+latency on 1M names (in memory, no database), then /api/search/ vs a
+player_name__icontains query on a seeded database.
+
+    python -m benchmarks.search_index [names] [players]
+"""
+import random
+import sys
+import time
+
+from .common import test_database, seed_league, create_api_user, measure, report, summary
+
+from django.test import Client
+
+from main import search
+from main.models import PlayerTechnical
+
+
+SYLLABLES = ['al', 'be', 'ca', 'del', 'es', 'fi', 'gio', 'lo', 'ma', 'ne', 'pie', 'ro', 'san', 'to', 'vi', 'zo']
+
+QUERIES = [
+    ("exact name", None),
+    ("name prefix", 4),
+    ("word prefixes", 'words'),
+    ("typo (trigrams)", 'typo'),
+]
+
+
+def synthetic_names(count, seed=42):
+    rng = random.Random(seed)
+
+    def word():
+        return ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize()
+
+    return [f"{word()} {word()}" for _ in range(count)]
+
+
+def index_bytes(index):
+    return sum(value.nbytes for value in vars(index).values() if hasattr(value, 'nbytes'))
+
+
+def sample_query(name, kind):
+    if kind is None:
+        return name
+    if kind == 'words':
+        first, last = name.split()
+        return f"{first[:3]} {last[:3]}"
+    if kind == 'typo':
+        return name[:-2] + name[-1] + name[-2]
+    return name[:kind]
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    players = int(sys.argv[2]) if len(sys.argv) > 2 else 100_000
+
+    names = synthetic_names(count)
+    started = time.perf_counter()
+    index = search.SearchIndex([1] * count, range(1, count + 1), [search.normalize(name) for name in names])
+    build_s = time.perf_counter() - started
+
+    rows = [
+        ("build", build_s, "s"),
+        ("index memory", index_bytes(index) / 2 ** 20, "MB"),
+    ]
+    sample = random.Random(7).sample(names, 20)
+    for label, kind in QUERIES:
+        queries = [sample_query(name, kind) for name in sample]
+        assert all(index.search(query) for query in queries), label
+        timings = measure(lambda: [index.search(query) for query in queries])
+        rows.append((f"query: {label}", summary(timings)[0] / len(queries), "ms"))
+    report(f"SearchIndex, {count:,} names, median per query", rows)
+
+    with test_database():
+        seed_league(teams=20, players_per_team=players // 20, matches=10, events=10)
+        client = Client()
+        client.force_login(create_api_user())
+        query = PlayerTechnical.objects.order_by('pk').values_list('player_name', flat=True)[players // 2]
+        fragment = query[:-1]
+
+        def icontains():
+            return list(
+                PlayerTechnical.objects.filter(player_name__icontains=fragment)
+                .values_list('pk', 'player_name')[:10]
+            )
+
+        # A server builds it in the background on the first search
+        search.rebuild(search.current_version())
+        response = client.get('/api/search/', {'q': fragment})
+        assert response.status_code == 200 and response.json()['results'], response.content
+        rows = [
+            ("player_name__icontains, 10 rows", summary(measure(icontains))[0], "ms"),
+            ("/api/search/ (index built)", summary(measure(lambda: client.get('/api/search/', {'q': fragment})))[0], "ms"),
+            ("search.search() alone", summary(measure(lambda: search.search(fragment)))[0], "ms"),
+        ]
+        report(f"{players:,} players, q={fragment!r}, median", rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+# benchmarks/startup.py
+"""
+Worker startup cost: import time and peak RSS of loading the URLconf.
+
+Each scenario runs in a fresh interpreter:
+  * urls           - django.setup() + seriaa.urls (what a worker loads
+                     before serving /api/teams/)
+  * urls + charts  - the same plus dashboard.utils, i.e. what every
+                     worker paid when pandas/plotly/bokeh were imported
+                     eagerly by dashboard.views
+
+    python -m benchmarks.startup [rounds]
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from .common import report
+
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import json, os, resource, sys, time
+sys.path.insert(0, {project_dir!r})
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'seriaa.settings')
+started = time.perf_counter()
+import django
+django.setup()
+import seriaa.urls
+for module in {extra!r}:
+    __import__(module)
+elapsed = time.perf_counter() - started
+heavy = sorted(m for m in ('pandas', 'numpy', 'plotly', 'bokeh') if m in sys.modules)
+print(json.dumps({{
+    'ms': elapsed * 1000,
+    'rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    'heavy': heavy,
+}}))
+"""
+
+SCENARIOS = [
+    ('urls', []),
+    ('urls + charts', ['dashboard.utils']),
+]
+
+
+def probe(extra):
+    code = PROBE.format(project_dir=PROJECT_DIR, extra=extra)
+    output = subprocess.run(
+        [sys.executable, '-c', code],
+        check=True, capture_output=True, text=True, env=os.environ.copy()
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    results = {}
+    for name, extra in SCENARIOS:
+        samples = [probe(extra) for _ in range(rounds)]
+        results[name] = {
+            'ms': statistics.median(s['ms'] for s in samples),
+            'rss_mb': statistics.median(s['rss_mb'] for s in samples),
+            'heavy': samples[-1]['heavy'],
+        }
+
+    rows = []
+    for name, _ in SCENARIOS:
+        rows.append((f"{name}: import time", results[name]['ms'], "ms"))
+        rows.append((f"{name}: peak RSS", results[name]['rss_mb'], "MB"))
+    rows.append(("saved: import time", results['urls + charts']['ms'] - results['urls']['ms'], "ms"))
+    rows.append(("saved: peak RSS", results['urls + charts']['rss_mb'] - results['urls']['rss_mb'], "MB"))
+    report(f"Worker startup, median of {rounds} fresh interpreters", rows)
+
+    print("\nheavy modules loaded by 'urls':", results['urls']['heavy'] or "none")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+# benchmarks/stat_counters.py
+"""
+Goal increments from concurrent threads on a few players:
+read-modify-write through PlayerTechnicalRepository.update() (the
+current path) vs main.stat_counters.buffer (logged, then flushed as
+F() deltas). Reports throughput and how many increments were lost.
+
+    python -m benchmarks.stat_counters [threads] [increments per thread]
+"""
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+from .common import test_database, seed_league, report
+
+from django.conf import settings
+from django.db import DatabaseError, connections
+
+from main import stat_counters
+from main.models import PlayerTechnical
+from main.repositories.player_technical_repository import PlayerTechnicalRepository
+
+
+HOT_PLAYERS = 5
+
+
+def run_threads(threads, per_thread, fn):
+    """Seconds for threads x per_thread calls of fn(n)"""
+    def run():
+        for n in range(per_thread):
+            fn(n)
+        connections.close_all()
+
+    workers = [threading.Thread(target=run) for _ in range(threads)]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return time.perf_counter() - started
+
+
+def main():
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    per_thread = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    total = threads * per_thread
+
+    log_dir = tempfile.mkdtemp(prefix='stat_counters_')
+    settings.STAT_COUNTERS_LOG_DIR = log_dir
+    try:
+        with test_database():
+            seed_league(teams=2, players_per_team=HOT_PLAYERS, matches=10, events=10)
+            pks = list(PlayerTechnical.objects.order_by('pk').values_list('pk', flat=True)[:HOT_PLAYERS])
+
+            def goals():
+                return sum(PlayerTechnical.objects.filter(pk__in=pks).values_list('goal_scored', flat=True))
+
+            repository = PlayerTechnicalRepository()
+            # SQLite answers concurrent writers with "table is locked"
+            failed = []
+
+            def read_modify_write(n):
+                try:
+                    player = repository.get_by_id(pks[n % len(pks)])
+                    repository.update(player.pk, goal_scored=player.goal_scored + 1)
+                except DatabaseError:
+                    failed.append(n)
+
+            before = goals()
+            rmw_s = run_threads(threads, per_thread, read_modify_write)
+            rmw_lost = total - len(failed) - (goals() - before)
+
+            def write_behind(n):
+                stat_counters.buffer.increment(pks[n % len(pks)], 1, 0)
+
+            before = goals()
+            buffered_s = run_threads(threads, per_thread, write_behind)
+            started = time.perf_counter()
+            stat_counters.buffer.flush()
+            flush_ms = (time.perf_counter() - started) * 1000
+            buffered_lost = total - (goals() - before)
+
+            report(f"{threads} threads x {per_thread} goal increments on {HOT_PLAYERS} players", [
+                ("repository.update() (read-modify-write)", total / rmw_s, "increments/s"),
+                ("  failed with a database error", len(failed), ""),
+                ("  lost (saved over by another thread)", rmw_lost, ""),
+                ("stat_counters (fsync'ed log)", total / buffered_s, "increments/s"),
+                ("  flush of all of them", flush_ms, "ms"),
+                ("  lost increments", buffered_lost, ""),
+            ])
+    finally:
+        shutil.rmtree(log_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+# benchmarks/upcoming_events.py
+"""
+Next 5 events of every stadium (StadiumDetailSerializer.upcoming_matches
+on /api/stadium/?expand=upcoming_matches): one Calendar query per
+stadium vs the ROW_NUMBER() query over calendar_stadium_date_idx.
+
+    python -m benchmarks.upcoming_events [stadiums] [events]
+"""
+import sys
+
+from .common import test_database, seed_league, create_api_user, measure, report, summary
+
+from django.db import connection
+from django.test import Client
+from django.utils import timezone
+
+from main.models import Calendar
+from main.repositories.stadium_repository import StadiumRepository
+from main.serializers import CalendarBaseSerializer, StadiumDetailSerializer, upcoming_events
+
+
+def per_stadium(stadiums):
+    """The previous get_upcoming_matches, run for every stadium"""
+    return {
+        stadium.stadium_id: CalendarBaseSerializer(
+            Calendar.objects.filter(event_stadium=stadium, event_date__gte=timezone.localdate())
+            .order_by('event_date', 'event_id')[:StadiumDetailSerializer.UPCOMING_EVENTS],
+            many=True
+        ).data
+        for stadium in stadiums
+    }
+
+
+def count_queries(fn):
+    queries = []
+
+    def count(execute, sql, params, many, context):
+        queries.append(sql)
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(count):
+        fn()
+    return len(queries)
+
+
+def main():
+    stadiums = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    events = int(sys.argv[2]) if len(sys.argv) > 2 else 50_000
+
+    with test_database():
+        seed_league(teams=stadiums, players_per_team=1, matches=10, events=events)
+        client = Client()
+        client.force_login(create_api_user())
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+        rows = list(StadiumRepository().get_all())
+        ids = [stadium.stadium_id for stadium in rows]
+        assert per_stadium(rows) == {
+            stadium_id: upcoming_events(ids, StadiumDetailSerializer.UPCOMING_EVENTS).get(stadium_id, [])
+            for stadium_id in ids
+        }
+        url = '/api/stadium/'
+        queries = count_queries(lambda: client.get(url, {'expand': 'upcoming_matches'}))
+        report(f"{stadiums:,} stadiums, {events:,} calendar events, median", [
+            ("query per stadium", summary(measure(lambda: per_stadium(rows)))[0], "ms"),
+            ("window query", summary(measure(
+                lambda: upcoming_events(ids, StadiumDetailSerializer.UPCOMING_EVENTS)))[0], "ms"),
+            (f"GET {url}?expand=upcoming_matches", summary(measure(
+                lambda: client.get(url, {'expand': 'upcoming_matches'})))[0], "ms"),
+            ("  queries", queries, ""),
+        ])
+
+
+if __name__ == '__main__':
+    main()
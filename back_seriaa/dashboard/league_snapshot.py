@@ -0,0 +1,265 @@
+# dashboard/league_snapshot.py
+"""
+Знімок даних ліги на диску для офлайн-аналітики.
+
+`manage.py export_league_snapshot` вивантажує 8 таблиць main.models у
+файли Arrow IPC (Feather v2, без стиснення) - по одному на таблицю, з
+колонками під іменами з БД - плюс manifest.json з кількістю рядків і
+версією даних. Усі таблиці читаються в одній транзакції (REPEATABLE
+READ у MySQL і PostgreSQL), тож запис посеред вивантаження не робить
+знімок неузгодженим між таблицями.
+
+SnapshotQueries відповідає на ті самі 6 звітів, що й DashboardQueries,
+але читає файли через memory map: буфери колонок беруться прямо зі
+сторінок файлу без копіювання, а агрегації рахує Arrow (group_by /
+join), тож пакетні задачі не навантажують MySQL.
+
+    from dashboard.league_snapshot import SnapshotQueries
+    queries = SnapshotQueries()
+    df = queries.to_dataframe(queries.team_wins_by_year())
+
+Потрібен pyarrow.
+"""
+import json
+import os
+import shutil
+from datetime import datetime, timezone
+
+import pyarrow as pa
+import pyarrow.compute as pc
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, models, router, transaction
+
+from main.models import Team, Coach, Calendar, History, PlayerTechnical, PlayerDetailed
+
+from .signals import LEAGUE_MODELS
+
+
+MANIFEST = 'manifest.json'
+
+# Тип колонки Arrow для внутрішнього типу поля Django
+ARROW_TYPES = {
+    'AutoField': pa.int64(),
+    'BigAutoField': pa.int64(),
+    'IntegerField': pa.int64(),
+    'BigIntegerField': pa.int64(),
+    'SmallIntegerField': pa.int64(),
+    'PositiveIntegerField': pa.int64(),
+    'FloatField': pa.float64(),
+    'BooleanField': pa.bool_(),
+    'CharField': pa.string(),
+    'TextField': pa.string(),
+    'DateField': pa.date32(),
+    'DateTimeField': pa.timestamp('us', tz='UTC'),
+}
+
+
+def snapshot_dir(directory=None):
+    return str(directory or getattr(settings, 'LEAGUE_SNAPSHOT_DIR', settings.BASE_DIR / 'league_snapshot'))
+
+
+def arrow_type(field):
+    if isinstance(field, models.ForeignKey):
+        return arrow_type(field.target_field)
+    return ARROW_TYPES[field.get_internal_type()]
+
+
+def table_schema(model):
+    fields = model._meta.concrete_fields
+    schema = pa.schema([pa.field(field.column, arrow_type(field), nullable=field.null) for field in fields])
+    return [field.attname for field in fields], schema
+
+
+def record_batch(rows, schema):
+    """Рядки values_list -> RecordBatch (транспонування в колонки)"""
+    columns = list(zip(*rows)) or [[] for _ in schema]
+    return pa.RecordBatch.from_arrays(
+        [pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+        schema=schema
+    )
+
+
+def export_table(model, path, chunk_size=10000, using=None):
+    """Пише таблицю частинами по chunk_size рядків; повертає кількість рядків"""
+    attnames, schema = table_schema(model)
+    rows = model.objects.using(using).order_by('pk').values_list(*attnames).iterator(chunk_size=chunk_size)
+
+    total = 0
+    with pa.OSFile(path, 'wb') as sink, pa.ipc.new_file(sink, schema) as writer:
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) == chunk_size:
+                writer.write_batch(record_batch(chunk, schema))
+                total += len(chunk)
+                chunk = []
+        # Порожня таблиця теж отримує один (порожній) батч
+        if chunk or not total:
+            writer.write_batch(record_batch(chunk, schema))
+            total += len(chunk)
+    return total
+
+
+def export_league_snapshot(directory=None, chunk_size=10000):
+    """
+    Вивантажує всі таблиці у тимчасовий каталог і підміняє ним попередній
+    знімок. Процеси, які вже відкрили старі файли, дочитують їх без змін
+    """
+    from .precompute import current_data_version
+
+    directory = snapshot_dir(directory)
+    staging = f"{directory}.tmp"
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+
+    using = router.db_for_read(Team) or DEFAULT_DB_ALIAS
+    tables = {}
+    # Один знімок БД на всі таблиці і версію даних
+    with transaction.atomic(using=using):
+        if connections[using].vendor in ('mysql', 'postgresql'):
+            # Перша інструкція транзакції: діє, навіть якщо в OPTIONS інший рівень
+            with connections[using].cursor() as cursor:
+                cursor.execute('SET TRANSACTION ISOLATION LEVEL REPEATABLE READ')
+        data_version = current_data_version()
+        for model in LEAGUE_MODELS:
+            table = model._meta.db_table
+            tables[table] = export_table(model, os.path.join(staging, f"{table}.arrow"), chunk_size, using)
+
+    manifest = {
+        'data_version': data_version,
+        'exported_at': datetime.now(timezone.utc).isoformat(),
+        'tables': tables,
+    }
+    with open(os.path.join(staging, MANIFEST), 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    previous = f"{directory}.old"
+    shutil.rmtree(previous, ignore_errors=True)
+    if os.path.exists(directory):
+        os.replace(directory, previous)
+    os.replace(staging, directory)
+    shutil.rmtree(previous, ignore_errors=True)
+    return manifest
+
+
+class SnapshotQueries:
+    """
+    Ті самі звіти, що й DashboardQueries, зі знімка на диску.
+
+    Методи повертають pyarrow.Table з такими ж колонками, як values()
+    відповідного QuerySet; to_dataframe / to_payload працюють так само.
+    """
+
+    def __init__(self, directory=None):
+        self.directory = snapshot_dir(directory)
+        with open(os.path.join(self.directory, MANIFEST)) as f:
+            self.manifest = json.load(f)
+        self._tables = {}
+
+    def table(self, model):
+        """Таблиця моделі, відображена в пам'ять (відкривається один раз)"""
+        name = model._meta.db_table
+        if name not in self._tables:
+            source = pa.memory_map(os.path.join(self.directory, f"{name}.arrow"))
+            self._tables[name] = pa.ipc.open_file(source).read_all()
+        return self._tables[name]
+
+    def team_names(self, key):
+        """Назви команд для приєднання за колонкою key"""
+        return self.table(Team).select(['team_id', 'team_name']).rename_columns([key, 'team_name'])
+
+    # 1. Команди з найкращою різницею голів
+    def teams_best_goal_difference(self, min_points=50):
+        teams = self.table(Team)
+        mask = pc.greater(teams['goal_difference'], 20)
+        if min_points is not None:
+            mask = pc.and_(mask, pc.greater_equal(teams['points'], min_points))
+        return teams.filter(mask).sort_by([
+            ('goal_difference', 'descending'), ('team_id', 'ascending')
+        ]).select(['team_id', 'team_name', 'points', 'wins', 'draws', 'goal_difference'])
+
+    # 2. Середній вік гравців по командах
+    def avg_player_age_by_team(self):
+        players = self.table(PlayerTechnical).select(['player_id', 'player_team_id'])
+        players = players.filter(pc.is_valid(players['player_team_id']))
+        details = self.table(PlayerDetailed).select(['player_detailed_id', 'player_age'])
+        details = details.filter(pc.is_valid(details['player_age']))
+
+        joined = players.join(
+            details, 'player_id', 'player_detailed_id', join_type='inner'
+        ).join(self.team_names('player_team_id'), 'player_team_id', join_type='inner')
+
+        result = joined.group_by('team_name').aggregate([
+            ('player_age', 'mean'), ('player_id', 'count')
+        ])
+        return result.rename_columns({
+            'team_name': 'player_team__team_name',
+            'player_age_mean': 'avg_age',
+            'player_id_count': 'player_count',
+        }).select(['player_team__team_name', 'avg_age', 'player_count']).sort_by([('avg_age', 'descending')])
+
+    # 3. Кількість перемог команд по роках
+    def team_wins_by_year(self):
+        history = self.table(History)
+        history = history.filter(pc.is_valid(history['win_team_id']))
+        joined = history.join(self.team_names('win_team_id'), 'win_team_id', join_type='inner')
+
+        result = joined.group_by(['year', 'team_name']).aggregate([('win_team_id', 'count')])
+        return result.rename_columns({
+            'team_name': 'win_team__team_name', 'win_team_id_count': 'win_count'
+        }).select(['year', 'win_team__team_name', 'win_count']).sort_by([
+            ('year', 'descending'), ('win_count', 'descending')
+        ])
+
+    # 4. Топ гравців за гол+асисти
+    def top_players_by_contributions(self, limit=10):
+        players = self.table(PlayerTechnical)
+        players = players.append_column(
+            'total_contributions', pc.add(players['goal_scored'], players['assist_scored'])
+        )
+        order = [('total_contributions', 'descending'), ('player_id', 'ascending')]
+        # Порядок після join не гарантований, тому сортуємо ще раз
+        top = pc.take(players, pc.select_k_unstable(players, limit, order)).join(
+            self.team_names('player_team_id'), 'player_team_id', join_type='left outer'
+        ).sort_by(order)
+        return top.rename_columns({'team_name': 'player_team__team_name'}).select([
+            'player_name', 'player_team__team_name',
+            'goal_scored', 'assist_scored', 'total_contributions'
+        ])
+
+    # 5. Розподіл матчів по місяцях
+    def matches_by_month(self):
+        calendar = self.table(Calendar)
+        months = pc.floor_temporal(calendar['event_date'], unit='month')
+        result = pa.table({'month': months, 'event_id': calendar['event_id']}).group_by('month').aggregate([
+            ('event_id', 'count')
+        ])
+        return result.rename_columns({'event_id_count': 'match_count'}).select(
+            ['month', 'match_count']
+        ).sort_by('month')
+
+    # 6. Статистика тренерів по країнах
+    def coaches_by_country(self):
+        coaches = self.table(Coach)
+        coaches = coaches.filter(pc.is_valid(coaches['coach_country']))
+        result = coaches.group_by('coach_country').aggregate([
+            ('coach_id', 'count'), ('experience', 'mean'), ('experience', 'max')
+        ])
+        return result.rename_columns({
+            'coach_id_count': 'coach_count',
+            'experience_mean': 'avg_experience',
+            'experience_max': 'max_experience',
+        }).select(['coach_country', 'coach_count', 'avg_experience', 'max_experience']).sort_by([
+            ('coach_count', 'descending')
+        ])
+
+    @staticmethod
+    def to_dataframe(table):
+        """Результат звіту -> pandas DataFrame (як DashboardQueries.to_dataframe)"""
+        return table.to_pandas()
+
+    @staticmethod
+    def to_payload(table):
+        """Дані + статистика у форматі відповіді /dashboard/api/*"""
+        from .queries import DashboardQueries
+        return DashboardQueries.frame_payload(table.to_pandas())
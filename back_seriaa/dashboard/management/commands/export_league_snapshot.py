@@ -0,0 +1,31 @@
+# dashboard/management/commands/export_league_snapshot.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from dashboard.league_snapshot import export_league_snapshot, snapshot_dir
+
+
+class Command(BaseCommand):
+    help = "Вивантажує таблиці ліги у файли Arrow для офлайн-аналітики (SnapshotQueries)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output',
+            help="Каталог знімка (за замовчуванням settings.LEAGUE_SNAPSHOT_DIR)"
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=10000,
+            help="Скільки рядків читати з БД за раз"
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        manifest = export_league_snapshot(options['output'], options['chunk_size'])
+
+        for table, rows in manifest['tables'].items():
+            self.stdout.write(f"{table}: {rows} рядків")
+        self.stdout.write(self.style.SUCCESS(
+            f"Знімок {snapshot_dir(options['output'])} (версія {manifest['data_version'][:12]}) "
+            f"за {time.perf_counter() - started:.2f} с"
+        ))
@@ -0,0 +1,44 @@
+# dashboard/management/commands/precompute_charts.py
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from dashboard.precompute import current_data_version, rebuild_snapshots, snapshots_version
+
+
+class Command(BaseCommand):
+    help = "Фоновий воркер: перебудовує графіки дашбордів при зміні даних ліги"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=float, default=5.0,
+            help="Як часто (сек) перевіряти версію даних"
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help="Перебудувати один раз (якщо потрібно) і вийти"
+        )
+        parser.add_argument(
+            '--force', action='store_true',
+            help="Перебудувати навіть якщо версія даних не змінилась"
+        )
+
+    def handle(self, *args, **options):
+        built_version = None if options['force'] else snapshots_version()
+
+        while True:
+            close_old_connections()
+            version = current_data_version()
+
+            if version != built_version:
+                started = time.perf_counter()
+                built_version = rebuild_snapshots(version)
+                self.stdout.write(self.style.SUCCESS(
+                    f"Знімки перебудовано (версія {version[:12]}) "
+                    f"за {time.perf_counter() - started:.2f} с"
+                ))
+
+            if options['once']:
+                break
+            time.sleep(options['interval'])
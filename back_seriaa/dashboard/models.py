@@ -1,3 +1,27 @@
 from django.db import models
 
 
+class DataVersion(models.Model):
+    """Лічильник змін даних ліги (збільшується сигналами при записі)"""
+    name = models.CharField(max_length=50, primary_key=True)
+    version = models.BigIntegerField(default=0)
+
+    class Meta:
+        db_table = 'dashboard_data_version'
+
+    def __str__(self):
+        return f"{self.name}: {self.version}"
+
+
+class ChartSnapshot(models.Model):
+    """Попередньо зібраний графік або API-відповідь дашборду"""
+    name = models.CharField(max_length=100, primary_key=True)
+    payload = models.TextField()
+    data_version = models.CharField(max_length=64)
+    built_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'dashboard_chart_snapshot'
+
+    def __str__(self):
+        return f"{self.name} ({self.data_version})"
@@ -0,0 +1,194 @@
+# dashboard/precompute.py
+"""
+Попередня збірка дашбордів.
+
+Воркер `manage.py precompute_charts` стежить за версією даних ліги і,
+коли вона змінюється, перебудовує всі 12 графіків, їх JSON-специфікації
+та відповіді /dashboard/api/* і атомарно підміняє їх у ChartSnapshot. В'юшки
+віддають готові знімки, а живу збірку роблять лише якщо знімків ще немає.
+"""
+import hashlib
+import json
+
+from django.db import transaction
+from django.db.models import Count, Max
+
+from . import profiling
+from .models import ChartSnapshot, DataVersion
+from .queries import DashboardQueries, shared_query_results
+from .signals import LEAGUE_MODELS, LEAGUE_VERSION
+
+
+# Збільшувати при зміні формату знімків: воркер перебудує їх після деплою
+SNAPSHOT_FORMAT = 5
+
+# (ключ у контексті шаблону, метод PlotlyCharts)
+# Крім графіків у групі 'plotly' зберігається 'plotly_template'
+PLOTLY_CHARTS = [
+    ('plotly_chart1', 'create_teams_bar_chart'),
+    ('plotly_chart2', 'create_age_pie_chart'),
+    ('plotly_chart3', 'create_wins_line_chart'),
+    ('plotly_chart4', 'create_players_scatter'),
+    ('plotly_chart5', 'create_matches_area_chart'),
+    ('plotly_chart6', 'create_coaches_heatmap'),
+]
+
+# (назва графіка, метод BokehCharts)
+BOKEH_CHARTS = [
+    ('teams_bar', 'create_teams_bar_chart_bokeh'),
+    ('players_goals', 'create_players_goals_bokeh'),
+    ('stadium_capacity', 'create_stadium_capacity_bokeh'),
+    ('matches_timeline', 'create_matches_timeline_bokeh'),
+    ('players_by_country', 'create_players_by_country_bokeh'),
+    ('team_stats_grid', 'create_team_stats_grid_bokeh'),
+]
+
+# Специфікації для /dashboard/api/charts/<name>/ (функції в dashboard/specs.py)
+PLOTLY_SPECS = [
+    'teams_goal_difference', 'age_pie', 'wins_line',
+    'players_scatter', 'matches_area', 'coaches_heatmap',
+]
+BOKEH_SPECS = [
+    'teams_bar', 'players_goals', 'stadium_capacity',
+    'matches_timeline', 'players_by_country', 'team_stats_grid',
+]
+CHART_SPECS = PLOTLY_SPECS + BOKEH_SPECS
+
+# Відповіді /dashboard/api/* з параметрами за замовчуванням
+API_PAYLOADS = [
+    ('teams_goal_difference', lambda: DashboardQueries.teams_best_goal_difference_frame(50)),
+    ('avg_player_age', lambda: DashboardQueries.frame('avg_player_age_by_team')),
+    ('wins_by_year', lambda: DashboardQueries.frame('team_wins_by_year')),
+    ('top_players', lambda: DashboardQueries.top_players_frame(10)),
+    ('matches_by_month', lambda: DashboardQueries.frame('matches_by_month')),
+    ('coaches_by_country', lambda: DashboardQueries.frame('coaches_by_country')),
+]
+
+
+def data_counter():
+    """Лічильник DataVersion (його збільшують сигнали при кожному записі)"""
+    return DataVersion.objects.filter(pk=LEAGUE_VERSION).values_list('version', flat=True).first() or 0
+
+
+def current_data_version():
+    """
+    Відбиток даних ліги "<лічильник>:<sha1>": лічильник сигналів
+    (post_save / post_delete і rows_updated масових UPDATE) + count/max(pk)
+    кожної таблиці - останнє ловить bulk_create(), що не надсилає сигналів.
+    QuerySet.update() без rows_updated цей відбиток не помічає.
+    """
+    counter = data_counter()
+    parts = [f"format:{SNAPSHOT_FORMAT}", str(counter)]
+    for model in LEAGUE_MODELS:
+        stats = model.objects.aggregate(count=Count('pk'), max_pk=Max('pk'))
+        parts.append(f"{model._meta.db_table}:{stats['count']}:{stats['max_pk']}")
+    return f"{counter}:{hashlib.sha1('|'.join(parts).encode()).hexdigest()}"
+
+
+def is_stale(version, counter):
+    """Знімок зібрано до останнього запису (або в старому форматі версії)"""
+    built, _, _ = version.partition(':')
+    return not built.isdigit() or int(built) < counter
+
+
+@shared_query_results()
+def build_plotly_fragments():
+    """JSON-специфікації 6 графіків + спільний шаблон оформлення"""
+    from .utils import PlotlyCharts, plotly_template
+
+    fragments = {}
+    for name, method in PLOTLY_CHARTS:
+        with profiling.chart(method):
+            fragments[name] = getattr(PlotlyCharts, method)()
+    with profiling.stage('serialize'):
+        fragments['plotly_template'] = plotly_template()
+    return fragments
+
+
+@shared_query_results()
+def build_bokeh_fragments():
+    """json_item кожного графіка (None, якщо немає даних)"""
+    from bokeh.embed import json_item
+    from .utils import BokehCharts
+
+    fragments = {}
+    for name, method in BOKEH_CHARTS:
+        with profiling.chart(method):
+            chart = getattr(BokehCharts, method)()
+            with profiling.stage('serialize'):
+                fragments[name] = json_item(chart) if chart else None
+    return fragments
+
+
+def build_chart_spec(name):
+    from . import specs
+    with profiling.chart(f"specs.{name}"):
+        return getattr(specs, name)()
+
+
+@shared_query_results()
+def build_chart_specs():
+    return {name: build_chart_spec(name) for name in CHART_SPECS}
+
+
+@shared_query_results()
+def build_api_payloads():
+    return {name: DashboardQueries.frame_payload(query()) for name, query in API_PAYLOADS}
+
+
+SNAPSHOT_GROUPS = {
+    'plotly': build_plotly_fragments,
+    'bokeh': build_bokeh_fragments,
+    'api': build_api_payloads,
+    'spec': build_chart_specs,
+}
+
+
+def rebuild_snapshots(version=None):
+    """Збирає все наново, потім підміняє знімки однією транзакцією"""
+    version = version or current_data_version()
+    # Усі групи беруть однакові звіти: кожен читається з БД один раз
+    with shared_query_results():
+        built = {group: build() for group, build in SNAPSHOT_GROUPS.items()}
+
+    with transaction.atomic():
+        for group, payloads in built.items():
+            for name, payload in payloads.items():
+                ChartSnapshot.objects.update_or_create(
+                    name=f"{group}:{name}",
+                    defaults={'payload': json.dumps(payload), 'data_version': version}
+                )
+    return version
+
+
+def snapshots_version():
+    """Версія даних, з якої зібрані поточні знімки (None, якщо їх немає)"""
+    return ChartSnapshot.objects.values_list('data_version', flat=True).first()
+
+
+def load_snapshot_raw(group, name):
+    """(JSON-рядок, версія даних) одного знімка без розбору, або None"""
+    # Профіль міряє збірку, а не читання готового знімка
+    if profiling.active():
+        return None
+    snapshot = ChartSnapshot.objects.filter(name=f"{group}:{name}").values_list('payload', 'data_version').first()
+    if snapshot is None or is_stale(snapshot[1], data_counter()):
+        return None
+    return snapshot
+
+
+def load_snapshots(group, names):
+    """
+    Повертає {name: payload} або None, якщо хоч одного знімка бракує або
+    він зібраний до останнього запису (воркер ще не встиг перебудувати)
+    """
+    if profiling.active():
+        return None
+    keys = {f"{group}:{name}": name for name in names}
+    rows = list(ChartSnapshot.objects.filter(name__in=keys).values_list('name', 'payload', 'data_version'))
+    if len(rows) != len(keys):
+        return None
+    counter = data_counter()
+    if any(is_stale(version, counter) for _, _, version in rows):
+        return None
+    return {keys[key]: json.loads(payload) for key, payload, _ in rows}
@@ -0,0 +1,285 @@
+# dashboard/profiling.py
+"""
+Профілювання дашбордів і серіалізаторів на вимогу.
+
+?profile=1 (лише для staff і лише з DASHBOARD_PROFILING = True) замість
+відповіді повертає розклад часу запиту:
+
+    {"path": "/dashboard/plotly/", "status": 200, "total_ms": 812.4,
+     "sql": {"queries": 9, "ms": 41.2},
+     "charts": {"create_teams_bar_chart": {"total_ms": 120.3, "query": 6.1,
+                "dataframe": 1.2, "transform": 0.4, "figure": 95.0,
+                "serialize": 17.6, "sql_queries": 1}, ...},
+     "stages": {"render": 3.1, ...},
+     "serializers": {"TeamBaseSerializer": {"calls": 21, "ms": 4.8}, ...}}
+
+Етапи графіка (PlotlyCharts / BokehCharts / specs):
+* query - читання рядків у DashboardQueries.to_dataframe та SQL, виконаний
+  прямо в методі графіка;
+* dataframe - pd.DataFrame із рядків;
+* transform - функції dashboard/transforms.py;
+* serialize - plotly_spec / json_item;
+* figure - решта часу методу: побудова фігури разом із pandas-кодом
+  усередині самого методу.
+Час серіалізатора включає вкладені серіалізатори (ListSerializer -> child).
+
+?profile=cprofile віддає дамп cProfile (profile.prof для pstats / snakeviz).
+Під ASGI він бачить лише потік event loop, тож синхронні в'юшки краще
+профілювати під WSGI / runserver.
+
+Поки запит профілюється, знімки precompute_charts не використовуються:
+графіки збираються наживо. Поза профілюванням гачки коштують одну
+перевірку ContextVar.
+"""
+import cProfile
+import functools
+import marshal
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse
+
+
+# Профіль поточного запиту, графік і етап, що зараз виконуються
+_profile = ContextVar('dashboard_profile', default=None)
+_chart = ContextVar('dashboard_profile_chart', default=None)
+_stage = ContextVar('dashboard_profile_stage', default=None)
+
+CHART_STAGES = ('query', 'dataframe', 'transform', 'figure', 'serialize')
+MODES = ('1', 'cprofile')
+
+
+class Profile:
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        # {графік: секунди}
+        self.charts = defaultdict(float)
+        # {(графік або None, етап): секунди}
+        self.stages = defaultdict(float)
+        # {(графік або None): [запити, секунди]}
+        self.sql = defaultdict(lambda: [0, 0.0])
+        # {клас серіалізатора: [виклики, секунди]}
+        self.serializers = defaultdict(lambda: [0, 0.0])
+
+    def breakdown(self):
+        def ms(seconds):
+            return round(seconds * 1000, 2)
+
+        charts = {}
+        for name, total in self.charts.items():
+            stages = {stage: self.stages.pop((name, stage), 0.0) for stage in CHART_STAGES}
+            stages['figure'] += total - sum(stages.values())
+            charts[name] = {
+                'total_ms': ms(total),
+                **{stage: ms(seconds) for stage, seconds in stages.items()},
+                'sql_queries': self.sql[name][0],
+            }
+        return {
+            'total_ms': ms(time.perf_counter() - self.started),
+            'sql': {
+                'queries': sum(count for count, _ in self.sql.values()),
+                'ms': ms(sum(seconds for _, seconds in self.sql.values())),
+            },
+            'charts': charts,
+            'stages': {stage: ms(seconds) for (_, stage), seconds in self.stages.items()},
+            'serializers': {
+                name: {'calls': calls, 'ms': ms(seconds)}
+                for name, (calls, seconds) in sorted(self.serializers.items(), key=lambda item: -item[1][1])
+            },
+        }
+
+
+def active():
+    return _profile.get() is not None
+
+
+@contextmanager
+def stage(name):
+    """Час блоку як етап поточного графіка (вкладені етапи не рахуються двічі)"""
+    profile = _profile.get()
+    if profile is None or _stage.get() is not None:
+        yield
+        return
+    token = _stage.set(name)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.stages[_chart.get(), name] += time.perf_counter() - started
+        _stage.reset(token)
+
+
+def timed(name):
+    """Декоратор: кожен виклик функції - етап name"""
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if _profile.get() is None:
+                return function(*args, **kwargs)
+            with stage(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def chart(name):
+    """Етапи всередині блоку належать графіку name"""
+    profile = _profile.get()
+    if profile is None:
+        yield
+        return
+    token = _chart.set(name)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.charts[name] += time.perf_counter() - started
+        _chart.reset(token)
+
+
+def _execute(execute, sql, params, many, context):
+    """execute_wrapper кожного з'єднання: SQL поза to_dataframe - теж етап query"""
+    profile = _profile.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = time.perf_counter() - started
+        entry = profile.sql[_chart.get()]
+        entry[0] += 1
+        entry[1] += elapsed
+        if _stage.get() is None:
+            profile.stages[_chart.get(), 'query'] += elapsed
+
+
+def _wrap(cls, method, label=None):
+    original = getattr(cls, method)
+    if getattr(original, 'profiled', False):
+        return
+
+    @functools.wraps(original)
+    def wrapper(self, *args, **kwargs):
+        profile = _profile.get()
+        if profile is None:
+            return original(self, *args, **kwargs)
+        started = time.perf_counter()
+        try:
+            return original(self, *args, **kwargs)
+        finally:
+            entry = profile.serializers[label or type(self).__name__]
+            entry[0] += 1
+            entry[1] += time.perf_counter() - started
+
+    wrapper.profiled = True
+    setattr(cls, method, wrapper)
+
+
+def add_execute_wrapper(sender=None, connection=None, **kwargs):
+    # Першим у списку: connection.execute_wrapper() знімає останній
+    if _execute not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, _execute)
+
+
+def install():
+    """Гачки для SQL і to_representation серіалізаторів (DashboardConfig.ready)"""
+    from django.db import connections
+    from django.db.backends.signals import connection_created
+    from rest_framework import serializers
+    from main.fast_serializers import ValuesSerializer
+
+    connection_created.connect(add_execute_wrapper, dispatch_uid='dashboard_profiling_sql')
+    for connection in connections.all(initialized_only=True):
+        add_execute_wrapper(connection=connection)
+
+    _wrap(serializers.Serializer, 'to_representation')
+    _wrap(serializers.ListSerializer, 'to_representation')
+    _wrap(ValuesSerializer, 'build', label='ValuesSerializer')
+
+
+def requested(request):
+    """'1' / 'cprofile', якщо цей запит треба профілювати, інакше None"""
+    mode = request.GET.get('profile')
+    if mode not in MODES or not settings.DASHBOARD_PROFILING:
+        return None
+    # Розклад показує SQL і внутрішню будову коду - не для анонімів
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated and user.is_staff:
+        return mode
+    return None
+
+
+def profile_response(request, profile, response, profiler=None):
+    if profiler is not None:
+        profiler.create_stats()
+        dump = HttpResponse(marshal.dumps(profiler.stats), content_type='application/octet-stream')
+        dump['Content-Disposition'] = 'attachment; filename="profile.prof"'
+        return dump
+    return JsonResponse({
+        'path': request.get_full_path(),
+        'status': response.status_code,
+        **profile.breakdown(),
+    })
+
+
+class ProfilingMiddleware:
+    """?profile=1 / ?profile=cprofile - див. опис модуля"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        mode = requested(request)
+        if mode is None:
+            return self.get_response(request)
+
+        profile = Profile()
+        profiler = cProfile.Profile() if mode == 'cprofile' else None
+        token = _profile.set(profile)
+        try:
+            if profiler is not None:
+                profiler.enable()
+            response = self.get_response(request)
+            # Відкладений рендеринг шаблонів (TemplateResponse) теж у профілі
+            if hasattr(response, 'render') and callable(response.render):
+                response.render()
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            _profile.reset(token)
+        return profile_response(request, profile, response, profiler)
+
+    async def __acall__(self, request):
+        # request.user читає сесію з БД - лише в потоці
+        mode = None
+        if request.GET.get('profile') in MODES:
+            mode = await sync_to_async(requested)(request)
+        if mode is None:
+            return await self.get_response(request)
+
+        profile = Profile()
+        profiler = cProfile.Profile() if mode == 'cprofile' else None
+        token = _profile.set(profile)
+        try:
+            if profiler is not None:
+                profiler.enable()
+            response = await self.get_response(request)
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            _profile.reset(token)
+        return profile_response(request, profile, response, profiler)
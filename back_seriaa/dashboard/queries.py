@@ -1,18 +1,48 @@
+import json
+from contextlib import contextmanager
+from contextvars import ContextVar
+
 from django.db.models import Count, Sum, Avg, Max, Min, F, Q
 from django.db.models.functions import TruncMonth, ExtractYear
 from main.models import Team, PlayerTechnical, PlayerDetailed, History, Match, Calendar, Coach
-import pandas as pd
+
+from . import profiling
+
+
+# DataFrame-и, вже прочитані в межах shared_query_results (None - поза ним)
+_shared_frames = ContextVar('dashboard_shared_frames', default=None)
+
+
+@contextmanager
+def shared_query_results():
+    """
+    Один запит до БД на кожен звіт у межах блоку (або функції з
+    @shared_query_results()). Графіки однієї сторінки беруть результати
+    з пам'яті, а вужчі варіанти (інший поріг очок, менший ліміт)
+    виводяться з уже прочитаного найширшого. Вкладені блоки
+    використовують зовнішній.
+    """
+    if _shared_frames.get() is not None:
+        yield
+        return
+    token = _shared_frames.set({})
+    try:
+        yield
+    finally:
+        _shared_frames.reset(token)
+
 
 class DashboardQueries:
     
     # 1. Команди з найкращою різницею голів (з HAVING)
     @staticmethod
     def teams_best_goal_difference(min_points=50):
-        queryset = Team.objects.filter(
-            points__gte=min_points,
-            goal_difference__gt=20
-        ).order_by('-goal_difference').values(
-            'team_id', 'team_name', 'points', 'goal_difference'
+        queryset = Team.objects.filter(goal_difference__gt=20)
+        # None - без порогу очок (найширший варіант для shared_query_results)
+        if min_points is not None:
+            queryset = queryset.filter(points__gte=min_points)
+        queryset = queryset.order_by('-goal_difference', 'team_id').values(
+            'team_id', 'team_name', 'points', 'wins', 'draws', 'goal_difference'
         )
         return queryset
     
@@ -53,7 +83,7 @@ class DashboardQueries:
     def top_players_by_contributions(limit=10):
         queryset = PlayerTechnical.objects.annotate(
             total_contributions=F('goal_scored') + F('assist_scored')
-        ).order_by('-total_contributions').values(
+        ).order_by('-total_contributions', 'player_id').values(
             'player_name', 'player_team__team_name',
             'goal_scored', 'assist_scored', 'total_contributions'
         )[:limit]
@@ -85,4 +115,91 @@ class DashboardQueries:
     @staticmethod
     def to_dataframe(queryset):
         """Конвертує QuerySet у pandas DataFrame"""
-        return pd.DataFrame(list(queryset))
\ No newline at end of file
+        import pandas as pd
+        with profiling.stage('query'):
+            rows = list(queryset)
+        with profiling.stage('dataframe'):
+            return pd.DataFrame(rows)
+
+    # DataFrame-и звітів для графіків (спільні в межах shared_query_results).
+    # Графіки змінюють свої DataFrame-и, тому кожен отримує копію
+    @staticmethod
+    def frame(query, *args):
+        """DataFrame результату DashboardQueries.<query>(*args)"""
+        def fetch():
+            return DashboardQueries.to_dataframe(getattr(DashboardQueries, query)(*args))
+
+        frames = _shared_frames.get()
+        if frames is None:
+            return fetch()
+        key = (query, args)
+        if key not in frames:
+            frames[key] = fetch()
+        return frames[key].copy()
+
+    @staticmethod
+    def teams_best_goal_difference_frame(min_points=50):
+        """Команди з очками >= min_points, відфільтровані з варіанту без порогу"""
+        if _shared_frames.get() is None:
+            return DashboardQueries.frame('teams_best_goal_difference', min_points)
+
+        df = DashboardQueries.frame('teams_best_goal_difference', None)
+        if df.empty:
+            return df
+        df = df[df['points'] >= min_points].reset_index(drop=True)
+        return DashboardQueries.scoped_frame(df)
+
+    @staticmethod
+    def top_players_frame(limit=10):
+        """Топ-limit гравців: зріз із найбільшого вже прочитаного топу"""
+        frames = _shared_frames.get()
+        if frames is None:
+            return DashboardQueries.frame('top_players_by_contributions', limit)
+
+        fetched_limit, df = frames.get('top_players', (0, None))
+        if df is None or limit > fetched_limit:
+            fetched_limit, df = limit, DashboardQueries.to_dataframe(
+                DashboardQueries.top_players_by_contributions(limit)
+            )
+            frames['top_players'] = (fetched_limit, df)
+        return DashboardQueries.scoped_frame(df.head(limit).copy())
+
+    @staticmethod
+    def scoped_frame(df):
+        """
+        Зріз уже прочитаного DataFrame у тій формі, що й результат запиту:
+        порожній запит дає pd.DataFrame([]) без колонок, а не зріз з ними
+        """
+        import pandas as pd
+        if df.empty:
+            return pd.DataFrame([])
+        return df
+
+    @staticmethod
+    def to_payload(queryset):
+        """Дані + базова статистика у форматі відповіді /dashboard/api/*"""
+        return DashboardQueries.frame_payload(DashboardQueries.to_dataframe(queryset))
+
+    @staticmethod
+    def frame_payload(df):
+        """to_payload для вже готового DataFrame"""
+        # Базовий статистичний аналіз
+        stats = {}
+        if not df.empty:
+            numeric_cols = df.select_dtypes(include=['int64', 'float64']).columns
+            for col in numeric_cols:
+                stats[col] = {
+                    'mean': float(df[col].mean()),
+                    'median': float(df[col].median()),
+                    'min': float(df[col].min()),
+                    'max': float(df[col].max()),
+                    'std': float(df[col].std())
+                }
+
+        return {
+            'data': json.loads(df.to_json(orient='records', date_format='iso')),
+            'columns': list(df.columns),
+            'shape': df.shape,
+            'statistics': stats,
+            'info': f"Total records: {len(df)}"
+        }
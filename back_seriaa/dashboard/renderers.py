@@ -0,0 +1,77 @@
+# dashboard/renderers.py
+"""
+Колонкові формати відповідей /dashboard/api/* для аналітиків.
+
+Клієнт просить їх заголовком Accept або параметром ?format=:
+    Accept: application/vnd.apache.arrow.stream   (?format=arrow)
+    Accept: application/vnd.apache.parquet        (?format=parquet)
+і читає відповідь одразу в DataFrame, без JSON:
+    pyarrow.ipc.open_stream(body).read_pandas()
+    pandas.read_parquet(io.BytesIO(body))
+
+pyarrow - необов'язкова залежність: без нього ці формати не пропонуються.
+"""
+import abc
+import importlib.util
+import io
+
+from rest_framework.renderers import BaseRenderer
+
+
+class ColumnarRenderer(abc.ABC, BaseRenderer):
+    """Рендерить DataFrame (data відповіді) у бінарний колонковий формат"""
+
+    charset = None
+    render_style = 'binary'
+    # BaseDashboardAPI віддає таким рендерерам DataFrame замість JSON-знімка
+    columnar = True
+
+    def to_table(self, data):
+        import pandas as pd
+        import pyarrow as pa
+
+        if not isinstance(data, pd.DataFrame):
+            # Помилки (403, 404, ...) - один рядок з текстовими полями
+            data = pd.DataFrame([{key: str(value) for key, value in (data or {}).items()}])
+        return pa.Table.from_pandas(data, preserve_index=False)
+
+    @abc.abstractmethod
+    def write(self, table, sink):
+        """Записує pyarrow.Table у sink (файловий об'єкт)"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        sink = io.BytesIO()
+        self.write(self.to_table(data), sink)
+        return sink.getvalue()
+
+
+class ArrowStreamRenderer(ColumnarRenderer):
+    """Arrow IPC stream"""
+
+    media_type = 'application/vnd.apache.arrow.stream'
+    format = 'arrow'
+
+    def write(self, table, sink):
+        import pyarrow as pa
+
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+
+
+class ParquetRenderer(ColumnarRenderer):
+    """Parquet (стиснення zstd)"""
+
+    media_type = 'application/vnd.apache.parquet'
+    format = 'parquet'
+
+    def write(self, table, sink):
+        import pyarrow.parquet as pq
+
+        pq.write_table(table, sink, compression='zstd')
+
+
+def columnar_renderers():
+    """Колонкові рендерери, якщо встановлено pyarrow"""
+    if importlib.util.find_spec('pyarrow') is None:
+        return []
+    return [ArrowStreamRenderer, ParquetRenderer]
@@ -0,0 +1,41 @@
+# dashboard/signals.py
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_save, post_delete
+
+from main.signals import rows_updated
+from main.models import (
+    Team, Coach, Stadium, Calendar,
+    History, Match, PlayerDetailed, PlayerTechnical
+)
+from .models import DataVersion
+
+LEAGUE_MODELS = [Team, Coach, Stadium, Calendar, History, Match, PlayerDetailed, PlayerTechnical]
+
+LEAGUE_VERSION = 'league'
+
+
+def increment_data_version():
+    updated = DataVersion.objects.filter(pk=LEAGUE_VERSION).update(version=F('version') + 1)
+    if not updated:
+        DataVersion.objects.get_or_create(pk=LEAGUE_VERSION, defaults={'version': 1})
+
+
+def bump_data_version(sender, using=None, **kwargs):
+    """
+    Будь-який запис у таблиці ліги робить дашборди застарілими.
+
+    Лічильник збільшується після коміту транзакції запису окремим
+    коротким UPDATE: блокування рядка DataVersion не тримається до кінця
+    кожної транзакції, тож записи в різні таблиці не чекають одне одного.
+    Відкочена транзакція лічильник не змінює.
+    """
+    transaction.on_commit(increment_data_version, using=using)
+
+
+def connect_signals():
+    for model in LEAGUE_MODELS:
+        post_save.connect(bump_data_version, sender=model, dispatch_uid=f'dashboard_version_save_{model.__name__}')
+        post_delete.connect(bump_data_version, sender=model, dispatch_uid=f'dashboard_version_delete_{model.__name__}')
+    # Масові UPDATE (рахунки матчів, лічильники голів) - без post_save
+    rows_updated.connect(bump_data_version, dispatch_uid='dashboard_version_rows_updated')
@@ -0,0 +1,327 @@
+# dashboard/specs.py
+"""
+Декларативні специфікації 12 графіків для рендерингу в браузері.
+
+Кожна функція повертає {'spec': {...}, 'data': {колонка: [значення]}}:
+тільки дані, які потрібні графіку, та короткий опис того, як його
+намалювати. static/dashboard/charts.js будує з цього Plotly / BokehJS.
+Якщо даних немає, 'data' дорівнює None.
+"""
+import pandas as pd
+from bokeh.palettes import Category20, Spectral6, Viridis256
+from plotly.colors import sequential
+
+from main.models import Calendar, PlayerDetailed, Stadium
+from django.db.models import Count
+
+from .queries import DashboardQueries
+from .transforms import (
+    column_data, as_lists, top_by, wedge_angles, cycle_palette,
+    cumulative_top, equal_width_bins, crosstab, sort_rows_by_total, epoch_ms
+)
+
+
+def columns(df, names):
+    """DataFrame -> {колонка: список} лише для потрібних колонок"""
+    return as_lists(column_data(df, names))
+
+
+def chart(spec, data):
+    return {'spec': spec, 'data': data}
+
+
+# ==================== PLOTLY ====================
+
+def teams_goal_difference():
+    """1. Стовпчикова діаграма: команди з найкращою різницею голів"""
+    df = DashboardQueries.teams_best_goal_difference_frame(min_points=30)
+    spec = {
+        'library': 'plotly', 'kind': 'bar',
+        'title': 'Команди з найкращою різницею голів (очки ≥ 30)',
+        'x': 'team_name', 'y': 'goal_difference',
+        'color': 'goal_difference', 'colorscale': 'Viridis', 'text': 'goal_difference',
+        'labels': {'team_name': 'Команда', 'goal_difference': 'Різниця голів'},
+        'layout': {
+            'height': 500, 'xaxis': {'tickangle': -45},
+            'plot_bgcolor': 'rgba(240, 240, 240, 0.8)', 'hovermode': 'x unified',
+        },
+    }
+    if df.empty:
+        return chart(spec, None)
+    return chart(spec, columns(df, ['team_name', 'goal_difference']))
+
+
+def age_pie():
+    """2. Кругова діаграма: середній вік по командах"""
+    df = DashboardQueries.frame('avg_player_age_by_team')
+
+    if df.empty:
+        df = pd.DataFrame({
+            'player_team__team_name': ['Napoli', 'Inter Milan', 'Juventus'],
+            'avg_age': [26.5, 25.8, 27.2],
+            'player_count': [22, 24, 23]
+        })
+
+    df = df.head(8).copy()
+    df['display_name'] = df['player_team__team_name'].str[:15] + '...'
+
+    spec = {
+        'library': 'plotly', 'kind': 'pie',
+        'title': '📊 Середній вік гравців по командах (Топ-8)',
+        'names': 'display_name', 'values': 'avg_age', 'hole': 0.4,
+        'colors': sequential.Plasma,
+        'annotation': f'Загалом: {df["player_count"].sum()} гравців',
+        'layout': {'height': 500},
+    }
+    return chart(spec, columns(df, ['display_name', 'avg_age']))
+
+
+def wins_line():
+    """3. Лінійний графік: кумулятивні перемоги по роках (Топ-5)"""
+    df = DashboardQueries.frame('team_wins_by_year')
+    spec = {
+        'library': 'plotly', 'kind': 'line',
+        'title': 'Кумулятивні перемоги команд по роках (Топ-5)',
+        'x': 'year', 'series': [],
+        'layout': {
+            'height': 500, 'xaxis': {'title': 'Рік'},
+            'yaxis': {'title': 'Накопичені перемоги'}, 'legend': {'title': {'text': 'Команди'}},
+            'hovermode': 'x unified', 'plot_bgcolor': 'rgba(250, 250, 250, 0.9)',
+        },
+    }
+    if df.empty:
+        return chart(spec, None)
+
+    years, top_teams, cumulative = cumulative_top(
+        df['year'], df['win_team__team_name'], df['win_count'], top=5
+    )
+
+    spec['series'] = top_teams.tolist()
+    data = {'year': years}
+    data.update(zip(spec['series'], cumulative.T))
+    return chart(spec, as_lists(data))
+
+
+def players_scatter():
+    """4. Scatter plot: гравці (голи vs асисти)"""
+    df = DashboardQueries.top_players_frame(25)
+    spec = {
+        'library': 'plotly', 'kind': 'scatter',
+        'title': 'Гравці: Голи vs Асисти',
+        'x': 'goal_scored', 'y': 'assist_scored', 'size': 'total_contributions',
+        'color': 'player_team__team_name', 'hover_name': 'player_name',
+        'size_max': 30, 'opacity': 0.8,
+        'labels': {
+            'goal_scored': 'Кількість голів',
+            'assist_scored': 'Кількість асистів',
+            'player_team__team_name': 'Команда',
+            'total_contributions': 'Голи+Асисти'
+        },
+        'layout': {'height': 600, 'hoverlabel': {'bgcolor': 'white', 'font': {'size': 12}}},
+    }
+    if df.empty:
+        return chart(spec, None)
+
+    median_goals = float(df['goal_scored'].median())
+    median_assists = float(df['assist_scored'].median())
+    spec['hline'] = {'value': median_assists, 'text': f"Медіана асистів: {median_assists}"}
+    spec['vline'] = {'value': median_goals, 'text': f"Медіана голів: {median_goals}"}
+
+    df['player_team__team_name'] = df['player_team__team_name'].fillna('—')
+    return chart(spec, columns(df, [
+        'player_name', 'player_team__team_name', 'goal_scored', 'assist_scored', 'total_contributions'
+    ]))
+
+
+def matches_area():
+    """5. Area chart: матчі по місяцях"""
+    df = DashboardQueries.frame('matches_by_month')
+    spec = {
+        'library': 'plotly', 'kind': 'area',
+        'title': 'Кількість матчів по місяцях',
+        'x': 'month_name', 'y': 'match_count',
+        'labels': {'month_name': 'Місяць', 'match_count': 'Кількість матчів'},
+        'fillcolor': 'rgba(100, 149, 237, 0.3)', 'line': {'color': 'royalblue', 'width': 3},
+        'layout': {
+            'height': 400, 'xaxis': {'tickangle': -45},
+            'hovermode': 'x unified', 'plot_bgcolor': 'rgba(240, 248, 255, 0.9)',
+        },
+    }
+    if df.empty:
+        return chart(spec, None)
+
+    df['month'] = pd.to_datetime(df['month'])
+    df = df.sort_values('month')
+    df['month_name'] = df['month'].dt.strftime('%B %Y')
+    return chart(spec, columns(df, ['month_name', 'match_count']))
+
+
+def coaches_heatmap():
+    """6. Heatmap: тренери по країнах та досвіду"""
+    df = DashboardQueries.frame('coaches_by_country')
+    spec = {
+        'library': 'plotly', 'kind': 'heatmap',
+        'title': '👨‍🏫 Розподіл тренерів по країнах та рівню досвіду',
+        'colorscale': 'YlOrRd',
+        'labels': {'x': 'Рівень досвіду', 'y': 'Країна', 'color': 'Кількість тренерів'},
+        'layout': {'height': 400},
+    }
+    if df.empty:
+        return chart(spec, None)
+
+    exp_levels = ['Початківці (1-7 років)', 'Досвідчені (8-15)', 'Ветерани (16+)']
+    countries, _, counts = crosstab(
+        df['coach_country'],
+        equal_width_bins(df['avg_experience'], bins=3),
+        df['coach_count'],
+        col_labels=exp_levels
+    )
+    countries, counts = sort_rows_by_total(countries, counts)
+
+    return chart(spec, {'x': exp_levels, 'y': countries.tolist(), 'z': counts.tolist()})
+
+
+# ==================== BOKEH ====================
+
+def teams_bar():
+    """7. Стовпчикова діаграма Bokeh: рейтинг команд"""
+    df = DashboardQueries.teams_best_goal_difference_frame(min_points=20)
+    spec = {
+        'library': 'bokeh', 'kind': 'vbar',
+        'title': 'Топ-10 команд за кількістю очок',
+        'x': 'team_name', 'top': 'points', 'labels': 'points',
+        'palette': list(Category20[20]),
+        'width': 800, 'height': 400, 'y_axis_label': 'Очки',
+        'tools': 'pan,wheel_zoom,box_zoom,reset,save', 'toolbar_location': 'above',
+        'tooltips': [
+            ['Команда', '@team_name'], ['Очки', '@points'],
+            ['Перемоги', '@wins'], ['Різниця голів', '@goal_difference'],
+        ],
+    }
+    if df.empty:
+        return chart(spec, None)
+
+    df = top_by(df, 'points', 10)
+    return chart(spec, columns(df, ['team_name', 'points', 'wins', 'goal_difference']))
+
+
+def players_goals():
+    """8. Горизонтальна діаграма: топ-гравці за голами"""
+    df = DashboardQueries.top_players_frame(15)
+    spec = {
+        'library': 'bokeh', 'kind': 'hbar',
+        'title': 'Топ-15 гравців за кількістю голів',
+        'y': 'player_name', 'right': 'goal_scored',
+        'palette': list(Viridis256[::17]),
+        'width': 800, 'height': 500,
+        'x_axis_label': 'Кількість голів', 'y_axis_label': 'Гравець',
+        'tools': 'pan,wheel_zoom,reset', 'toolbar_location': 'right',
+        'tooltips': [
+            ['Гравець', '@player_name'], ['Голи', '@goal_scored'], ['Асисти', '@assist_scored'],
+            ['Команда', '@player_team__team_name'], ['Загальний внесок', '@total_contributions'],
+        ],
+    }
+    if df.empty:
+        return chart(spec, None)
+
+    df = df.sort_values('goal_scored', ascending=True)
+    df['player_team__team_name'] = df['player_team__team_name'].fillna('—')
+    return chart(spec, columns(df, [
+        'player_name', 'goal_scored', 'assist_scored', 'player_team__team_name', 'total_contributions'
+    ]))
+
+
+def stadium_capacity():
+    """9. Діаграма розподілу місткості стадіонів"""
+    stadiums = Stadium.objects.all().values('stadium_name', 'capacity', 'city')
+    df = pd.DataFrame(list(stadiums)).dropna()
+    spec = {
+        'library': 'bokeh', 'kind': 'vbar',
+        'title': 'Топ-15 стадіонів за місткістю',
+        'x': 'stadium_name', 'top': 'capacity',
+        'fill_color': 'dodgerblue', 'line_color': 'navy',
+        'width': 900, 'height': 400, 'y_axis_label': 'Місткість (осіб)',
+        'toolbar_location': 'above',
+        'tooltips': [['Стадіон', '@stadium_name'], ['Місткість', '@capacity'], ['Місто', '@city']],
+    }
+    if df.empty:
+        return chart(spec, None)
+
+    df = top_by(df, 'capacity', 15)
+    return chart(spec, columns(df, ['stadium_name', 'capacity', 'city']))
+
+
+def matches_timeline():
+    """10. Таймлайн матчів"""
+    matches_by_date = Calendar.objects.values('event_date').annotate(
+        match_count=Count('event_id')
+    ).order_by('event_date')
+    df = pd.DataFrame(list(matches_by_date))
+    spec = {
+        'library': 'bokeh', 'kind': 'timeline',
+        'title': 'Розподіл матчів по датах',
+        'x': 'event_date', 'y': 'match_count', 'color': 'red',
+        'width': 800, 'height': 350,
+        'x_axis_label': 'Дата', 'y_axis_label': 'Кількість матчів',
+        'toolbar_location': 'above',
+        'tooltips': [['Дата', '@date_str'], ['Матчів', '@match_count']],
+    }
+    if df.empty:
+        return chart(spec, None)
+
+    dates = pd.to_datetime(df['event_date'])
+    return chart(spec, as_lists({
+        'event_date': epoch_ms(dates),
+        'date_str': dates.dt.strftime('%Y-%m-%d'),
+        'match_count': df['match_count'],
+    }))
+
+
+def players_by_country():
+    """11. Donut chart: гравці за країнами"""
+    players = PlayerDetailed.objects.values(
+        'player_country'
+    ).annotate(
+        player_count=Count('player_detailed_id')
+    ).filter(player_country__isnull=False).order_by('-player_count')[:10]
+    df = pd.DataFrame(list(players))
+    spec = {
+        'library': 'bokeh', 'kind': 'donut',
+        'title': '🌍 Гравці за країнами (Топ-10)',
+        'category': 'player_country', 'radius': 0.4,
+        'palette': list(Spectral6), 'width': 400, 'height': 400,
+        'tooltips': [['Країна', '@player_country'], ['Гравців', '@player_count'], ['Частка', '@percentage{0.1f}%']],
+    }
+    if df.empty:
+        return chart(spec, None)
+
+    share, start_angle, end_angle = wedge_angles(df['player_count'])
+    spec['palette'] = cycle_palette(Spectral6, len(df))
+
+    return chart(spec, as_lists({
+        'player_country': df['player_country'],
+        'player_count': df['player_count'],
+        'percentage': share * 100,
+        'start_angle': start_angle,
+        'end_angle': end_angle,
+    }))
+
+
+def team_stats_grid():
+    """12. Grid plot: статистика команд"""
+    df = DashboardQueries.teams_best_goal_difference_frame(min_points=0)
+    spec = {
+        'library': 'bokeh', 'kind': 'grid',
+        'x': 'team_name', 'width': 400, 'height': 250,
+        'panels': [
+            {'title': 'Очки', 'top': 'points', 'color': 'blue'},
+            {'title': 'Перемоги', 'top': 'wins', 'color': 'green'},
+            {'title': 'Різниця голів', 'top': 'goal_difference', 'color': 'orange'},
+            {'title': 'Нічиї', 'top': 'draws', 'color': 'purple'},
+        ],
+    }
+    if df.empty:
+        return chart(spec, None)
+
+    df = df.head(8)
+    return chart(spec, columns(df, ['team_name', 'points', 'wins', 'goal_difference', 'draws']))
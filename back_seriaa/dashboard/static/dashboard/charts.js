@@ -0,0 +1,296 @@
+// dashboard/static/dashboard/charts.js
+// Малює графіки дашбордів у браузері з /dashboard/api/charts/<name>/:
+// відповідь = {spec: {library, kind, ...}, data: {колонка: [значення]}}
+(function (global) {
+    'use strict';
+
+    function noData(element, spec) {
+        element.innerHTML = '<p>Немає даних для ' + (spec.title || element.id) + '</p>';
+    }
+
+    function title(spec) {
+        return spec.title ? {text: spec.title} : undefined;
+    }
+
+    function label(spec, column) {
+        return (spec.labels && spec.labels[column]) || column;
+    }
+
+    // ==================== PLOTLY ====================
+
+    function groupBy(values) {
+        const groups = new Map();
+        values.forEach(function (value, index) {
+            if (!groups.has(value)) groups.set(value, []);
+            groups.get(value).push(index);
+        });
+        return groups;
+    }
+
+    function pick(column, indexes) {
+        return indexes.map(function (index) { return column[index]; });
+    }
+
+    const plotlyBuilders = {
+        bar: function (spec, data, layout) {
+            layout.xaxis = Object.assign({title: {text: label(spec, spec.x)}}, layout.xaxis);
+            layout.yaxis = Object.assign({title: {text: label(spec, spec.y)}}, layout.yaxis);
+            return [{
+                type: 'bar',
+                x: data[spec.x],
+                y: data[spec.y],
+                text: data[spec.text],
+                textposition: 'auto',
+                marker: {
+                    color: data[spec.color],
+                    colorscale: spec.colorscale,
+                    showscale: true,
+                    colorbar: {title: {text: label(spec, spec.color)}},
+                },
+            }];
+        },
+
+        pie: function (spec, data, layout) {
+            layout.annotations = [{text: spec.annotation, x: 0.5, y: 0.5, font: {size: 14}, showarrow: false}];
+            return [{
+                type: 'pie',
+                labels: data[spec.names],
+                values: data[spec.values],
+                hole: spec.hole,
+                textposition: 'inside',
+                textinfo: 'percent+label',
+                hoverinfo: 'label+percent+value',
+                marker: {colors: spec.colors, line: {color: 'white', width: 2}},
+            }];
+        },
+
+        line: function (spec, data) {
+            return spec.series.map(function (name) {
+                return {
+                    type: 'scatter',
+                    mode: 'lines+markers',
+                    name: name,
+                    x: data[spec.x],
+                    y: data[name],
+                    line: {shape: 'spline'},
+                };
+            });
+        },
+
+        scatter: function (spec, data, layout) {
+            const sizes = data[spec.size];
+            const sizeref = 2 * Math.max.apply(null, sizes) / (spec.size_max * spec.size_max);
+            const traces = [];
+            groupBy(data[spec.color]).forEach(function (indexes, group) {
+                traces.push({
+                    type: 'scatter',
+                    mode: 'markers',
+                    name: group,
+                    x: pick(data[spec.x], indexes),
+                    y: pick(data[spec.y], indexes),
+                    hovertext: pick(data[spec.hover_name], indexes),
+                    marker: {size: pick(sizes, indexes), sizemode: 'area', sizeref: sizeref, opacity: spec.opacity},
+                });
+            });
+
+            layout.xaxis = {title: {text: label(spec, spec.x)}};
+            layout.yaxis = {title: {text: label(spec, spec.y)}};
+            layout.legend = {title: {text: label(spec, spec.color)}};
+            layout.shapes = [
+                {type: 'line', xref: 'paper', x0: 0, x1: 1, y0: spec.hline.value, y1: spec.hline.value,
+                 line: {dash: 'dash', color: 'gray'}},
+                {type: 'line', yref: 'paper', y0: 0, y1: 1, x0: spec.vline.value, x1: spec.vline.value,
+                 line: {dash: 'dash', color: 'gray'}},
+            ];
+            layout.annotations = [
+                {xref: 'paper', x: 1, y: spec.hline.value, text: spec.hline.text, showarrow: false, xanchor: 'right', yanchor: 'bottom'},
+                {yref: 'paper', y: 1, x: spec.vline.value, text: spec.vline.text, showarrow: false, xanchor: 'left', yanchor: 'top'},
+            ];
+            return traces;
+        },
+
+        area: function (spec, data, layout) {
+            layout.xaxis = Object.assign({title: {text: label(spec, spec.x)}}, layout.xaxis);
+            layout.yaxis = {title: {text: label(spec, spec.y)}};
+            return [{
+                type: 'scatter',
+                mode: 'lines',
+                fill: 'tozeroy',
+                x: data[spec.x],
+                y: data[spec.y],
+                fillcolor: spec.fillcolor,
+                line: Object.assign({shape: 'spline'}, spec.line),
+            }];
+        },
+
+        heatmap: function (spec, data, layout) {
+            layout.xaxis = {title: {text: ''}};
+            layout.yaxis = {title: {text: ''}, autorange: 'reversed'};
+            return [{
+                type: 'heatmap',
+                x: data.x,
+                y: data.y,
+                z: data.z,
+                colorscale: spec.colorscale,
+                texttemplate: '%{z}',
+                colorbar: {title: {text: 'Кількість'}},
+            }];
+        },
+    };
+
+    function renderPlotly(element, spec, data, options) {
+        const layout = Object.assign({title: title(spec)}, spec.layout);
+        if (options.plotlyTemplate) layout.template = options.plotlyTemplate;
+        const traces = plotlyBuilders[spec.kind](spec, data, layout);
+        return global.Plotly.newPlot(element, traces, layout, {responsive: true});
+    }
+
+    // ==================== BOKEH ====================
+
+    function bokehFigure(spec, attributes) {
+        return global.Bokeh.Plotting.figure(Object.assign({
+            title: spec.title,
+            width: spec.width,
+            height: spec.height,
+            tools: spec.tools || 'pan,wheel_zoom,box_zoom,reset,save',
+            toolbar_location: spec.toolbar_location === undefined ? 'right' : spec.toolbar_location,
+        }, attributes));
+    }
+
+    function addTooltips(figure, spec) {
+        if (spec.tooltips) figure.add_tools(new global.Bokeh.HoverTool({tooltips: spec.tooltips}));
+    }
+
+    function categoricalColors(spec, column, factors) {
+        return {field: column, transform: new global.Bokeh.CategoricalColorMapper({palette: spec.palette, factors: factors})};
+    }
+
+    const bokehBuilders = {
+        vbar: function (spec, data, source) {
+            const factors = data[spec.x];
+            const p = bokehFigure(spec, {x_range: factors});
+            p.vbar({
+                x: {field: spec.x},
+                top: {field: spec.top},
+                width: 0.7,
+                source: source,
+                line_color: spec.line_color || 'white',
+                fill_color: spec.palette ? categoricalColors(spec, spec.x, factors) : spec.fill_color,
+            });
+            if (spec.labels) {
+                p.add_layout(new global.Bokeh.LabelSet({
+                    x: {field: spec.x}, y: {field: spec.labels}, text: {field: spec.labels},
+                    level: 'glyph', x_offset: -15, y_offset: 5, source: source, text_font_size: '10pt',
+                }));
+            }
+            p.xgrid.grid_line_color = null;
+            p.y_range.start = 0;
+            p.xaxis.major_label_orientation = 45;
+            p.yaxis.axis_label = spec.y_axis_label;
+            addTooltips(p, spec);
+            return p;
+        },
+
+        hbar: function (spec, data, source) {
+            const values = data[spec.right];
+            const p = bokehFigure(spec, {y_range: data[spec.y]});
+            p.hbar({
+                y: {field: spec.y},
+                right: {field: spec.right},
+                height: 0.7,
+                source: source,
+                line_color: 'white',
+                fill_color: {field: spec.right, transform: new global.Bokeh.LinearColorMapper({
+                    palette: spec.palette, low: Math.min.apply(null, values), high: Math.max.apply(null, values),
+                })},
+            });
+            p.x_range.start = 0;
+            p.xaxis.axis_label = spec.x_axis_label;
+            p.yaxis.axis_label = spec.y_axis_label;
+            addTooltips(p, spec);
+            return p;
+        },
+
+        timeline: function (spec, data, source) {
+            const p = bokehFigure(spec, {x_axis_type: 'datetime'});
+            p.circle({x: {field: spec.x}, y: {field: spec.y}, size: 10, source: source, color: spec.color, alpha: 0.6});
+            p.line({x: {field: spec.x}, y: {field: spec.y}, source: source, line_width: 2, color: spec.color, alpha: 0.4});
+            p.xaxis.axis_label = spec.x_axis_label;
+            p.yaxis.axis_label = spec.y_axis_label;
+            addTooltips(p, spec);
+            return p;
+        },
+
+        donut: function (spec, data, source) {
+            const p = bokehFigure(spec, {
+                tools: '', toolbar_location: null,
+                x_range: new global.Bokeh.Range1d({start: -0.5, end: 1.0}),
+            });
+            p.wedge({
+                x: 0, y: 1,
+                radius: spec.radius,
+                start_angle: {field: 'start_angle'},
+                end_angle: {field: 'end_angle'},
+                line_color: 'white',
+                fill_color: categoricalColors(spec, spec.category, data[spec.category]),
+                legend_field: spec.category,
+                source: source,
+            });
+            p.axis.visible = false;
+            p.grid.grid_line_color = null;
+            addTooltips(p, spec);
+            return p;
+        },
+
+        grid: function (spec, data, source) {
+            const factors = data[spec.x];
+            const figures = spec.panels.map(function (panel) {
+                const p = bokehFigure({title: panel.title, width: spec.width, height: spec.height},
+                                      {x_range: factors, toolbar_location: null});
+                p.vbar({x: {field: spec.x}, top: {field: panel.top}, width: 0.7, source: source, color: panel.color});
+                p.xaxis.major_label_orientation = 45;
+                return p;
+            });
+            return global.Bokeh.Plotting.gridplot([figures.slice(0, 2), figures.slice(2, 4)], {toolbar_location: 'right'});
+        },
+    };
+
+    function renderBokeh(element, spec, data) {
+        const source = new global.Bokeh.ColumnDataSource({data: data});
+        const plot = bokehBuilders[spec.kind](spec, data, source);
+        return global.Bokeh.Plotting.show(plot, element);
+    }
+
+    // ==================== PUBLIC API ====================
+
+    function render(element, payload, options) {
+        const spec = payload.spec;
+        if (!payload.data) {
+            noData(element, spec);
+            return null;
+        }
+        if (spec.library === 'plotly') return renderPlotly(element, spec, payload.data, options || {});
+        return renderBokeh(element, spec, payload.data);
+    }
+
+    function load(element, options) {
+        return fetch(element.dataset.chartUrl, {credentials: 'same-origin'})
+            .then(function (response) {
+                if (!response.ok) throw new Error(response.status + ' ' + response.statusText);
+                return response.json();
+            })
+            .then(function (payload) { return render(element, payload, options); })
+            .catch(function (error) {
+                element.innerHTML = '<p>Не вдалося завантажити графік: ' + error.message + '</p>';
+            });
+    }
+
+    function renderAll(selector, options) {
+        return Promise.all(Array.prototype.map.call(
+            document.querySelectorAll(selector),
+            function (element) { return load(element, options); }
+        ));
+    }
+
+    global.DashboardCharts = {render: render, load: load, renderAll: renderAll};
+})(window);
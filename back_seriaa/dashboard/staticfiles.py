@@ -0,0 +1,85 @@
+# dashboard/staticfiles.py
+"""
+Self-hosted JS-бандли plotly.js та BokehJS.
+
+Файли беруться з встановлених пакетів plotly / bokeh і публікуються під
+STATIC_URL як dashboard/vendor/<бібліотека>-<версія>.min.js. Версія в
+імені робить файл незмінним, тому його можна кешувати назавжди
+(Cache-Control: max-age=31536000, immutable на веб-сервері після
+collectstatic), а сторінки працюють без доступу до CDN.
+"""
+import functools
+import importlib.util
+import os
+from importlib import metadata
+
+from django.contrib.staticfiles.finders import BaseFinder
+from django.core.files.storage import FileSystemStorage
+
+
+VENDOR_PREFIX = 'dashboard/vendor'
+
+# бандл: (пакет, шлях до файлу всередині пакета)
+BUNDLES = {
+    'plotly': ('plotly', ('package_data', 'plotly.min.js')),
+    'bokeh': ('bokeh', ('server', 'static', 'js', 'bokeh.min.js')),
+    # Bokeh.Plotting API для графіків, які малює браузер
+    'bokeh-api': ('bokeh', ('server', 'static', 'js', 'bokeh-api.min.js')),
+}
+
+
+@functools.lru_cache(maxsize=None)
+def vendor_files():
+    """{бандл: (ім'я з версією, абсолютний шлях)} для встановлених пакетів"""
+    files = {}
+    for bundle, (package, parts) in BUNDLES.items():
+        spec = importlib.util.find_spec(package)
+        if spec is None:
+            continue
+        source = os.path.join(spec.submodule_search_locations[0], *parts)
+        if os.path.exists(source):
+            name = f"{bundle}-{metadata.version(package)}.min.js"
+            files[bundle] = (name, source)
+    return files
+
+
+def vendor_bundle(bundle):
+    """Шлях бандла відносно STATIC_URL, для {% static %}"""
+    name, _ = vendor_files()[bundle]
+    return f"{VENDOR_PREFIX}/{name}"
+
+
+class VendorStorage(FileSystemStorage):
+    """Віддає файли з пакетів під іменами з версією"""
+
+    prefix = VENDOR_PREFIX
+
+    def __init__(self, sources):
+        super().__init__()
+        self.sources = sources
+
+    def path(self, name):
+        return self.sources[name]
+
+
+class VendorFinder(BaseFinder):
+    """Staticfiles finder для dashboard/vendor/* (runserver і collectstatic)"""
+
+    def __init__(self, *args, **kwargs):
+        self.sources = dict(vendor_files().values())
+        self.storage = VendorStorage(self.sources)
+
+    def check(self, **kwargs):
+        return []
+
+    def find(self, path, all=False):
+        prefix = f"{VENDOR_PREFIX}/"
+        name = path[len(prefix):] if path.startswith(prefix) else None
+        if name not in self.sources:
+            return []
+        match = self.sources[name]
+        return [match] if all else match
+
+    def list(self, ignore_patterns):
+        for name in self.sources:
+            yield name, self.storage
@@ -1,3 +1,658 @@
-from django.test import TestCase
+"""
+Тести дашбордів: звіти DashboardQueries і знімки, перетворення даних
+графіків, колонкові формати API, профілювання, статика та ETag графіків.
 
-# Create your tests here.
+    python manage.py test dashboard
+
+Регресійні тести планів запитів DashboardQueries (DashboardQueryPlanTests).
+
+Кожен із шести звітів виконується на засіяній лізі (main.testing.seed_league)
+після ANALYZE; EXPLAIN зводиться до доступу до кожної таблиці (пошук за
+індексом / прохід по індексу / повний прохід, індекс, оцінка рядків) і
+порівнюється з записаним у query_plans.json для поточної СУБД. Тест падає,
+якщо таблиця, яку читали за індексом, читається повністю, індекс більше не
+використовується, оцінка рядків зросла в ROW_GROWTH разів, з'явилось
+сортування / тимчасова таблиця або змінилась кількість запитів.
+
+Оцінку рядків дає лише EXPLAIN FORMAT=JSON у MySQL; EXPLAIN QUERY PLAN
+у SQLite її не має (rows: null), тож для SQLite перевіряються доступ,
+індекси, кроки і кількість запитів, а зростання рядків - ні. Записаний
+план є лише для SQLite: на MySQL тест пропускається, доки його не
+записати на сервері MySQL (SERIAA_DB_ENGINE=mysql) командою нижче.
+
+Записати плани заново (після свідомої зміни запиту чи схеми):
+    SERIAA_RECORD_QUERY_PLANS=1 python manage.py test dashboard
+"""
+import io
+import json
+import marshal
+import os
+import re
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import AnonymousUser, User
+from django.contrib.staticfiles import finders
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from main.models import Match, Team
+from main.signals import rows_updated
+from main.testing import create_api_user, seed_league
+
+from . import profiling, transforms
+from .league_snapshot import SnapshotQueries, export_league_snapshot
+from .models import ChartSnapshot
+from .precompute import build_chart_spec, current_data_version, data_counter, load_snapshot_raw, load_snapshots
+from .queries import DashboardQueries, shared_query_results
+from .renderers import ArrowStreamRenderer, ColumnarRenderer, ParquetRenderer
+from .staticfiles import BUNDLES, VendorFinder, vendor_bundle, vendor_files
+
+# Репліка - інше з'єднання і не бачить рядків, які TestCase не закомітив:
+# запити /dashboard/ у тестах читають з 'default'
+read_from_default = override_settings(REPLICA_READ_PATHS=())
+
+BASELINE = Path(__file__).with_name('query_plans.json')
+
+QUERIES = [
+    'teams_best_goal_difference',
+    'avg_player_age_by_team',
+    'team_wins_by_year',
+    'top_players_by_contributions',
+    'matches_by_month',
+    'coaches_by_country',
+]
+
+# Від гіршого до кращого доступу до таблиці
+ACCESS_RANK = {'lookup': 0, 'index_scan': 1, 'full_scan': 2}
+# У скільки разів може зрости оцінка рядків (і мінімальний приріст)
+ROW_GROWTH = 10
+MIN_ROW_GROWTH = 100
+
+SQLITE_STEP = re.compile(
+    r'^(SCAN|SEARCH) (?:TABLE )?(\S+)(?: AS \S+)?'
+    r'(?: USING (?:(?:COVERING )?INDEX (\S+)|(INTEGER PRIMARY KEY|PRIMARY KEY)))?'
+)
+MYSQL_LOOKUPS = {'system', 'const', 'eq_ref', 'ref', 'ref_or_null', 'range', 'index_merge',
+                 'fulltext', 'unique_subquery', 'index_subquery'}
+
+
+def add_table(tables, name, access):
+    """Таблиця, що зустрічається в плані кілька разів, отримує суфікс #2, #3..."""
+    key, n = name, 1
+    while key in tables:
+        n += 1
+        key = f"{name}#{n}"
+    tables[key] = access
+
+
+def sqlite_plan(queryset):
+    lines = [re.sub(r'^\d+ \d+ \d+ ', '', line) for line in queryset.explain().splitlines()]
+    tables, steps = {}, []
+    for line in lines:
+        match = SQLITE_STEP.match(line)
+        if match:
+            kind, table, index, primary = match.groups()
+            if kind == 'SEARCH':
+                access = 'lookup'
+            else:
+                access = 'index_scan' if index else 'full_scan'
+            add_table(tables, table, {
+                'access': access, 'index': index or ('PRIMARY' if primary else None), 'rows': None,
+            })
+        elif line.startswith('USE TEMP B-TREE'):
+            steps.append(line)
+    return {'tables': tables, 'steps': steps, 'plan': lines}
+
+
+def mysql_plan(queryset):
+    plan = json.loads(queryset.explain(format='json'))
+    tables, steps = {}, []
+
+    def walk(node):
+        if isinstance(node, list):
+            for item in node:
+                walk(item)
+        elif isinstance(node, dict):
+            if node.get('using_filesort'):
+                steps.append('filesort')
+            if node.get('using_temporary_table'):
+                steps.append('temporary table')
+            table = node.get('table')
+            if isinstance(table, dict) and 'table_name' in table:
+                access_type = table.get('access_type')
+                if access_type == 'ALL':
+                    access = 'full_scan'
+                elif access_type in MYSQL_LOOKUPS:
+                    access = 'lookup'
+                else:
+                    access = 'index_scan'
+                add_table(tables, table['table_name'], {
+                    'access': access,
+                    'index': table.get('key'),
+                    'rows': table.get('rows_examined_per_scan', table.get('rows')),
+                })
+            for key, value in node.items():
+                if key != 'table':
+                    walk(value)
+            if isinstance(table, dict):
+                walk({key: value for key, value in table.items() if key != 'table_name'})
+
+    walk(plan)
+    return {'tables': tables, 'steps': steps, 'plan': plan}
+
+
+PLANS = {'sqlite': sqlite_plan, 'mysql': mysql_plan}
+
+
+def regressions(expected, actual):
+    """Чим план actual гірший за записаний expected"""
+    problems = []
+    for table, before in expected['tables'].items():
+        after = actual['tables'].get(table)
+        if after is None:
+            continue
+        if ACCESS_RANK[after['access']] > ACCESS_RANK[before['access']]:
+            problems.append(f"{table}: {before['access']} -> {after['access']}")
+        if before['index'] and after['index'] != before['index']:
+            problems.append(f"{table}: index {before['index']} is no longer used ({after['index']})")
+        # None - СУБД не дає оцінки (SQLite)
+        if before['rows'] is not None and after['rows'] is not None:
+            if after['rows'] > before['rows'] * ROW_GROWTH and after['rows'] - before['rows'] >= MIN_ROW_GROWTH:
+                problems.append(f"{table}: estimated rows {before['rows']} -> {after['rows']}")
+    for table, after in actual['tables'].items():
+        if table not in expected['tables'] and after['access'] == 'full_scan':
+            problems.append(f"{table}: new full scan")
+    new_steps = list(actual['steps'])
+    for step in expected['steps']:
+        if step in new_steps:
+            new_steps.remove(step)
+    problems.extend(f"new step: {step}" for step in new_steps)
+    if actual['queries'] != expected['queries']:
+        problems.append(f"queries: {expected['queries']} -> {actual['queries']}")
+    return problems
+
+
+def analyze():
+    """Свіжа статистика для планувальника"""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'mysql':
+            cursor.execute('ANALYZE TABLE ' + ', '.join(
+                connection.ops.quote_name(table) for table in connection.introspection.table_names()
+            ))
+            cursor.fetchall()
+        else:
+            cursor.execute('ANALYZE')
+
+
+class DashboardQueryPlanTests(TransactionTestCase):
+    # ANALYZE TABLE у MySQL робить неявний COMMIT, тому без обгортки в транзакцію
+
+    def test_query_plans(self):
+        vendor = connection.vendor
+        if vendor not in PLANS:
+            self.skipTest(f"No EXPLAIN parser for {vendor}")
+        record = os.environ.get('SERIAA_RECORD_QUERY_PLANS') == '1'
+        baselines = json.loads(BASELINE.read_text()) if BASELINE.exists() else {}
+        if not record and vendor not in baselines:
+            self.skipTest(f"No recorded plans for {vendor}, run with SERIAA_RECORD_QUERY_PLANS=1")
+
+        seed_league()
+        analyze()
+
+        plans = {}
+        for name in QUERIES:
+            with self.subTest(query=name):
+                plan = PLANS[vendor](getattr(DashboardQueries, name)())
+                with CaptureQueriesContext(connection) as queries:
+                    DashboardQueries.to_dataframe(getattr(DashboardQueries, name)())
+                plan['queries'] = len(queries)
+                plans[name] = plan
+                if not record:
+                    expected = baselines[vendor][name]
+                    problems = regressions(expected, plan)
+                    self.assertFalse(problems, "\n".join(
+                        [f"{name} plan regressed:", *problems, "plan now:",
+                         json.dumps(plan['plan'], indent=2, ensure_ascii=False)]
+                    ))
+
+        if record:
+            baselines[vendor] = plans
+            BASELINE.write_text(json.dumps(baselines, indent=2, ensure_ascii=False, sort_keys=True) + "\n")
+
+
+class SnapshotVersionTests(TestCase):
+    """Знімок, зібраний до масового UPDATE, не віддається"""
+
+    def test_rows_updated_makes_snapshots_stale(self):
+        snapshot = {'payload': json.dumps({'rows': []}), 'data_version': current_data_version()}
+        ChartSnapshot.objects.create(name='api:top_players', **snapshot)
+        self.assertEqual(load_snapshots('api', ['top_players']), {'top_players': {'rows': []}})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            rows_updated.send(sender=Match, using='default')
+
+        self.assertIsNone(load_snapshots('api', ['top_players']))
+        self.assertIsNone(load_snapshot_raw('api', 'top_players'))
+
+    def test_old_version_format_is_stale(self):
+        ChartSnapshot.objects.create(name='api:top_players', payload='{}', data_version='9f' * 20)
+        self.assertIsNone(load_snapshots('api', ['top_players']))
+
+
+class SnapshotQueriesTests(TestCase):
+    """SnapshotQueries зі знімка дає ті самі DataFrame-и, що й DashboardQueries"""
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_league(teams=6, players_per_team=8, matches=40, years=5, seed=7)
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+
+    @staticmethod
+    def normalized(df):
+        # Порядок рівних за ключем сортування рядків у звітах не визначений
+        df = df.sort_values(list(df.columns)).reset_index(drop=True)
+        return df.astype({col: 'float64' for col in df.select_dtypes('number').columns})
+
+    def test_same_frames_as_live_queries(self):
+        export_league_snapshot(self.directory)
+        snapshot = SnapshotQueries(self.directory)
+        self.assertEqual(snapshot.manifest['data_version'], current_data_version())
+
+        for query in QUERIES:
+            with self.subTest(query=query):
+                live = DashboardQueries.to_dataframe(getattr(DashboardQueries, query)())
+                frame = snapshot.to_dataframe(getattr(snapshot, query)())
+                self.assertFalse(live.empty)
+                self.assertEqual(list(frame.columns), list(live.columns))
+                pd.testing.assert_frame_equal(self.normalized(frame), self.normalized(live))
+
+
+class TransformsTests(SimpleTestCase):
+    """dashboard.transforms дають ті самі числа, що й попередній код на pandas"""
+
+    def test_wedge_angles_match_pandas(self):
+        counts = pd.Series([120, 45, 300, 7, 45, 88])
+        # Кути секторів donut, як їх рахував BokehCharts до transforms
+        angle = counts / counts.sum() * 2 * np.pi
+        start_angle = [0] + list(angle.cumsum()[:-1])
+        end_angle = angle.cumsum()
+
+        share, start, end = transforms.wedge_angles(counts)
+        np.testing.assert_allclose(share * 2 * np.pi, angle)
+        np.testing.assert_allclose(start, start_angle)
+        np.testing.assert_allclose(end, end_angle)
+        self.assertAlmostEqual(end[-1], 2 * np.pi)
+        np.testing.assert_array_equal(start[1:], end[:-1])
+
+    def test_wedge_angles_of_zero_total(self):
+        share, start, end = transforms.wedge_angles([0, 0, 0])
+        np.testing.assert_array_equal(share, [0, 0, 0])
+        np.testing.assert_array_equal(start, [0, 0, 0])
+        np.testing.assert_array_equal(end, [0, 0, 0])
+
+    def test_equal_width_bins_match_pd_cut(self):
+        rnd = np.random.default_rng(7)
+        cases = [
+            rnd.uniform(1, 30, 500),
+            np.array([1.0, 8.0, 15.0, 16.0, 30.0]),
+            np.array([np.nan, 3.0, np.nan, 9.0, 4.5]),
+            np.array([5.0, 5.0]),
+            np.array([5.0]),
+            np.array([0.0, 0.0, 0.0]),
+            np.array([-2.5, np.nan, -2.5]),
+        ]
+        for values in cases:
+            for bins in (1, 2, 3, 4):
+                with self.subTest(values=values[:5], bins=bins):
+                    expected = pd.cut(values, bins=bins).codes
+                    np.testing.assert_array_equal(transforms.equal_width_bins(values, bins), expected)
+
+    def test_equal_values_fall_into_middle_bin(self):
+        np.testing.assert_array_equal(transforms.equal_width_bins([5.0, 5.0], 3), [1, 1])
+        np.testing.assert_array_equal(transforms.equal_width_bins([12.0], 3), [1])
+
+    def test_all_nan_values(self):
+        np.testing.assert_array_equal(transforms.equal_width_bins([np.nan, np.nan], 3), [-1, -1])
+
+    def test_crosstab_matches_pivot_table(self):
+        df = pd.DataFrame({
+            'country': ['IT', 'FR', 'IT', None, 'ES', 'FR', 'IT'],
+            'level': [0, 2, 0, 1, 1, -1, 2],
+            'count': [3, 1, 2, 5, 4, 7, 1],
+        })
+        labels = ['low', 'mid', 'high']
+        rows, cols, matrix = transforms.crosstab(df['country'], df['level'], df['count'], col_labels=labels)
+
+        valid = df[df['level'] >= 0]
+        expected = valid.pivot_table(
+            index='country', columns='level', values='count', aggfunc='sum'
+        ).reindex(columns=range(len(labels))).fillna(0)
+        self.assertEqual(list(rows), list(expected.index))
+        self.assertEqual(list(cols), labels)
+        np.testing.assert_array_equal(matrix, expected.to_numpy())
+
+    def test_cumulative_top_matches_pivot_cumsum(self):
+        df = pd.DataFrame({
+            'year': [2001, 2001, 2002, 2002, 2003, 2003, 2003],
+            'team': ['Inter', 'Milan', 'Inter', 'Roma', 'Juventus', 'Milan', 'Inter'],
+            'wins': [1, 2, 1, 1, 3, 2, 3],
+        })
+        years, teams, cumulative = transforms.cumulative_top(df['year'], df['team'], df['wins'], top=2)
+
+        pivot_df = df.pivot_table(index='year', columns='team', values='wins', aggfunc='sum').fillna(0).cumsum()
+        top_teams = pivot_df.iloc[-1].sort_values(ascending=False).head(2).index
+        self.assertEqual(list(years), list(pivot_df.index))
+        self.assertEqual(list(teams), list(top_teams))
+        np.testing.assert_array_equal(cumulative, pivot_df[top_teams].to_numpy())
+
+
+@read_from_default
+class ColumnarRendererTests(TestCase):
+    """/dashboard/api/* в Arrow і Parquet: вибір формату, вміст і помилки"""
+
+    url = '/dashboard/api/matches/by-month/'
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_league(teams=4, players_per_team=5, matches=30, years=3, seed=3)
+        cls.user = create_api_user('api')
+
+    def setUp(self):
+        self.client.force_login(self.user)
+        self.expected = DashboardQueries.to_dataframe(DashboardQueries.matches_by_month())
+
+    @staticmethod
+    def read_arrow(response):
+        return pa.ipc.open_stream(response.content).read_pandas()
+
+    @staticmethod
+    def read_parquet(response):
+        return pd.read_parquet(io.BytesIO(response.content))
+
+    def assertSameFrame(self, df):
+        self.assertFalse(df.empty)
+        pd.testing.assert_frame_equal(df, self.expected)
+
+    def test_arrow_by_accept_header(self):
+        response = self.client.get(self.url, HTTP_ACCEPT=ArrowStreamRenderer.media_type)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], ArrowStreamRenderer.media_type)
+        self.assertSameFrame(self.read_arrow(response))
+
+    def test_parquet_by_accept_header(self):
+        response = self.client.get(self.url, HTTP_ACCEPT=ParquetRenderer.media_type)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], ParquetRenderer.media_type)
+        self.assertSameFrame(self.read_parquet(response))
+
+    def test_format_query_parameter(self):
+        for renderer, read in ((ArrowStreamRenderer, self.read_arrow), (ParquetRenderer, self.read_parquet)):
+            with self.subTest(format=renderer.format):
+                response = self.client.get(self.url, {'format': renderer.format})
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response['Content-Type'], renderer.media_type)
+                self.assertSameFrame(read(response))
+
+    def test_json_is_still_default(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertEqual(len(response.json()['data']), len(self.expected))
+
+    def test_error_is_one_row_table(self):
+        self.client.logout()
+        for renderer, read in ((ArrowStreamRenderer, self.read_arrow), (ParquetRenderer, self.read_parquet)):
+            with self.subTest(format=renderer.format):
+                response = self.client.get(self.url, {'format': renderer.format})
+                self.assertEqual(response.status_code, 401)
+                self.assertEqual(response['Content-Type'], renderer.media_type)
+                df = read(response)
+                self.assertEqual(list(df.columns), ['detail'])
+                self.assertEqual(df['detail'].tolist(), ['Authentication credentials were not provided.'])
+
+    def test_write_is_abstract(self):
+        with self.assertRaises(TypeError):
+            ColumnarRenderer()
+
+
+class SharedQueryResultsTests(TestCase):
+    """У межах shared_query_results звіти такі самі, як окремі запити"""
+
+    CALLS = [
+        ('frame', 'avg_player_age_by_team'),
+        ('frame', 'team_wins_by_year'),
+        ('frame', 'matches_by_month'),
+        ('frame', 'coaches_by_country'),
+        ('teams_best_goal_difference_frame', 0),
+        ('teams_best_goal_difference_frame', 30),
+        ('teams_best_goal_difference_frame', 10 ** 6),
+        ('top_players_frame', 25),
+        ('top_players_frame', 10),
+        ('top_players_frame', 0),
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_league(teams=8, players_per_team=6, matches=60, years=5, seed=11)
+
+    def test_scoped_frames_equal_unscoped(self):
+        unscoped = [getattr(DashboardQueries, method)(arg) for method, arg in self.CALLS]
+        self.assertFalse(unscoped[4].empty)
+        self.assertEqual(unscoped[6].shape, (0, 0))
+
+        # Прямий і зворотний порядок: вужчий варіант першим і після ширшого
+        for calls in (list(enumerate(self.CALLS)), list(enumerate(self.CALLS))[::-1]):
+            with shared_query_results():
+                for number, (method, arg) in calls:
+                    with self.subTest(method=method, arg=arg, reverse=calls[0][0] != 0):
+                        scoped = getattr(DashboardQueries, method)(arg)
+                        pd.testing.assert_frame_equal(scoped, unscoped[number])
+
+    def test_empty_table_gives_empty_frame(self):
+        Team.objects.update(goal_difference=0)
+        with shared_query_results():
+            self.assertEqual(DashboardQueries.teams_best_goal_difference_frame(50).shape, (0, 0))
+            self.assertEqual(DashboardQueries.teams_best_goal_difference_frame(0).shape, (0, 0))
+
+
+class DataVersionTests(TestCase):
+    """Лічильник DataVersion збільшується лише після коміту запису"""
+
+    def create_team(self):
+        return Team.objects.create(team_name='Inter', points=0, wins=0, loses=0, draws=0, goal_difference=0)
+
+    def test_bumped_after_commit(self):
+        before = data_counter()
+        with self.captureOnCommitCallbacks(execute=True):
+            team = self.create_team()
+            team.delete()
+            # До коміту рядок DataVersion не змінюється (і не блокується)
+            self.assertEqual(data_counter(), before)
+        self.assertEqual(data_counter(), before + 2)
+
+    def test_rollback_keeps_counter(self):
+        before = data_counter()
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    self.create_team()
+                    raise ValueError
+            except ValueError:
+                pass
+        self.assertEqual(data_counter(), before)
+
+
+@read_from_default
+class ProfilingMiddlewareTests(TestCase):
+    """?profile=1 / ?profile=cprofile - лише для staff і з DASHBOARD_PROFILING"""
+
+    url = '/dashboard/api/matches/by-month/'
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_league(teams=4, players_per_team=2, matches=10, years=2, seed=5)
+        cls.staff = User.objects.create_user('staff', password='staff', is_staff=True)
+        cls.user = create_api_user('api')
+
+    def get(self, user=None, **params):
+        if user is not None:
+            self.client.force_login(user)
+        return self.client.get(self.url, params)
+
+    def assertNotProfiled(self, response):
+        self.assertNotIn('Content-Disposition', response)
+        self.assertNotIn('total_ms', response.json())
+
+    def test_inactive_without_parameter(self):
+        for params in ({}, {'profile': '0'}, {'profile': 'yes'}):
+            with self.subTest(params=params):
+                response = self.get(self.staff, **params)
+                self.assertEqual(response.status_code, 200)
+                self.assertIn('data', response.json())
+                self.assertNotProfiled(response)
+
+    @override_settings(DASHBOARD_PROFILING=False)
+    def test_inactive_when_disabled(self):
+        response = self.get(self.staff, profile='1')
+        self.assertIn('data', response.json())
+        self.assertNotProfiled(response)
+
+    def test_breakdown_for_staff(self):
+        response = self.get(self.staff, profile='1')
+        self.assertEqual(response.status_code, 200)
+        profile = response.json()
+        self.assertEqual(profile['path'], f'{self.url}?profile=1')
+        self.assertEqual(profile['status'], 200)
+        self.assertGreater(profile['sql']['queries'], 0)
+        self.assertIn('query', profile['stages'])
+        self.assertFalse(profiling.active())
+
+    def test_cprofile_dump_for_staff(self):
+        response = self.get(self.staff, profile='cprofile')
+        self.assertEqual(response['Content-Type'], 'application/octet-stream')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="profile.prof"')
+        self.assertIsInstance(marshal.loads(response.content), dict)
+
+    def test_never_for_non_staff_or_anonymous(self):
+        response = self.get(self.user, profile='1')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotProfiled(response)
+
+        self.client.logout()
+        response = self.get(profile='cprofile')
+        self.assertEqual(response.status_code, 401)
+        self.assertNotProfiled(response)
+        # Публічна сторінка: анонім отримує звичайну відповідь
+        response = self.client.get('/dashboard/api/charts/matches_timeline/', {'profile': '1'})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotProfiled(response)
+
+    def test_async_requests(self):
+        async def view(request):
+            return HttpResponse('ok')
+
+        middleware = profiling.ProfilingMiddleware(view)
+        request = RequestFactory().get(self.url, {'profile': '1'})
+        for user, profiled in ((AnonymousUser(), False), (self.user, False), (self.staff, True)):
+            with self.subTest(user=str(user)):
+                request.user = user
+                response = async_to_sync(middleware)(request)
+                self.assertEqual(response.content != b'ok', profiled)
+
+
+class VendorFinderTests(SimpleTestCase):
+    """plotly.js / BokehJS зі встановлених пакетів під іменами з версією"""
+
+    def test_vendored_bundles_are_found(self):
+        self.assertEqual(set(vendor_files()), set(BUNDLES))
+        for bundle, (name, source) in vendor_files().items():
+            with self.subTest(bundle=bundle):
+                path = vendor_bundle(bundle)
+                self.assertEqual(path, f"dashboard/vendor/{name}")
+                self.assertRegex(name, rf"^{bundle}-\d+\.\d+\.\d+.*\.min\.js$")
+                self.assertEqual(finders.find(path), source)
+                self.assertEqual(VendorFinder().find(path, all=True), [source])
+
+    def test_unknown_paths(self):
+        finder = VendorFinder()
+        for path in ('dashboard/vendor/plotly.min.js', 'plotly-1.0.0.min.js', 'dashboard/vendor/'):
+            with self.subTest(path=path):
+                self.assertEqual(finder.find(path), [])
+                self.assertEqual(finder.find(path, all=True), [])
+
+    def test_collectstatic(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root, ignore_errors=True)
+        with override_settings(STATIC_ROOT=root, STATICFILES_FINDERS=['dashboard.staticfiles.VendorFinder']):
+            call_command('collectstatic', interactive=False, verbosity=0)
+        for name, source in vendor_files().values():
+            with self.subTest(name=name):
+                copied = Path(root, 'dashboard', 'vendor', name)
+                self.assertEqual(copied.read_bytes(), Path(source).read_bytes())
+
+
+@read_from_default
+class ChartSpecETagTests(TestCase):
+    """ChartSpecAPI: ETag знімка, 304 на If-None-Match, новий ETag після запису"""
+
+    name = 'teams_bar'
+    url = f'/dashboard/api/charts/{name}/'
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_league(teams=4, players_per_team=2, matches=6, years=2, seed=9)
+
+    def store_snapshot(self):
+        ChartSnapshot.objects.update_or_create(name=f'spec:{self.name}', defaults={
+            'payload': json.dumps(build_chart_spec(self.name)), 'data_version': current_data_version(),
+        })
+
+    def test_etag_and_not_modified(self):
+        self.store_snapshot()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        self.assertRegex(etag, rf'^"{self.name}-.+"$')
+        self.assertIn('max-age=60', response['Cache-Control'])
+        self.assertEqual(response.json(), build_chart_spec(self.name))
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(response.content, b'')
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH='"other"')
+        self.assertEqual(response.status_code, 200)
+
+    def test_etag_changes_after_data_version_bump(self):
+        self.store_snapshot()
+        etag = self.client.get(self.url)['ETag']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Team.objects.filter(pk=Team.objects.order_by('pk').first().pk).update(points=0)
+            rows_updated.send(sender=Team, using='default')
+
+        # Знімок застарів: графік збирається наживо, без ETag
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('ETag', response)
+
+        self.store_snapshot()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+    def test_unknown_chart(self):
+        self.assertEqual(self.client.get('/dashboard/api/charts/nope/').status_code, 404)
@@ -0,0 +1,166 @@
+# dashboard/transforms.py
+"""
+Спільна підготовка даних для 12 графіків (PlotlyCharts, BokehCharts, specs).
+
+Частки, кути секторів, кумулятивні ряди, біни та зведені таблиці
+рахуються одним проходом NumPy по масивах колонок, без pivot_table і
+Python-циклів. column_data() віддає колонки як numpy-масиви, тому
+ColumnDataSource та json_item беруть їх без проміжних копій DataFrame.
+"""
+import numpy as np
+import pandas as pd
+
+from .profiling import timed
+
+
+@timed('transform')
+def column_data(df, names):
+    """{колонка: numpy-масив} лише для потрібних колонок (для ColumnDataSource)"""
+    return {name: df[name].to_numpy() for name in names}
+
+
+@timed('transform')
+def as_lists(data):
+    """{колонка: масив} -> {колонка: список} для JSON-специфікацій"""
+    return {name: np.asarray(values).tolist() for name, values in data.items()}
+
+
+@timed('transform')
+def top_by(df, column, n, ascending=False):
+    """Перші n рядків за значенням колонки (стабільно для однакових значень)"""
+    if ascending:
+        return df.nsmallest(n, column, keep='first')
+    return df.nlargest(n, column, keep='first')
+
+
+@timed('transform')
+def shares(values):
+    """Частка кожного значення від суми (нулі, якщо сума 0)"""
+    values = np.asarray(values, dtype=float)
+    total = values.sum()
+    if not total:
+        return np.zeros_like(values)
+    return values / total
+
+
+@timed('transform')
+def wedge_angles(values):
+    """(частка, початковий кут, кінцевий кут) секторів donut/pie у радіанах"""
+    share = shares(values)
+    end_angle = np.cumsum(share) * (2 * np.pi)
+    start_angle = np.empty_like(end_angle)
+    start_angle[:1] = 0.0
+    start_angle[1:] = end_angle[:-1]
+    return share, start_angle, end_angle
+
+
+@timed('transform')
+def cycle_palette(palette, n):
+    """Палітра рівно на n категорій (кольори повторюються по колу)"""
+    return np.resize(np.asarray(palette), n).tolist()
+
+
+@timed('transform')
+def equal_width_bins(values, bins):
+    """
+    Номер інтервалу (0..bins-1) для кожного значення, як pd.cut(values, bins):
+    рівні інтервали між min і max, праві межі включно. NaN -> -1.
+    Якщо всі значення однакові, межі розширюються на 0.1% в обидва боки
+    (як у pd.cut), і значення потрапляють у середній інтервал
+    """
+    values = np.asarray(values, dtype=float)
+    codes = np.full(values.shape, -1, dtype=np.intp)
+    valid = ~np.isnan(values)
+    if valid.any():
+        low, high = values[valid].min(), values[valid].max()
+        if low == high:
+            spread = 0.001 * abs(low) if low else 0.001
+            low, high = low - spread, high + spread
+        edges = np.linspace(low, high, bins + 1)
+        codes[valid] = np.searchsorted(edges[1:-1], values[valid], side='left')
+    return codes
+
+
+def _codes(keys):
+    """
+    (номери, унікальні мітки у відсортованому порядку); None/NaN -> -1.
+    Сортуються лише унікальні мітки, а не всі ключі
+    """
+    codes, labels = pd.factorize(keys)
+    labels = np.asarray(labels)
+    order = np.argsort(labels, kind='stable')
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    return np.where(codes >= 0, rank[codes], -1), labels[order]
+
+
+def _sum_cells(row_codes, col_codes, values, shape):
+    """Суми values по клітинках (рядок, колонка) одним bincount по плоскому індексу"""
+    cells = np.bincount(
+        row_codes * shape[1] + col_codes, weights=values, minlength=shape[0] * shape[1]
+    )
+    return cells.reshape(shape).astype(values.dtype, copy=False)
+
+
+@timed('transform')
+def crosstab(rows, cols, values, col_labels=None):
+    """
+    Зведена таблиця сум: (мітки рядків, мітки колонок, матриця).
+
+    Еквівалент pivot_table(aggfunc='sum').fillna(0): ключі кодуються
+    через factorize, суми рахуються одним bincount. Якщо передано
+    col_labels, cols вже є номерами колонок (наприклад, з equal_width_bins),
+    і порожні колонки зберігаються.
+    """
+    row_codes, row_labels = _codes(rows)
+    if col_labels is None:
+        col_codes, col_labels = _codes(cols)
+    else:
+        col_codes = np.asarray(cols)
+
+    values = np.asarray(values)
+    valid = (row_codes >= 0) & (col_codes >= 0)
+    matrix = _sum_cells(
+        row_codes[valid], col_codes[valid], values[valid], (len(row_labels), len(col_labels))
+    )
+    return row_labels, np.asarray(col_labels), matrix
+
+
+@timed('transform')
+def cumulative_top(rows, cols, values, top):
+    """
+    Кумулятивні суми по рядках (напр. роках) для top колонок (напр. команд)
+    з найбільшим підсумком: (мітки рядків, мітки колонок, матриця).
+
+    Останній рядок кумулятивної суми дорівнює загальному підсумку колонки,
+    тому top колонок вибирається через bincount ще до побудови матриці:
+    вона займає rows x top, а не rows x всі колонки.
+    """
+    row_codes, row_labels = _codes(rows)
+    col_codes, col_labels = _codes(cols)
+    values = np.asarray(values)
+    valid = (row_codes >= 0) & (col_codes >= 0)
+
+    totals = np.bincount(col_codes[valid], weights=values[valid], minlength=len(col_labels))
+    chosen = np.argsort(-totals, kind='stable')[:top]
+    position = np.full(len(col_labels), -1, dtype=np.intp)
+    position[chosen] = np.arange(len(chosen))
+
+    keep = valid & (position[col_codes] >= 0)
+    matrix = _sum_cells(
+        row_codes[keep], position[col_codes[keep]], values[keep], (len(row_labels), len(chosen))
+    )
+    return row_labels, col_labels[chosen], np.cumsum(matrix, axis=0)
+
+
+@timed('transform')
+def sort_rows_by_total(row_labels, matrix):
+    """Рядки зведеної таблиці за спаданням суми"""
+    order = np.argsort(-matrix.sum(axis=1), kind='stable')
+    return row_labels[order], matrix[order]
+
+
+@timed('transform')
+def epoch_ms(dates):
+    """Дати -> мілісекунди epoch (формат datetime-осі BokehJS)"""
+    return pd.to_datetime(np.asarray(dates)).to_numpy(dtype='datetime64[ms]').astype(np.int64)
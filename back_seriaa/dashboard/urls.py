@@ -20,6 +20,10 @@ urlpatterns = [
     path('api/coaches/by-country/', views.CoachesByCountryAPI.as_view(), 
          name='api_coaches_by_country'),
     
+    # Дані + специфікація графіка для рендерингу в браузері
+    path('api/charts/<str:name>/', views.ChartSpecAPI.as_view(),
+         name='api_chart_spec'),
+    
     # Дашборди
     path('plotly/', views.plotly_dashboard, name='plotly_dashboard'),
     path('bokeh/', views.bokeh_dashboard, name='bokeh_dashboard'),
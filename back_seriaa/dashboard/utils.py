@@ -1,6 +1,8 @@
 # dashboard/utils.py
 import plotly.graph_objects as go
 import plotly.express as px
+import plotly.io as pio
+from plotly.io.json import to_json_plotly
 from bokeh.plotting import figure, output_file, show, save
 from bokeh.models import ColumnDataSource, HoverTool, LabelSet
 from bokeh.transform import factor_cmap, linear_cmap
@@ -11,7 +13,35 @@ from bokeh.models import ColorBar, LinearColorMapper
 import pandas as pd
 import numpy as np
 from datetime import datetime
+from . import profiling
 from .queries import DashboardQueries
+from .transforms import (
+    column_data, top_by, wedge_angles, cycle_palette,
+    cumulative_top, equal_width_bins, crosstab, sort_rows_by_total
+)
+
+
+# Як у django json_script: JSON можна вставляти прямо в <script>
+_JSON_SCRIPT_ESCAPES = {ord('<'): '\\u003C', ord('>'): '\\u003E', ord('&'): '\\u0026'}
+
+
+@profiling.timed('serialize')
+def plotly_spec(fig):
+    """
+    Компактна JSON-специфікація фігури для Plotly.newPlot.
+
+    Шаблон оформлення (layout.template, ~6 КБ) вирізається: він однаковий
+    для всіх графіків і передається на сторінку один раз (plotly_template).
+    """
+    spec = fig.to_plotly_json()
+    spec['layout'].pop('template', None)
+    return to_json_plotly(spec).translate(_JSON_SCRIPT_ESCAPES)
+
+
+def plotly_template():
+    """Спільний шаблон оформлення Plotly у вигляді JSON"""
+    template = pio.templates[pio.templates.default]
+    return to_json_plotly(template.to_plotly_json()).translate(_JSON_SCRIPT_ESCAPES)
 
 
 class PlotlyCharts:
@@ -23,8 +53,7 @@ class PlotlyCharts:
         
         """1. Стовпчикова діаграма: команди з найкращою різницею голів"""
         
-        queryset = DashboardQueries.teams_best_goal_difference(min_points=30)
-        df = DashboardQueries.to_dataframe(queryset)
+        df = DashboardQueries.teams_best_goal_difference_frame(min_points=30)
         
         fig = px.bar(
             df, 
@@ -44,15 +73,14 @@ class PlotlyCharts:
             hovermode='x unified'
         )
         
-        return fig.to_html(full_html=False)
+        return plotly_spec(fig)
     
     @staticmethod
     def create_age_pie_chart():
         
         """2. Кругова діаграма: середній вік по командах"""
         
-        queryset = DashboardQueries.avg_player_age_by_team()
-        df = DashboardQueries.to_dataframe(queryset)
+        df = DashboardQueries.frame('avg_player_age_by_team')
         
         if df.empty:
             df = pd.DataFrame({
@@ -88,25 +116,23 @@ class PlotlyCharts:
             )]
         )
         
-        return fig.to_html(full_html=False)
+        return plotly_spec(fig)
     
     @staticmethod
     def create_wins_line_chart():
         
         """3. Лінійний графік: перемоги по роках"""
         
-        queryset = DashboardQueries.team_wins_by_year()
-        df = DashboardQueries.to_dataframe(queryset)
-        
-        pivot_df = df.pivot_table(
-            index='year', 
-            columns='win_team__team_name', 
-            values='win_count', 
-            aggfunc='sum'
-        ).fillna(0).cumsum()
+        df = DashboardQueries.frame('team_wins_by_year')
         
-        top_teams = pivot_df.iloc[-1].sort_values(ascending=False).head(5).index
-        pivot_df = pivot_df[top_teams]
+        years, top_teams, cumulative = cumulative_top(
+            df['year'], df['win_team__team_name'], df['win_count'], top=5
+        )
+        pivot_df = pd.DataFrame(
+            cumulative,
+            index=pd.Index(years, name='year'),
+            columns=pd.Index(top_teams, name='win_team__team_name')
+        )
         
         fig = px.line(
             pivot_df,
@@ -125,15 +151,14 @@ class PlotlyCharts:
             plot_bgcolor='rgba(250, 250, 250, 0.9)'
         )
         
-        return fig.to_html(full_html=False)
+        return plotly_spec(fig)
     
     @staticmethod
     def create_players_scatter():
         
         """4. Scatter plot: гравці (голи vs асисти)"""
         
-        queryset = DashboardQueries.top_players_by_contributions(25)
-        df = DashboardQueries.to_dataframe(queryset)
+        df = DashboardQueries.top_players_frame(25)
         
         fig = px.scatter(
             df,
@@ -175,15 +200,14 @@ class PlotlyCharts:
             hoverlabel=dict(bgcolor="white", font_size=12)
         )
         
-        return fig.to_html(full_html=False)
+        return plotly_spec(fig)
     
     @staticmethod
     def create_matches_area_chart():
         
         """5. Area chart: матчі по місяцях"""
         
-        queryset = DashboardQueries.matches_by_month()
-        df = DashboardQueries.to_dataframe(queryset)
+        df = DashboardQueries.frame('matches_by_month')
         
         if not df.empty:
             df['month'] = pd.to_datetime(df['month'])
@@ -211,32 +235,30 @@ class PlotlyCharts:
             line=dict(color='royalblue', width=3)
         )
         
-        return fig.to_html(full_html=False)
+        return plotly_spec(fig)
     
     @staticmethod
     def create_coaches_heatmap():
         
         """6. Heatmap: тренери по країнах та досвіду"""
         
-        queryset = DashboardQueries.coaches_by_country()
-        df = DashboardQueries.to_dataframe(queryset)
+        df = DashboardQueries.frame('coaches_by_country')
         
         if not df.empty:
-            df['exp_level'] = pd.cut(
-                df['avg_experience'], 
-                bins=3, 
-                labels=['Початківці (1-7 років)', 'Досвідчені (8-15)', 'Ветерани (16+)']
+            exp_levels = ['Початківці (1-7 років)', 'Досвідчені (8-15)', 'Ветерани (16+)']
+            countries, _, counts = crosstab(
+                df['coach_country'],
+                equal_width_bins(df['avg_experience'], bins=3),
+                df['coach_count'],
+                col_labels=exp_levels
             )
+            countries, counts = sort_rows_by_total(countries, counts)
             
-            pivot_df = df.pivot_table(
-                index='coach_country', 
-                columns='exp_level', 
-                values='coach_count', 
-                aggfunc='sum'
-            ).fillna(0)
-            
-            pivot_df['total'] = pivot_df.sum(axis=1)
-            pivot_df = pivot_df.sort_values('total', ascending=False).drop('total', axis=1)
+            pivot_df = pd.DataFrame(
+                counts,
+                index=pd.Index(countries, name='coach_country'),
+                columns=pd.Index(exp_levels, name='exp_level')
+            )
             
             fig = px.imshow(
                 pivot_df,
@@ -254,8 +276,8 @@ class PlotlyCharts:
                 coloraxis_colorbar=dict(title="Кількість")
             )
             
-            return fig.to_html(full_html=False)
-        return "<p>Немає даних для heatmap</p>"
+            return plotly_spec(fig)
+        return None
 
 
 class BokehCharts:
@@ -267,14 +289,15 @@ class BokehCharts:
         
         """7. Стовпчикова діаграма Bokeh: рейтинг команд"""
         
-        queryset = DashboardQueries.teams_best_goal_difference(min_points=20)
-        df = DashboardQueries.to_dataframe(queryset)
+        df = DashboardQueries.teams_best_goal_difference_frame(min_points=20)
         
         if df.empty:
             return None
         
-        df = df.sort_values('points', ascending=False).head(10)
-        source = ColumnDataSource(df)
+        df = top_by(df, 'points', 10)
+        source = ColumnDataSource(data=column_data(
+            df, ['team_name', 'points', 'wins', 'goal_difference']
+        ))
         
         p = figure(
             x_range=df['team_name'].tolist(),
@@ -328,14 +351,16 @@ class BokehCharts:
         
         """8. Горизонтальна діаграма: топ-гравці за голами"""
         
-        queryset = DashboardQueries.top_players_by_contributions(15)
-        df = DashboardQueries.to_dataframe(queryset)
+        df = DashboardQueries.top_players_frame(15)
         
         if df.empty:
             return None
         
         df = df.sort_values('goal_scored', ascending=True)
-        source = ColumnDataSource(df)
+        source = ColumnDataSource(data=column_data(df, [
+            'player_name', 'goal_scored', 'assist_scored',
+            'player_team__team_name', 'total_contributions'
+        ]))
         
         p = figure(
             y_range=df['player_name'].tolist(),
@@ -389,8 +414,8 @@ class BokehCharts:
         if df.empty:
             return None
         
-        df = df.sort_values('capacity', ascending=False).head(15)
-        source = ColumnDataSource(df)
+        df = top_by(df, 'capacity', 15)
+        source = ColumnDataSource(data=column_data(df, ['stadium_name', 'capacity', 'city']))
         
         p = figure(
             x_range=df['stadium_name'].tolist(),
@@ -444,7 +469,7 @@ class BokehCharts:
         df['event_date'] = pd.to_datetime(df['event_date'])
         df['date_str'] = df['event_date'].dt.strftime('%Y-%m-%d')
         
-        source = ColumnDataSource(df)
+        source = ColumnDataSource(data=column_data(df, ['event_date', 'date_str', 'match_count']))
         
         p = figure(
             height=350,
@@ -503,7 +528,17 @@ class BokehCharts:
         if df.empty:
             return None
         
-        source = ColumnDataSource(df)
+        # Кути рахуються до створення джерела, інакше wedge посилається
+        # на колонки, яких у ColumnDataSource немає
+        share, start_angle, end_angle = wedge_angles(df['player_count'])
+        countries = df['player_country'].tolist()
+        source = ColumnDataSource(data={
+            'player_country': df['player_country'].to_numpy(),
+            'player_count': df['player_count'].to_numpy(),
+            'percentage': share * 100,
+            'start_angle': start_angle,
+            'end_angle': end_angle,
+        })
         
         p = figure(
             height=400,
@@ -522,18 +557,13 @@ class BokehCharts:
             line_color="white",
             fill_color=factor_cmap(
                 'player_country',
-                palette=Spectral6,
-                factors=df['player_country'].tolist()
+                palette=cycle_palette(Spectral6, len(countries)),
+                factors=countries
             ),
             legend_field='player_country',
             source=source
         )
         
-        df['percentage'] = df['player_count'] / df['player_count'].sum() * 100
-        df['angle'] = df['player_count'] / df['player_count'].sum() * 2 * np.pi
-        df['start_angle'] = [0] + list(df['angle'].cumsum()[:-1])
-        df['end_angle'] = df['angle'].cumsum()
-        
         p.axis.axis_label = None
         p.axis.visible = False
         p.grid.grid_line_color = None
@@ -553,14 +583,15 @@ class BokehCharts:
         
         """12. Grid plot: статистика команд"""
         
-        queryset = DashboardQueries.teams_best_goal_difference(min_points=0)
-        df = DashboardQueries.to_dataframe(queryset)
+        df = DashboardQueries.teams_best_goal_difference_frame(min_points=0)
         
         if df.empty:
             return None
         
         df = df.head(8)
-        source = ColumnDataSource(df)
+        source = ColumnDataSource(data=column_data(
+            df, ['team_name', 'points', 'wins', 'goal_difference', 'draws']
+        ))
         
         # Графік 1: Очки
         p1 = figure(
@@ -2,50 +2,70 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from django.http import JsonResponse
+from rest_framework.permissions import AllowAny
+from rest_framework.settings import api_settings
+from django.http import JsonResponse, HttpResponse, HttpResponseNotModified
 from django.shortcuts import render
-import pandas as pd
+from django.utils.cache import patch_cache_control
+from django.utils.http import quote_etag
 import json
 
+from main import search
+from main.models import Team
+
+from . import profiling
 from .queries import DashboardQueries
+from .renderers import columnar_renderers
+from .precompute import (
+    PLOTLY_CHARTS, BOKEH_CHARTS, BOKEH_SPECS, CHART_SPECS,
+    load_snapshots, load_snapshot_raw,
+    build_plotly_fragments, build_bokeh_fragments, build_chart_spec,
+)
+from .staticfiles import vendor_bundle
 
-from bokeh.resources import CDN
+# pandas, plotly and bokeh are imported inside the chart views / DataFrame
+# helpers, so workers that only serve /api/ don't pay for them at startup
 
 
 class BaseDashboardAPI(APIView):
     """Базовий клас для всіх API ендпоінтів"""
+
+    # JSON / Browsable API, а також Arrow і Parquet (dashboard/renderers.py)
+    renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES + columnar_renderers()
+
+    # Назва знімка з precompute_charts для запиту без параметрів
+    snapshot_name = None
+
+    def wants_dataframe(self):
+        """Клієнт просить колонковий формат - віддаємо сам DataFrame"""
+        return getattr(self.request.accepted_renderer, 'columnar', False)
+
+    def get_snapshot_response(self, request):
+        """Готова відповідь, якщо воркер уже зібрав її для цих даних"""
+        if self.snapshot_name is None or request.GET or self.wants_dataframe():
+            return None
+        snapshots = load_snapshots('api', [self.snapshot_name])
+        if snapshots is None:
+            return None
+        return Response(snapshots[self.snapshot_name])
     
     def get_pandas_response(self, queryset):
-        """Конвертує QuerySet у pandas DataFrame і повертає JSON"""
+        """Конвертує QuerySet у pandas DataFrame і повертає JSON / Arrow / Parquet"""
         df = DashboardQueries.to_dataframe(queryset)
-        
-        # Базовий статистичний аналіз
-        stats = {}
-        if not df.empty:
-            numeric_cols = df.select_dtypes(include=['int64', 'float64']).columns
-            for col in numeric_cols:
-                stats[col] = {
-                    'mean': float(df[col].mean()),
-                    'median': float(df[col].median()),
-                    'min': float(df[col].min()),
-                    'max': float(df[col].max()),
-                    'std': float(df[col].std())
-                }
-        
-        response_data = {
-            'data': json.loads(df.to_json(orient='records', date_format='iso')),
-            'columns': list(df.columns),
-            'shape': df.shape,
-            'statistics': stats,
-            'info': f"Total records: {len(df)}"
-        }
-        
-        return Response(response_data)
+        if self.wants_dataframe():
+            return Response(df)
+        return Response(DashboardQueries.frame_payload(df))
 
 
 # 1. Ендпоінт для команд з найкращою різницею голів
 class TeamsGoalDifferenceAPI(BaseDashboardAPI):
+    snapshot_name = 'teams_goal_difference'
+
     def get(self, request):
+        snapshot = self.get_snapshot_response(request)
+        if snapshot:
+            return snapshot
+
         min_points = request.GET.get('min_points', 50)
         try:
             min_points = int(min_points)
@@ -58,14 +78,26 @@ class TeamsGoalDifferenceAPI(BaseDashboardAPI):
 
 # 2. Ендпоінт для середнього віку гравців по командах
 class AvgPlayerAgeAPI(BaseDashboardAPI):
+    snapshot_name = 'avg_player_age'
+
     def get(self, request):
+        snapshot = self.get_snapshot_response(request)
+        if snapshot:
+            return snapshot
+
         queryset = DashboardQueries.avg_player_age_by_team()
         return self.get_pandas_response(queryset)
 
 
 # 3. Ендпоінт для перемог по роках
 class TeamWinsByYearAPI(BaseDashboardAPI):
+    snapshot_name = 'wins_by_year'
+
     def get(self, request):
+        snapshot = self.get_snapshot_response(request)
+        if snapshot:
+            return snapshot
+
         team_filter = request.GET.get('team')
         year_from = request.GET.get('year_from')
         year_to = request.GET.get('year_to')
@@ -74,6 +106,10 @@ class TeamWinsByYearAPI(BaseDashboardAPI):
         
         # Додаємо фільтрацію якщо є параметри
         if team_filter:
+            # Індекс пошуку звужує команди за первинним ключем, LIKE лише перевіряє їх
+            team_ids = search.candidate_ids(Team, team_filter)
+            if team_ids is not None:
+                queryset = queryset.filter(win_team_id__in=team_ids)
             queryset = queryset.filter(win_team__team_name__icontains=team_filter)
         
         if year_from:
@@ -87,7 +123,13 @@ class TeamWinsByYearAPI(BaseDashboardAPI):
 
 # 4. Ендпоінт для топ гравців
 class TopPlayersAPI(BaseDashboardAPI):
+    snapshot_name = 'top_players'
+
     def get(self, request):
+        snapshot = self.get_snapshot_response(request)
+        if snapshot:
+            return snapshot
+
         limit = request.GET.get('limit', 10)
         try:
             limit = int(limit)
@@ -100,14 +142,26 @@ class TopPlayersAPI(BaseDashboardAPI):
 
 # 5. Ендпоінт для матчів по місяцях
 class MatchesByMonthAPI(BaseDashboardAPI):
+    snapshot_name = 'matches_by_month'
+
     def get(self, request):
+        snapshot = self.get_snapshot_response(request)
+        if snapshot:
+            return snapshot
+
         queryset = DashboardQueries.matches_by_month()
         return self.get_pandas_response(queryset)
 
 
 # 6. Ендпоінт для тренерів по країнах
 class CoachesByCountryAPI(BaseDashboardAPI):
+    snapshot_name = 'coaches_by_country'
+
     def get(self, request):
+        snapshot = self.get_snapshot_response(request)
+        if snapshot:
+            return snapshot
+
         queryset = DashboardQueries.coaches_by_country()
         return self.get_pandas_response(queryset)
 
@@ -118,80 +172,70 @@ def dashboard_home(request):
     return render(request, 'index.html')
 
 
-# dashboard/views.py
-from django.shortcuts import render
-from django.http import JsonResponse
-from rest_framework.views import APIView
-from rest_framework.response import Response
+class ChartSpecAPI(APIView):
+    """Дані + декларативна специфікація одного з 12 графіків"""
+
+    # Сторінки дашбордів публічні, тож і дані їхніх графіків теж
+    permission_classes = [AllowAny]
+
+    # Знімки оновлює precompute_charts, тому кешуємо ненадовго,
+    # а далі браузер перевіряє ETag (304 без тіла)
+    cache_max_age = 60
+
+    def get(self, request, name):
+        if name not in CHART_SPECS:
+            return Response({"error": "Unknown chart"}, status=status.HTTP_404_NOT_FOUND)
+
+        snapshot = load_snapshot_raw('spec', name)
+        if snapshot:
+            payload, version = snapshot
+            etag = quote_etag(f"{name}-{version[:16]}")
+            if request.headers.get('If-None-Match') == etag:
+                response = HttpResponseNotModified()
+            else:
+                response = HttpResponse(payload, content_type='application/json')
+            response['ETag'] = etag
+        else:
+            spec = build_chart_spec(name)
+            with profiling.stage('serialize'):
+                payload = json.dumps(spec)
+            response = HttpResponse(payload, content_type='application/json')
+
+        patch_cache_control(response, public=True, max_age=self.cache_max_age)
+        return response
 
-# Додайте ці імпорти
-from .utils import PlotlyCharts, BokehCharts
-from bokeh.embed import components
-from bokeh.resources import CDN
 
 def plotly_dashboard(request):
+    """Сторінка з 6 графіками Plotly (?render=server - зібрані на сервері)"""
+    if request.GET.get('render') == 'server':
+        names = [name for name, _ in PLOTLY_CHARTS] + ['plotly_template']
+        # Готові графіки від precompute_charts, інакше генеруємо всі 6 зараз
+        context = load_snapshots('plotly', names) or build_plotly_fragments()
+        context['server_render'] = True
+    else:
+        # Графіки малює браузер за /dashboard/api/charts/<name>/
+        context = load_snapshots('plotly', ['plotly_template'])
+        if context is None:
+            from .utils import plotly_template
+            context = {'plotly_template': plotly_template()}
+    context['plotly_js'] = vendor_bundle('plotly')
     
-    # Генеруємо всі 6 графіків
-    plotly_chart1 = PlotlyCharts.create_teams_bar_chart()
-    plotly_chart2 = PlotlyCharts.create_age_pie_chart()
-    plotly_chart3 = PlotlyCharts.create_wins_line_chart()
-    plotly_chart4 = PlotlyCharts.create_players_scatter()
-    plotly_chart5 = PlotlyCharts.create_matches_area_chart()
-    plotly_chart6 = PlotlyCharts.create_coaches_heatmap()
-    
-    # Передаємо графіки в контекст шаблону
-    context = {
-        'plotly_chart1': plotly_chart1,
-        'plotly_chart2': plotly_chart2,
-        'plotly_chart3': plotly_chart3,
-        'plotly_chart4': plotly_chart4,
-        'plotly_chart5': plotly_chart5,
-        'plotly_chart6': plotly_chart6,
-    }
-    
-    return render(request, 'plotly_dashboard.html', context)
+    with profiling.stage('render'):
+        return render(request, 'plotly_dashboard.html', context)
 
 def bokeh_dashboard(request):
-    """Сторінка з 6 графіками Bokeh"""
-    from bokeh.embed import components
-    from .utils import BokehCharts
-    
-    # Перевіряємо кожен графік
-    charts = []
-    divs = []
-    scripts = []
-    
-    chart_methods = [
-        ('teams_bar', BokehCharts.create_teams_bar_chart_bokeh()),
-        ('players_goals', BokehCharts.create_players_goals_bokeh()),
-        ('stadium_capacity', BokehCharts.create_stadium_capacity_bokeh()),
-        ('matches_timeline', BokehCharts.create_matches_timeline_bokeh()),
-        ('players_by_country', BokehCharts.create_players_by_country_bokeh()),
-        ('team_stats_grid', BokehCharts.create_team_stats_grid_bokeh()),
-    ]
-    
-    for name, chart in chart_methods:
-        if chart:
-            script, div = components(chart)
-            scripts.append(script)
-            divs.append(div)
-            print(f"DEBUG: Графік {name} створено - div: {bool(div)}, script: {bool(script)}")
-        else:
-            scripts.append("")
-            divs.append(f"<p>Немає даних для {name}</p>")
-            print(f"DEBUG: Графік {name} - None")
-    
-    all_scripts = "".join(scripts)
-    
+    """Сторінка з 6 графіками Bokeh (?render=server - зібрані на сервері)"""
     context = {
-        'bokeh_js': all_scripts,
-        'bokeh_css': CDN.render_css(),
-        'bokeh_chart1': divs[0],
-        'bokeh_chart2': divs[1],
-        'bokeh_chart3': divs[2],
-        'bokeh_chart4': divs[3],
-        'bokeh_chart5': divs[4],
-        'bokeh_chart6': divs[5],
+        'bokeh_js': vendor_bundle('bokeh'),
+        'bokeh_api_js': vendor_bundle('bokeh-api'),
+        'bokeh_names': BOKEH_SPECS,
     }
+    if request.GET.get('render') == 'server':
+        names = [name for name, _ in BOKEH_CHARTS]
+        items = load_snapshots('bokeh', names) or build_bokeh_fragments()
+        context['server_render'] = True
+        for number, name in enumerate(names, start=1):
+            context[f'bokeh_chart{number}'] = items[name]
     
-    return render(request, 'bokeh_dashboard.html', context)
+    with profiling.stage('render'):
+        return render(request, 'bokeh_dashboard.html', context)
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from main.models import Team, Coach, Stadium, Calendar, History, Match, PlayerDetailed, PlayerTechnical
+from main.models import Team, Coach, Stadium, Calendar, History, Match, PlayerDetailed, PlayerTechnical, TeamForm
 
 admin.site.register(Team)
 admin.site.register(Coach)
@@ -8,4 +8,5 @@ admin.site.register(Calendar)
 admin.site.register(History)
 admin.site.register(Match)
 admin.site.register(PlayerDetailed)
-admin.site.register(PlayerTechnical)
\ No newline at end of file
+admin.site.register(PlayerTechnical)
+admin.site.register(TeamForm)
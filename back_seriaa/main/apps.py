@@ -4,3 +4,14 @@ from django.apps import AppConfig
 class MainConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'main'
+
+    def ready(self):
+        from . import checks  # noqa: F401 (registers the system checks)
+        from . import search, stat_counters
+        from .repositories import team_form_repository
+        from .repositories.cache import connect_signals
+        connect_signals()
+        search.connect_signals()
+        team_form_repository.connect_signals()
+        # Increments a stopped or crashed process left in its log
+        stat_counters.replay_on_start()
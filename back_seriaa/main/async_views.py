@@ -0,0 +1,238 @@
+# main/async_views.py
+import asyncio
+import time
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse, StreamingHttpResponse
+from django.views import View
+from rest_framework import exceptions
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from . import live
+from .fast_serializers import ValuesSerializer
+from .renderers import ORJSONRenderer
+from .serializers import (
+    TeamBaseSerializer, TeamDetailSerializer,
+    MatchBaseSerializer, MatchDetailSerializer,
+    PlayerTechnicalBaseSerializer, PlayerTechnicalDetailSerializer,
+)
+from .repositories.team_repository import TeamRepository
+from .repositories.match_repository import MatchRepository
+from .repositories.player_technical_repository import PlayerTechnicalRepository
+
+
+class AsyncAPIView(View):
+    """Async view behind the same DRF authentication/permissions as BaseViewSet"""
+
+    authentication_classes = api_settings.DEFAULT_AUTHENTICATION_CLASSES
+    permission_classes = api_settings.DEFAULT_PERMISSION_CLASSES
+
+    def permission_denied(self, request):
+        """
+        None if the request may proceed, else the response DRF's APIView
+        sends: 401 with WWW-Authenticate (or 403) when the credentials are
+        missing or wrong, 403 with the permission's message otherwise
+        """
+        drf_request = Request(
+            request,
+            authenticators=[auth() for auth in self.authentication_classes]
+        )
+        try:
+            for permission in [permission() for permission in self.permission_classes]:
+                if not permission.has_permission(drf_request, self):
+                    if drf_request.authenticators and not drf_request.successful_authenticator:
+                        raise exceptions.NotAuthenticated()
+                    raise exceptions.PermissionDenied(getattr(permission, 'message', None))
+        except exceptions.APIException as exc:
+            status, headers = exc.status_code, None
+            if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+                header = drf_request.authenticators[0].authenticate_header(drf_request) if drf_request.authenticators else None
+                if header:
+                    headers = {'WWW-Authenticate': header}
+                else:
+                    status = 403
+            return self.render({"detail": str(exc.detail)}, status=status, headers=headers)
+        return None
+
+    @staticmethod
+    def render(data, status=200, headers=None):
+        return HttpResponse(
+            ORJSONRenderer().render(data),
+            content_type='application/json',
+            status=status,
+            headers=headers,
+        )
+
+
+class AsyncBaseView(AsyncAPIView):
+    """
+    Async-native list/retrieve for read-heavy endpoints under ASGI.
+
+    GET /api/async/<entity>/            -> list (optional ?limit=&offset=, filters
+                                           declared by the repository)
+    GET /api/async/<entity>/<pk>/       -> retrieve
+    """
+
+    # These should be defined in child classes
+    base_serializer_class = None
+    detail_serializer_class = None
+    repository_class = None
+
+    # Detail serializer runs ORM queries in SerializerMethodField,
+    # so it has to be evaluated in a worker thread
+    detail_requires_sync = False
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.repository_class:
+            self.repo = self.repository_class()
+        else:
+            raise ValueError("repository_class must be defined in child class")
+
+    async def get(self, request, pk=None):
+        denied = await sync_to_async(self.permission_denied)(request)
+        if denied is not None:
+            return denied
+        if pk is None:
+            return await self.list(request)
+        return await self.retrieve(request, pk)
+
+    async def list(self, request):
+        try:
+            queryset = self.repo.filter(self.repo.get_all(), request.GET)
+        except ValueError as exc:
+            return self.render({"error": str(exc)}, status=400)
+        headers = {}
+
+        limit = request.GET.get('limit')
+        if limit is not None:
+            try:
+                limit = int(limit)
+                offset = int(request.GET.get('offset', 0))
+            except ValueError:
+                return self.render({"error": "limit and offset must be integers"}, status=400)
+            if limit < 0 or offset < 0:
+                return self.render({"error": "limit and offset must not be negative"}, status=400)
+            headers['X-Total-Count'] = str(await queryset.acount())
+            if not queryset.ordered:
+                queryset = queryset.order_by('pk')
+            queryset = queryset[offset:offset + limit]
+
+        fast = ValuesSerializer.for_serializer(self.base_serializer_class)
+        if fast is not None:
+            data = await fast.aserialize(queryset)
+        else:
+            items = [item async for item in queryset]
+            data = self.base_serializer_class(items, many=True).data
+        return self.render(data, headers=headers)
+
+    async def retrieve(self, request, pk):
+        item = await self.repo.aget_by_id(pk)
+        if not item:
+            return self.render({"error": "Item not found"}, status=404)
+        serializer = self.detail_serializer_class(item)
+        if self.detail_requires_sync:
+            data = await sync_to_async(lambda: serializer.data)()
+        else:
+            data = serializer.data
+        return self.render(data)
+
+
+class AsyncTeamView(AsyncBaseView):
+    base_serializer_class = TeamBaseSerializer
+    detail_serializer_class = TeamDetailSerializer
+    repository_class = TeamRepository
+    detail_requires_sync = True
+
+
+class AsyncMatchView(AsyncBaseView):
+    base_serializer_class = MatchBaseSerializer
+    detail_serializer_class = MatchDetailSerializer
+    repository_class = MatchRepository
+
+
+class AsyncPlayerTechnicalView(AsyncBaseView):
+    base_serializer_class = PlayerTechnicalBaseSerializer
+    detail_serializer_class = PlayerTechnicalDetailSerializer
+    repository_class = PlayerTechnicalRepository
+    detail_requires_sync = True
+
+
+class LiveStreamView(AsyncAPIView):
+    """
+    Server-Sent Events stream of score and standings changes (see main/live.py).
+
+    GET /api/async/stream/?topics=match,team   (default: all topics)
+
+    Events are match.created / match.updated / match.deleted and the same
+    for team; an update carries the current values and the deltas. A
+    reconnecting EventSource sends Last-Event-ID (or ?last_event_id=) and
+    gets the events it missed first, or a "reset" event when they are no
+    longer kept. The stream ends after MAX_DURATION seconds and the
+    client reconnects: under Django 4.2 a closed connection is only noticed
+    on the next write, so every stream has a bounded lifetime.
+    """
+
+    # Seconds between keep-alive comments
+    HEARTBEAT = 15
+    MAX_DURATION = 300
+    # Milliseconds the browser waits before reconnecting
+    RETRY = 3000
+
+    async def get(self, request):
+        denied = await sync_to_async(self.permission_denied)(request)
+        if denied is not None:
+            return denied
+
+        topics = request.GET.get('topics')
+        topics = set(filter(None, topics.split(','))) if topics else set(live.TOPICS)
+        unknown = topics - set(live.TOPICS)
+        if unknown:
+            return self.render({"error": f"Unknown topics: {', '.join(sorted(unknown))}, "
+                                         f"use: {', '.join(live.TOPICS)}"}, status=400)
+        last_event_id = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+        if last_event_id is not None:
+            try:
+                last_event_id = int(last_event_id)
+            except ValueError:
+                return self.render({"error": "last_event_id must be an integer"}, status=400)
+
+        response = StreamingHttpResponse(self.stream(topics, last_event_id), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        # nginx must not buffer the stream
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    async def stream(self, topics, last_event_id):
+        subscriber, missed = await sync_to_async(live.broker.subscribe)(
+            topics, asyncio.get_running_loop(), last_event_id
+        )
+        try:
+            yield f"retry: {self.RETRY}\n\n".encode()
+            # The poller may queue some of them again
+            sent = set()
+            if missed is None:
+                yield b"event: reset\ndata: {}\n\n"
+            else:
+                for event in missed:
+                    sent.add(event.id)
+                    yield event.frame
+
+            deadline = time.monotonic() + self.MAX_DURATION
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return
+                try:
+                    event = await asyncio.wait_for(subscriber.queue.get(), min(self.HEARTBEAT, remaining))
+                except asyncio.TimeoutError:
+                    yield b": keep-alive\n\n"
+                    continue
+                if event is None:
+                    yield b"event: overflow\ndata: {}\n\n"
+                    return
+                if event.id not in sent:
+                    yield event.frame
+        finally:
+            live.broker.unsubscribe(subscriber)
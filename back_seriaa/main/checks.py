@@ -0,0 +1,40 @@
+# main/checks.py
+import importlib
+import pkgutil
+
+from django.core import checks
+
+from . import repositories
+from .repositories.base_repository import BaseRepository
+from .repositories.filtering import unindexed
+
+
+def repository_classes():
+    # Repositories are imported by the views; import them all here so the
+    # check also runs without the URLconf
+    for module in pkgutil.iter_modules(repositories.__path__):
+        importlib.import_module(f"{repositories.__name__}.{module.name}")
+
+    classes, pending = [], list(BaseRepository.__subclasses__())
+    while pending:
+        cls = pending.pop()
+        classes.append(cls)
+        pending.extend(cls.__subclasses__())
+    return classes
+
+
+@checks.register(checks.Tags.models)
+def check_repository_filters(app_configs, **kwargs):
+    """filter_fields / ordering_fields / search_fields only on indexed columns"""
+    errors = []
+    for cls in repository_classes():
+        model = cls().model
+        missing = unindexed(cls, model)
+        if missing:
+            errors.append(checks.Error(
+                f"{cls.__name__} filters, orders or searches by unindexed fields: {', '.join(missing)}",
+                hint=f"Add them to {model.__name__}.Meta.indexes (with a migration) or remove them.",
+                obj=cls,
+                id='main.E001',
+            ))
+    return errors
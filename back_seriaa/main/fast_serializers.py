@@ -0,0 +1,193 @@
+# main/fast_serializers.py
+"""
+Read-only fast path for list endpoints.
+
+ValuesSerializer.for_serializer(TeamBaseSerializer) inspects the
+ModelSerializer once and compiles its fields into ORM lookups:
+
+    'team_name'                    -> 'team_name'
+    'home_team' (PK related field) -> 'home_team'        (the FK id)
+    source='home_team.team_name'   -> 'home_team__team_name' (a JOIN)
+
+serialize(queryset) then runs one values_list() query and builds plain
+dicts from the tuples, skipping model instances and the per-row field
+walk of Serializer.to_representation. The result is the same as
+serializer(queryset, many=True).data, so the rendered JSON is
+byte-identical:
+
+* key order follows the serializer's fields, null values are None;
+* a dotted field whose relation is null is left out of the row, as DRF
+  does (it raises SkipField for read-only fields);
+* integer, char, choice and primary-key fields whose database value is
+  already what to_representation returns are passed through, any other
+  field calls its own to_representation.
+
+Serializers with fields that aren't a plain column or a dotted path to
+one (SerializerMethodField, nested serializers, source='*', properties)
+or with a custom to_representation are not compiled: for_serializer()
+returns None and the caller uses the regular serializer.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+
+
+# (serializer field class, model field internal types) whose
+# to_representation is the identity for values coming from the database
+INTEGER_TYPES = {
+    'AutoField', 'BigAutoField', 'SmallAutoField', 'IntegerField', 'BigIntegerField',
+    'SmallIntegerField', 'PositiveIntegerField', 'PositiveSmallIntegerField',
+    'PositiveBigIntegerField',
+}
+CHAR_TYPES = {'CharField', 'TextField'}
+
+PASSTHROUGH = [
+    (serializers.IntegerField, INTEGER_TYPES),
+    (serializers.CharField, CHAR_TYPES),
+    (serializers.ChoiceField, {'CharField'}),
+]
+
+_compiled = {}
+
+
+def resolve(model, source_attrs):
+    """
+    (model field at the end of a dotted source, lookups of the nullable
+    relations on the way) or (None, None) if the source isn't a column
+    """
+    field = None
+    nullable = []
+    for position, attr in enumerate(source_attrs):
+        if field is not None:
+            if not (field.is_relation and field.many_to_one):
+                return None, None
+            if field.null:
+                nullable.append('__'.join(source_attrs[:position]))
+            model = field.related_model
+        try:
+            field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            return None, None
+        if not field.concrete:
+            return None, None
+    return field, nullable
+
+
+def target_type(model_field):
+    if model_field.is_relation:
+        return model_field.target_field.get_internal_type()
+    return model_field.get_internal_type()
+
+
+def converter(field, model_field):
+    """None if the database value can be used as-is, else field.to_representation"""
+    if isinstance(field, serializers.ModelField):
+        # ModelField returns ints as-is and value_to_string() for the rest;
+        # only the types where both are the identity are compiled
+        return None
+    if isinstance(field, serializers.PrimaryKeyRelatedField):
+        if field.pk_field is None and model_field.is_relation and model_field.many_to_one:
+            # values_list('fk') yields the id, which is value.pk
+            return None
+        return field.to_representation
+    for field_class, internal_types in PASSTHROUGH:
+        if type(field) is field_class and model_field.get_internal_type() in internal_types:
+            return None
+    return field.to_representation
+
+
+def supported(field, model_field):
+    if isinstance(field, serializers.ModelField):
+        return field.model_field is model_field and target_type(model_field) in INTEGER_TYPES | CHAR_TYPES
+    if model_field.is_relation:
+        return isinstance(field, serializers.PrimaryKeyRelatedField)
+    return True
+
+
+class ValuesSerializer:
+
+    def __init__(self, names, lookups, converters, optional):
+        self.names = names
+        # Lookups of the fields, then of the relations checked by optional
+        self.lookups = lookups
+        # (column index, to_representation) for the fields that need it
+        self.converters = [(index, convert) for index, convert in enumerate(converters) if convert]
+        # (field name, column indexes of its nullable relations)
+        self.optional = optional
+
+    @classmethod
+    def for_serializer(cls, serializer_class, fields=None):
+        """
+        Compiled ValuesSerializer for a ModelSerializer class, or None.
+        fields (a frozenset of names) limits it to those fields and columns
+        """
+        key = (serializer_class, fields)
+        if key not in _compiled:
+            _compiled[key] = cls.compile(serializer_class, fields)
+        return _compiled[key]
+
+    @classmethod
+    def compile(cls, serializer_class, fields=None):
+        if not issubclass(serializer_class, serializers.ModelSerializer):
+            return None
+        if serializer_class.to_representation is not serializers.Serializer.to_representation:
+            return None
+
+        model = serializer_class.Meta.model
+        names, lookups, converters, guards = [], [], [], []
+        for name, field in serializer_class().fields.items():
+            if field.write_only or (fields is not None and name not in fields):
+                continue
+            if isinstance(field, (serializers.BaseSerializer, serializers.SerializerMethodField)):
+                return None
+            if field.source == '*':
+                return None
+            model_field, nullable = resolve(model, field.source_attrs)
+            if model_field is None or not supported(field, model_field):
+                return None
+            names.append(name)
+            lookups.append('__'.join(field.source_attrs))
+            converters.append(converter(field, model_field))
+            guards.append(nullable)
+
+        # Relations to check go after the fields (reusing a field's column
+        # if it is the same lookup)
+        columns = list(lookups)
+        optional = []
+        for name, nullable in zip(names, guards):
+            if nullable:
+                for lookup in nullable:
+                    if lookup not in columns:
+                        columns.append(lookup)
+                optional.append((name, [columns.index(lookup) for lookup in nullable]))
+        return cls(names, columns, converters, optional)
+
+    def rows(self, queryset):
+        return queryset.values_list(*self.lookups)
+
+    def build(self, rows):
+        names = self.names
+        if not self.converters and not self.optional:
+            return [dict(zip(names, row)) for row in rows]
+
+        data = []
+        for row in rows:
+            if self.converters:
+                row = list(row)
+                for index, convert in self.converters:
+                    if row[index] is not None:
+                        row[index] = convert(row[index])
+            item = dict(zip(names, row))
+            for name, relations in self.optional:
+                for index in relations:
+                    if row[index] is None:
+                        del item[name]
+                        break
+            data.append(item)
+        return data
+
+    def serialize(self, queryset):
+        """Same data as serializer_class(queryset, many=True).data"""
+        return self.build(self.rows(queryset))
+
+    async def aserialize(self, queryset):
+        return self.build([row async for row in self.rows(queryset)])
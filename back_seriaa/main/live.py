@@ -0,0 +1,277 @@
+# main/live.py
+"""
+Live changes for the Server-Sent Events stream (/api/async/stream/).
+
+Repositories that set live_topic record their creates, updates and
+deletes (BaseRepository), and score_ingest records the scores it writes,
+as LiveEvent rows inserted in the same transaction as the change. A
+rolled back write leaves no event, and every ASGI process sees the
+events of all of them:
+
+    id: 42
+    event: match.updated
+    data: {"id": 17, "values": {"home_team_score": 2, ...}, "delta": {"home_team_score": 1}}
+
+Each process that has subscribers runs one poller thread (Broker): every
+POLL_INTERVAL seconds, or right after a commit in the same process, it
+reads the rows above the last id it has seen and hands each event to
+every subscriber's asyncio queue with loop.call_soon_threadsafe, so one
+write costs one INSERT and one read per process, whatever the number of
+viewers. Ids are allocated at INSERT but become visible at COMMIT, so an
+id below a delivered one may still show up: the poller keeps reading
+above the lowest id it is not sure about for up to GAP_TIMEOUT seconds
+(after that the transaction is taken as rolled back).
+
+Events are kept for RETENTION seconds: a client that reconnects with
+Last-Event-ID gets what it missed, or a "reset" event (refetch the
+lists) if that is no longer in the table or is more than BUFFER_SIZE
+events. A subscriber more than QUEUE_SIZE events behind is dropped with
+an "overflow" event and reconnects the same way.
+"""
+import asyncio
+import logging
+import threading
+import time
+from datetime import timedelta
+
+import orjson
+from django.db import DatabaseError, connections, router, transaction
+from django.db.models import Max, Min
+from django.utils import timezone
+
+from .models import LiveEvent
+
+
+logger = logging.getLogger(__name__)
+
+TOPICS = ('match', 'team')
+
+# Numeric fields an update reports a delta for (not foreign keys)
+DELTA_FIELDS = (
+    'home_team_score', 'away_team_score',
+    'points', 'wins', 'draws', 'loses', 'goal_difference',
+    'goal_scored', 'assist_scored',
+)
+
+BUFFER_SIZE = 1000
+QUEUE_SIZE = 500
+
+POLL_INTERVAL = 0.2
+# Rows read per poll
+POLL_BATCH = 1000
+# Seconds a missing id is waited for before it is taken as rolled back
+GAP_TIMEOUT = 10
+# Seconds events are kept for reconnecting clients
+RETENTION = 3600
+PRUNE_INTERVAL = 60
+# Seconds the poller keeps running without subscribers
+IDLE_TIMEOUT = 30
+
+
+def events_db():
+    """Events are written with the changes and read from the primary"""
+    return router.db_for_write(LiveEvent)
+
+
+class Event:
+
+    __slots__ = ('id', 'topic', 'frame')
+
+    def __init__(self, event_id, topic, action, data):
+        """data: the JSON text stored in LiveEvent"""
+        self.id = event_id
+        self.topic = topic
+        self.frame = f"id: {event_id}\nevent: {topic}.{action}\ndata: {data}\n\n".encode()
+
+
+class Subscriber:
+
+    def __init__(self, topics, loop):
+        self.topics = topics
+        self.loop = loop
+        # Bound to the loop that first awaits it (Python 3.10+), so it can
+        # be created in the thread that subscribes
+        self.queue = asyncio.Queue()
+        self.overflowed = False
+
+    def deliver(self, event):
+        """Runs on the subscriber's event loop"""
+        if self.overflowed or event.topic not in self.topics:
+            return
+        if self.queue.qsize() >= QUEUE_SIZE:
+            self.overflowed = True
+            # None tells the stream to end with an overflow event
+            self.queue.put_nowait(None)
+            return
+        self.queue.put_nowait(event)
+
+
+class Broker:
+    """Subscribers of this process and the thread polling LiveEvent for them"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscribers = set()
+        self.thread = None
+        self.wakeup = threading.Event()
+        # Every id up to low_water is handled; above it, the delivered ones
+        self.low_water = 0
+        self.delivered = set()
+        # {id not seen yet below a delivered one: monotonic time noticed}
+        self.gaps = {}
+        self.last_prune = 0.0
+
+    def subscribe(self, topics, loop, last_event_id=None):
+        """
+        (subscriber, missed events) - missed is None when last_event_id is
+        no longer in the table (the client has to refetch). Reads the
+        database: call it from a thread.
+        """
+        subscriber = Subscriber(topics, loop)
+        with self.lock:
+            self.subscribers.add(subscriber)
+            if self.thread is None:
+                self.start()
+        missed = []
+        if last_event_id is not None:
+            missed = self.missed(topics, last_event_id)
+        return subscriber, missed
+
+    def unsubscribe(self, subscriber):
+        with self.lock:
+            self.subscribers.discard(subscriber)
+
+    def missed(self, topics, last_event_id):
+        events = LiveEvent.objects.using(events_db())
+        bounds = events.aggregate(first=Min('id'), last=Max('id'))
+        if bounds['last'] is None or last_event_id > bounds['last'] or bounds['first'] > last_event_id + 1:
+            # Pruned since, or from before the table was emptied
+            return None
+        rows = list(
+            events.filter(id__gt=last_event_id, topic__in=topics)
+            .order_by('id').values_list('id', 'topic', 'action', 'data')[:BUFFER_SIZE + 1]
+        )
+        if len(rows) > BUFFER_SIZE:
+            return None
+        return [Event(*row) for row in rows]
+
+    def start(self):
+        """Called with the lock held"""
+        recent = timezone.now() - timedelta(seconds=GAP_TIMEOUT)
+        events = LiveEvent.objects.using(events_db())
+        # Ids of the last GAP_TIMEOUT seconds count as delivered, so gaps
+        # among them are still waited for
+        self.low_water = events.filter(created_at__lt=recent).aggregate(last=Max('id'))['last'] or 0
+        self.delivered = set(events.filter(id__gt=self.low_water).values_list('id', flat=True))
+        self.gaps = {}
+        self.advance(time.monotonic())
+        self.thread = threading.Thread(target=self.run, name='live-events', daemon=True)
+        self.thread.start()
+
+    def run(self):
+        idle_since = None
+        try:
+            while True:
+                self.wakeup.wait(POLL_INTERVAL)
+                self.wakeup.clear()
+                with self.lock:
+                    if self.subscribers:
+                        idle_since = None
+                    elif idle_since is None:
+                        idle_since = time.monotonic()
+                    elif time.monotonic() - idle_since > IDLE_TIMEOUT:
+                        self.thread = None
+                        return
+                try:
+                    self.poll()
+                    self.prune()
+                except DatabaseError:
+                    logger.exception("Reading live events failed, retrying")
+                    connections[events_db()].close()
+        finally:
+            connections.close_all()
+
+    def poll(self):
+        """Deliver the events committed since the last poll"""
+        rows = list(
+            LiveEvent.objects.using(events_db()).filter(id__gt=self.low_water)
+            .order_by('id').values_list('id', 'topic', 'action', 'data')[:POLL_BATCH]
+        )
+        now = time.monotonic()
+        events = []
+        for row in rows:
+            self.gaps.pop(row[0], None)
+            if row[0] not in self.delivered:
+                self.delivered.add(row[0])
+                events.append(Event(*row))
+        if rows:
+            for missing in range(self.low_water + 1, rows[-1][0]):
+                if missing not in self.delivered:
+                    self.gaps.setdefault(missing, now)
+        self.advance(now)
+        if events:
+            self.publish(events)
+        return events
+
+    def advance(self, now):
+        """Move low_water over delivered ids and gaps that timed out"""
+        while True:
+            following = self.low_water + 1
+            if following in self.delivered:
+                self.delivered.discard(following)
+            elif following in self.gaps and now - self.gaps[following] > GAP_TIMEOUT:
+                del self.gaps[following]
+            else:
+                return
+            self.low_water = following
+
+    def publish(self, events):
+        with self.lock:
+            subscribers = list(self.subscribers)
+        for subscriber in subscribers:
+            try:
+                for event in events:
+                    subscriber.loop.call_soon_threadsafe(subscriber.deliver, event)
+            except RuntimeError:
+                # Its event loop is closed
+                self.unsubscribe(subscriber)
+
+    def prune(self):
+        """Drop events older than RETENTION (the newest one is kept for Last-Event-ID)"""
+        if time.monotonic() - self.last_prune < PRUNE_INTERVAL:
+            return
+        self.last_prune = time.monotonic()
+        events = LiveEvent.objects.using(events_db())
+        last = events.aggregate(last=Max('id'))['last']
+        if last is not None:
+            events.filter(created_at__lt=timezone.now() - timedelta(seconds=RETENTION), id__lt=last).delete()
+
+
+broker = Broker()
+
+
+def publish(topic, action, data, using=None):
+    """Record an event in the current transaction (delivered after it commits)"""
+    publish_many([(topic, action, data)], using=using)
+
+
+def publish_many(events, using=None):
+    """Record [(topic, action, data)] with one INSERT"""
+    using = using or events_db()
+    LiveEvent.objects.using(using).bulk_create([
+        LiveEvent(topic=topic, action=action, data=orjson.dumps(data).decode())
+        for topic, action, data in events
+    ])
+    # Pollers of other processes pick it up on their next poll
+    transaction.on_commit(broker.wakeup.set, using=using)
+
+
+def change(pk, before, after):
+    """Payload of an update: current values and the deltas of DELTA_FIELDS"""
+    delta = {
+        name: after[name] - before[name]
+        for name in DELTA_FIELDS
+        if name in after and after[name] != before.get(name)
+        and isinstance(after[name], int) and isinstance(before.get(name), int)
+    }
+    return {"id": pk, "values": after, "delta": delta}
@@ -0,0 +1,17 @@
+# main/management/commands/rebuild_team_form.py
+from django.core.management.base import BaseCommand
+
+from main.models import Team
+from main.repositories.team_form_repository import TeamFormRepository
+
+
+class Command(BaseCommand):
+    help = "Recompute the team_form table (after bulk match imports, which send no signals)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('team_ids', nargs='*', type=int, help="Only these teams (default: all)")
+
+    def handle(self, *args, **options):
+        team_ids = options['team_ids'] or Team.objects.values_list('pk', flat=True)
+        forms = TeamFormRepository().refresh(team_ids)
+        self.stdout.write(self.style.SUCCESS(f"Team form rebuilt for {len(forms)} teams"))
@@ -0,0 +1,18 @@
+# main/management/commands/replay_stat_counters.py
+from django.core.management.base import BaseCommand
+
+from main import stat_counters
+
+
+class Command(BaseCommand):
+    help = (
+        "Apply player stat increments left in STAT_COUNTERS_LOG_DIR by a stopped "
+        "or crashed server (main/stat_counters.py); segments of running servers are skipped"
+    )
+
+    def handle(self, *args, **options):
+        applied, skipped, held = stat_counters.replay()
+        self.stdout.write(self.style.SUCCESS(
+            f"{applied} log segments applied, {skipped} were already in the database, "
+            f"{held} belong to running servers"
+        ))
@@ -0,0 +1,55 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='calendar',
+            index=models.Index(fields=['event_date'], name='calendar_event_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='coach',
+            index=models.Index(fields=['coach_country'], name='coach_country_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='playerdetailed',
+            index=models.Index(fields=['player_country'], name='players_det_country_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='playerdetailed',
+            index=models.Index(fields=['player_age'], name='players_det_age_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='playertechnical',
+            index=models.Index(fields=['player_team', 'position'], name='players_team_position_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='playertechnical',
+            index=models.Index(fields=['position'], name='players_position_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='playertechnical',
+            index=models.Index(fields=['goal_scored'], name='players_goal_scored_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='playertechnical',
+            index=models.Index(fields=['assist_scored'], name='players_assist_scored_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='playertechnical',
+            index=models.Index(fields=['player_name'], name='players_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='team',
+            index=models.Index(fields=['points'], name='teams_points_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='team',
+            index=models.Index(fields=['goal_difference'], name='teams_goal_difference_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0002_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(fields=['home_team', 'away_team', 'match_id'], name='matches_home_away_idx'),
+        ),
+        migrations.CreateModel(
+            name='TeamForm',
+            fields=[
+                ('team', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='form', serialize=False, to='main.team')),
+                ('matches', models.IntegerField(default=0)),
+                ('wins', models.IntegerField(default=0)),
+                ('draws', models.IntegerField(default=0)),
+                ('loses', models.IntegerField(default=0)),
+                ('points', models.IntegerField(default=0)),
+                ('goals_for', models.IntegerField(default=0)),
+                ('goals_against', models.IntegerField(default=0)),
+                ('results', models.CharField(default='', max_length=5)),
+                ('last_match_id', models.IntegerField(null=True)),
+            ],
+            options={
+                'db_table': 'team_form',
+            },
+        ),
+    ]
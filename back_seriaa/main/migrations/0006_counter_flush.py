@@ -0,0 +1,21 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0005_calendar_stadium_date_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CounterFlush',
+            fields=[
+                ('segment', models.CharField(max_length=32, primary_key=True, serialize=False)),
+                ('flushed_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'stat_counter_flushes',
+            },
+        ),
+    ]
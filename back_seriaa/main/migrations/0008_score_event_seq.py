@@ -0,0 +1,26 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0007_live_event'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScoreEventKey',
+            fields=[
+                ('key', models.CharField(max_length=40, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                'db_table': 'score_event_keys',
+            },
+        ),
+        migrations.AddField(
+            model_name='match',
+            name='score_seq',
+            field=models.BigIntegerField(default=0),
+        ),
+    ]
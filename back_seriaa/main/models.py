@@ -11,6 +11,10 @@ class Team(models.Model):
 
     class Meta:
         db_table = 'Teams'
+        indexes = [
+            models.Index(fields=['points'], name='teams_points_idx'),
+            models.Index(fields=['goal_difference'], name='teams_goal_difference_idx'),
+        ]
 
     def __str__(self):
         return self.team_name
@@ -24,6 +28,9 @@ class Coach(models.Model):
 
     class Meta:
         db_table = 'coach'
+        indexes = [
+            models.Index(fields=['coach_country'], name='coach_country_idx'),
+        ]
 
     def __str__(self):
         return self.coach_name or "Unknown Coach"
@@ -50,6 +57,11 @@ class Calendar(models.Model):
 
     class Meta:
         db_table = 'calendar'
+        indexes = [
+            models.Index(fields=['event_date'], name='calendar_event_date_idx'),
+            # Next events of each stadium (StadiumDetailSerializer.upcoming_matches)
+            models.Index(fields=['event_stadium', 'event_date'], name='calendar_stadium_date_idx'),
+        ]
 
     def __str__(self):
         return f"{self.event_date} ({self.event_stadium})"
@@ -73,14 +85,48 @@ class Match(models.Model):
     away_team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name='away_matches')
     home_team_score = models.IntegerField(default=0)
     away_team_score = models.IntegerField(default=0)
+    # Calendar event (date, stadium) the match is played at
+    event = models.ForeignKey(Calendar, on_delete=models.SET_NULL, null=True, related_name='matches')
+    # seq of the last live score event applied (main/score_ingest.py)
+    score_seq = models.BigIntegerField(default=0)
 
     class Meta:
         db_table = 'matches'
+        indexes = [
+            # Head-to-head: (home, away) pairs, newest first by match_id
+            models.Index(fields=['home_team', 'away_team', 'match_id'], name='matches_home_away_idx'),
+        ]
 
     def __str__(self):
         return f"{self.home_team} vs {self.away_team}"
 
 
+class TeamForm(models.Model):
+    """
+    Results of a team's last FORM_MATCHES matches, kept up to date on
+    Match writes (repositories/team_form_repository.py)
+    """
+    FORM_MATCHES = 5
+
+    team = models.OneToOneField(Team, on_delete=models.CASCADE, primary_key=True, related_name='form')
+    matches = models.IntegerField(default=0)
+    wins = models.IntegerField(default=0)
+    draws = models.IntegerField(default=0)
+    loses = models.IntegerField(default=0)
+    points = models.IntegerField(default=0)
+    goals_for = models.IntegerField(default=0)
+    goals_against = models.IntegerField(default=0)
+    # 'WDLWW', newest first
+    results = models.CharField(max_length=FORM_MATCHES, default='')
+    last_match_id = models.IntegerField(null=True)
+
+    class Meta:
+        db_table = 'team_form'
+
+    def __str__(self):
+        return f"{self.team_id}: {self.results}"
+
+
 class PlayerTechnical(models.Model):
     player_id = models.AutoField(primary_key=True)
     player_name = models.CharField(max_length=255)
@@ -91,11 +137,66 @@ class PlayerTechnical(models.Model):
 
     class Meta:
         db_table = 'players_technical'
+        indexes = [
+            # ?player_team=&position= (the most common list filter)
+            models.Index(fields=['player_team', 'position'], name='players_team_position_idx'),
+            models.Index(fields=['position'], name='players_position_idx'),
+            models.Index(fields=['goal_scored'], name='players_goal_scored_idx'),
+            models.Index(fields=['assist_scored'], name='players_assist_scored_idx'),
+            models.Index(fields=['player_name'], name='players_name_idx'),
+        ]
 
     def __str__(self):
         return self.player_name
 
 
+class CounterFlush(models.Model):
+    """
+    Durability log segments of main/stat_counters.py whose increments are
+    in the database, so a replay after a crash applies each one once
+    """
+    segment = models.CharField(max_length=32, primary_key=True)
+    flushed_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'stat_counter_flushes'
+
+    def __str__(self):
+        return self.segment
+
+
+class ScoreEventKey(models.Model):
+    """Idempotency keys of applied live score events (main/score_ingest.py)"""
+    # sha1 of the feed's key
+    key = models.CharField(max_length=40, primary_key=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        db_table = 'score_event_keys'
+
+    def __str__(self):
+        return self.key
+
+
+class LiveEvent(models.Model):
+    """
+    A change for the /api/async/stream/ subscribers, written in the same
+    transaction as the change; every process polls the table (main/live.py)
+    """
+    id = models.BigAutoField(primary_key=True)
+    topic = models.CharField(max_length=16)
+    action = models.CharField(max_length=16)
+    # JSON, sent to the clients as it is
+    data = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        db_table = 'live_events'
+
+    def __str__(self):
+        return f"{self.id} {self.topic}.{self.action}"
+
+
 class PlayerDetailed(models.Model):
     player_detailed_id = models.ForeignKey(
         PlayerTechnical, 
@@ -114,6 +215,10 @@ class PlayerDetailed(models.Model):
 
     class Meta:
         db_table = 'players_detailed'
+        indexes = [
+            models.Index(fields=['player_country'], name='players_det_country_idx'),
+            models.Index(fields=['player_age'], name='players_det_age_idx'),
+        ]
 
     def __str__(self):
         return f"{self.player_country} ({self.player_foot})"
@@ -1,36 +1,121 @@
 # repositories/base_repository.py
+from django.db import router, transaction
+
+from main import live
+from .cache import RepositoryCache, caching_enabled
+from .filtering import filter_queryset
+
 
 class BaseRepository:
 
+    # Seconds to keep get_by_id() results in the repository cache;
+    # None disables caching. Only used with a cache shared by all
+    # processes (see repositories/cache.py)
+    cache_timeout = None
+    # Seconds to remember that a primary key does not exist
+    cache_miss_timeout = 30
+
+    # Query parameters clients may filter / order / search by, only on
+    # indexed fields (see repositories/filtering.py)
+    filter_fields = {}
+    ordering_fields = []
+    search_fields = []
+
+    # Topic of the /api/async/stream/ events for creates, updates and
+    # deletes made through the repository, and the fields they carry
+    # (see main/live.py)
+    live_topic = None
+    live_fields = ()
+
     def __init__(self, model):
         self.model = model
+        self.cache = None
+        if self.cache_timeout is not None and caching_enabled():
+            self.cache = RepositoryCache(model, self.cache_timeout, self.cache_miss_timeout)
 
     def get_all(self):
         """Return all records from the table"""
         return self.model.objects.all()
 
+    def filter(self, queryset, params):
+        """Apply ?<field>=, ?ordering= and ?search= from params; raises ValueError"""
+        return filter_queryset(queryset, params, self.filter_fields, self.ordering_fields, self.search_fields)
+
     def get_by_id(self, pk):
         """Return one record by primary key"""
-        return self.model.objects.filter(pk=pk).first()
+        if self.cache is None:
+            return self.model.objects.filter(pk=pk).first()
+        return self.cache.get(pk, lambda: self.cached_queryset().filter(pk=pk).first())
+
+    async def aget_by_id(self, pk):
+        """Async variant of get_by_id (uses the same get_all() queryset)"""
+        if self.cache is None:
+            return await self._aget(self.get_all(), pk)
+        return await self.cache.aget(pk, lambda: self._aget(self.cached_queryset(), pk))
+
+    async def _aget(self, queryset, pk):
+        try:
+            return await queryset.aget(pk=pk)
+        except self.model.DoesNotExist:
+            return None
+
+    def cached_queryset(self):
+        """
+        Queryset that fills the cache: plain rows (no select_related objects
+        that could go stale) read from the primary, so a lagging read
+        replica is never frozen into the cache for cache_timeout
+        """
+        return self.model.objects.using(router.db_for_write(self.model))
+
+    async def acount(self):
+        """Async count of all records"""
+        return await self.get_all().acount()
 
     def create(self, **kwargs):
         """Insert a new record"""
-        return self.model.objects.create(**kwargs)
+        with transaction.atomic(using=router.db_for_write(self.model)):
+            obj = self.model.objects.create(**kwargs)
+            if self.live_topic:
+                self.publish('created', {"id": obj.pk, "values": self.live_values(obj)})
+        return obj
 
     def update(self, pk, **kwargs):
         """Update an existing record by ID"""
         obj = self.get_by_id(pk)
         if not obj:
             return None
+        before = self.live_values(obj) if self.live_topic else None
         for key, value in kwargs.items():
             setattr(obj, key, value)
-        obj.save()
+        # Only the given columns: obj may come from the cache. The primary
+        # key (sent back by a full PUT) can't be in update_fields
+        pk_names = {self.model._meta.pk.name, self.model._meta.pk.attname}
+        with transaction.atomic(using=router.db_for_write(self.model)):
+            obj.save(update_fields=[key for key in kwargs if key not in pk_names] or None)
+            if before is not None:
+                after = self.live_values(obj)
+                if after != before:
+                    self.publish('updated', live.change(obj.pk, before, after))
         return obj
 
     def delete(self, pk):
         """Delete record by ID"""
         obj = self.get_by_id(pk)
         if obj:
-            obj.delete()
+            with transaction.atomic(using=router.db_for_write(self.model)):
+                obj.delete()
+                if self.live_topic:
+                    self.publish('deleted', {"id": pk})
             return True
         return False
+
+    def live_values(self, obj):
+        """live_fields of obj (foreign keys as ids)"""
+        return {
+            name: getattr(obj, self.model._meta.get_field(name).attname)
+            for name in self.live_fields
+        }
+
+    def publish(self, action, data):
+        """Record a live event in the write's transaction"""
+        live.publish(self.live_topic, action, data, using=router.db_for_write(self.model))
@@ -0,0 +1,213 @@
+# repositories/cache.py
+"""
+Object cache for BaseRepository.get_by_id.
+
+A repository opts in by setting cache_timeout (seconds). Rows are stored
+in the REPOSITORY_CACHE_ALIAS cache (file or Redis - see
+seriaa/cache_settings.py) under versioned keys:
+
+    repo:<app.model>:<schema>:<pk>        (generation, row)
+    repo:<app.model>:<schema>:<pk>:gen    generation
+
+A per-process cache (the default locmem) is not used: every worker
+would keep its own copy, dropped by its own writes only, and serve a row
+another worker changed for up to cache_timeout. REPOSITORY_CACHE_LOCAL =
+True turns it on anyway, for a single-process server.
+
+<schema> is a hash of CACHE_FORMAT and the model's columns, so a
+deploy that changes the model never unpickles old rows. Missing primary
+keys are cached too (negative cache, cache_miss_timeout) so repeated
+lookups of a deleted or unknown id don't hit the database.
+
+Every save()/delete() of a main model - through a repository, the HTML
+views or the admin - bumps the row's generation (post_save / post_delete),
+again after commit. QuerySet.update()/delete() send no signals: call
+RepositoryCache.invalidate() after them.
+
+A row is stored with the generation read before it was loaded, and a hit
+must match the current generation. A reader that loaded the old row
+before an update and stores it after the invalidation therefore stores
+it under an old generation, and nobody is served that row.
+
+Hits, negative hits and misses are counted per model in this process;
+cache_stats() returns them with the hit ratio (/api/report/cache-stats/).
+"""
+import functools
+import hashlib
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ValidationError
+from django.db import connections, router, transaction
+from django.db.models.signals import post_save, post_delete
+
+
+# Increase when the cached representation changes
+CACHE_FORMAT = 2
+
+DEFAULT_ALIAS = 'repositories'
+
+# Stored for primary keys that don't exist
+MISSING = 'repository-cache:missing'
+
+_NOT_CACHED = object()
+
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def cache_alias():
+    """Configured cache alias, or None if there is no such cache"""
+    alias = getattr(settings, 'REPOSITORY_CACHE_ALIAS', DEFAULT_ALIAS)
+    return alias if alias in settings.CACHES else None
+
+
+def is_shared(alias=None):
+    """True if every worker process reads the same cache (file, Redis, Memcached)"""
+    alias = alias or cache_alias()
+    if alias is None:
+        return False
+    return not settings.CACHES[alias]['BACKEND'].endswith(('.LocMemCache', '.DummyCache'))
+
+
+def caching_enabled():
+    """Repositories with cache_timeout cache rows (see the module docstring)"""
+    if cache_alias() is None:
+        return False
+    return is_shared() or getattr(settings, 'REPOSITORY_CACHE_LOCAL', False)
+
+
+@functools.lru_cache(maxsize=None)
+def schema_version(model):
+    columns = ",".join(f"{field.column}:{field.get_internal_type()}" for field in model._meta.concrete_fields)
+    return hashlib.sha1(f"{CACHE_FORMAT}|{columns}".encode()).hexdigest()[:8]
+
+
+def cache_key(model, pk):
+    return f"repo:{model._meta.label_lower}:{schema_version(model)}:{model._meta.pk.to_python(pk)}"
+
+
+def generation_key(key):
+    return f"{key}:gen"
+
+
+def bump_generation(cache, key):
+    """Makes every (generation, row) stored under key so far stale"""
+    gen_key = generation_key(key)
+    try:
+        cache.incr(gen_key)
+    except ValueError:
+        # No generation yet (or evicted): any new value differs from 0
+        if not cache.add(gen_key, 1, None):
+            cache.incr(gen_key)
+
+
+def record(model, event):
+    with _stats_lock:
+        _stats.setdefault(model._meta.label, Counter())[event] += 1
+
+
+def cache_stats():
+    """{'main.Team': {'hits', 'negative_hits', 'misses', 'hit_ratio'}, ...} for this process"""
+    with _stats_lock:
+        snapshot = {label: dict(counter) for label, counter in _stats.items()}
+    for counter in snapshot.values():
+        lookups = sum(counter.get(event, 0) for event in ('hits', 'negative_hits', 'misses'))
+        counter['hit_ratio'] = round((lookups - counter.get('misses', 0)) / lookups, 4) if lookups else None
+    return snapshot
+
+
+def reset_cache_stats():
+    with _stats_lock:
+        _stats.clear()
+
+
+class RepositoryCache:
+
+    def __init__(self, model, timeout, miss_timeout, alias=None):
+        self.model = model
+        self.timeout = timeout
+        self.miss_timeout = miss_timeout
+        self.cache = caches[alias or cache_alias()]
+
+    def get(self, pk, load):
+        """Cached row for pk; load() reads it from the database on a miss"""
+        try:
+            key = cache_key(self.model, pk)
+        except ValidationError:
+            # Not a valid primary key: the database reports it as before
+            return load()
+
+        gen_key = generation_key(key)
+        values = self.cache.get_many([key, gen_key])
+        generation = values.get(gen_key, 0)
+        obj = self.cached(values.get(key), generation)
+        if obj is not _NOT_CACHED:
+            return obj
+
+        record(self.model, 'misses')
+        obj = load()
+        self.cache.set(key, (generation, MISSING if obj is None else obj), self.lifetime(obj))
+        return obj
+
+    async def aget(self, pk, load):
+        """Async variant of get(); load is a coroutine function"""
+        try:
+            key = cache_key(self.model, pk)
+        except ValidationError:
+            return await load()
+
+        gen_key = generation_key(key)
+        values = await self.cache.aget_many([key, gen_key])
+        generation = values.get(gen_key, 0)
+        obj = self.cached(values.get(key), generation)
+        if obj is not _NOT_CACHED:
+            return obj
+
+        record(self.model, 'misses')
+        obj = await load()
+        await self.cache.aset(key, (generation, MISSING if obj is None else obj), self.lifetime(obj))
+        return obj
+
+    def cached(self, entry, generation):
+        """Row (or None for a missing pk) from a current entry, else _NOT_CACHED"""
+        if entry is None or entry[0] != generation:
+            return _NOT_CACHED
+        obj = entry[1]
+        if obj == MISSING:
+            record(self.model, 'negative_hits')
+            return None
+        record(self.model, 'hits')
+        return obj
+
+    def lifetime(self, obj):
+        return self.miss_timeout if obj is None else self.timeout
+
+    @classmethod
+    def invalidate(cls, model, pk, using=None):
+        """Make the cached row stale now and, inside a transaction, once more on commit"""
+        alias = cache_alias()
+        if alias is None:
+            return
+        key = cache_key(model, pk)
+        cache = caches[alias]
+        bump_generation(cache, key)
+        using = using or router.db_for_write(model)
+        if connections[using].in_atomic_block:
+            # A reader between the write and the commit may have loaded the old row
+            transaction.on_commit(lambda: bump_generation(cache, key), using=using)
+
+
+def invalidate_instance(sender, instance, using=None, **kwargs):
+    if instance.pk is not None:
+        RepositoryCache.invalidate(sender, instance.pk, using=using)
+
+
+def connect_signals():
+    from django.apps import apps
+
+    for model in apps.get_app_config('main').get_models():
+        post_save.connect(invalidate_instance, sender=model, dispatch_uid=f'repository_cache_save_{model.__name__}')
+        post_delete.connect(invalidate_instance, sender=model, dispatch_uid=f'repository_cache_delete_{model.__name__}')
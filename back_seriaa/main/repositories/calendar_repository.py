@@ -1,6 +1,31 @@
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+
 from .base_repository import BaseRepository
 from main.models import Calendar
 
 class CalendarRepository(BaseRepository):
+    filter_fields = {
+        'event_date': ['exact', 'gte', 'lte'],
+        'event_stadium': ['exact', 'in'],
+    }
+    ordering_fields = ['event_date']
+
     def __init__(self):
-        super().__init__(Calendar)
\ No newline at end of file
+        super().__init__(Calendar)
+
+    def get_all(self):
+        # stadium_info of the detail serializer reads event_stadium on every row
+        return self.model.objects.select_related('event_stadium')
+
+    def upcoming(self, stadium_ids, since, limit):
+        """
+        First limit events on or after since of each stadium, in one query:
+        ROW_NUMBER() over the (event_stadium, event_date) index range of
+        every stadium instead of one query per stadium
+        """
+        return self.get_all().filter(event_stadium__in=stadium_ids, event_date__gte=since).annotate(
+            stadium_row=Window(
+                RowNumber(), partition_by=F('event_stadium'), order_by=[F('event_date').asc(), F('event_id').asc()]
+            )
+        ).filter(stadium_row__lte=limit).order_by('event_stadium', 'event_date', 'event_id')
@@ -2,5 +2,12 @@ from .base_repository import BaseRepository
 from main.models import Coach
 
 class CoachRepository(BaseRepository):
+    # Rarely written, read on every retrieve
+    cache_timeout = 300
+
+    filter_fields = {
+        'coach_country': ['exact', 'in'],
+    }
+
     def __init__(self):
         super().__init__(Coach)
\ No newline at end of file
@@ -0,0 +1,103 @@
+# repositories/filtering.py
+"""
+Declarative filtering, ordering and search for repositories.
+
+A repository declares what clients may ask for:
+
+    filter_fields = {'player_team': ['exact', 'in'], 'goal_scored': ['gte', 'lte']}
+    ordering_fields = ['goal_scored', 'player_name']
+    search_fields = ['player_name']
+
+and BaseRepository.filter(queryset, params) turns query parameters into
+ORM lookups:
+
+    ?player_team=3&position__in=FW,MF    -> WHERE player_team_id = 3 AND position IN (...)
+    ?goal_scored__gte=10                 -> WHERE goal_scored >= 10
+    ?ordering=-goal_scored,player_name   -> ORDER BY goal_scored DESC, player_name, pk
+    ?search=Del                          -> WHERE player_name LIKE 'Del%' (prefix)
+
+Every declared field must be covered by a database index (primary key,
+unique, db_index/ForeignKey or the leading column of Meta.indexes), so
+each filter is an index lookup rather than a table scan; `manage.py
+check` reports main.E001 otherwise. Search is a case-insensitive prefix
+match, which MySQL serves from the index with its _ci collations.
+
+Parameters that are not model fields (fields, expand, format...) are
+ignored. A model field that isn't declared, an undeclared lookup or a
+value of the wrong type raises ValueError.
+"""
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+
+
+LOOKUPS = {'exact', 'in', 'gt', 'gte', 'lt', 'lte'}
+
+
+def indexed_fields(model):
+    """Names of the fields a lookup can use an index for"""
+    names = {
+        field.name for field in model._meta.concrete_fields
+        if field.primary_key or field.unique or field.db_index
+    }
+    names.update(index.fields[0].lstrip('-') for index in model._meta.indexes)
+    names.update(fields[0] for fields in model._meta.unique_together)
+    return names
+
+
+def unindexed(repository_class, model):
+    """Declared fields that no index covers"""
+    declared = set(repository_class.filter_fields) | set(repository_class.ordering_fields) \
+        | set(repository_class.search_fields)
+    return sorted(declared - indexed_fields(model))
+
+
+def parse_value(model_field, value):
+    field = model_field.target_field if model_field.is_relation else model_field
+    try:
+        return field.to_python(value)
+    except ValidationError as exc:
+        raise ValueError(f"Invalid value for {model_field.name}: {value!r}") from exc
+
+
+def filter_queryset(queryset, params, filter_fields, ordering_fields, search_fields):
+    model = queryset.model
+
+    conditions = {}
+    for key, values in params.lists():
+        name, _, lookup = key.partition('__')
+        try:
+            model_field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            continue
+        lookup = lookup or 'exact'
+        if name not in filter_fields:
+            raise ValueError(f"Filtering by {name} is not supported")
+        if lookup not in filter_fields[name]:
+            raise ValueError(f"Unsupported lookup {key}, use one of: {', '.join(filter_fields[name])}")
+
+        value = values[-1]
+        if lookup == 'in':
+            conditions[key] = [parse_value(model_field, item) for item in value.split(',') if item]
+        else:
+            conditions[key] = parse_value(model_field, value)
+    if conditions:
+        queryset = queryset.filter(**conditions)
+
+    search = params.get('search', '').strip()
+    if search and search_fields:
+        query = Q()
+        for name in search_fields:
+            query |= Q(**{f'{name}__istartswith': search})
+        queryset = queryset.filter(query)
+
+    ordering = params.get('ordering')
+    if ordering:
+        order_by = []
+        for term in ordering.split(','):
+            term = term.strip()
+            if term.lstrip('-') not in ordering_fields:
+                raise ValueError(f"Ordering by {term.lstrip('-')} is not supported")
+            order_by.append(term)
+        # Stable order for equal values (pagination, limit/offset)
+        queryset = queryset.order_by(*order_by, 'pk')
+    return queryset
@@ -2,5 +2,12 @@ from .base_repository import BaseRepository
 from main.models import History
 
 class HistoryRepository(BaseRepository):
+    filter_fields = {
+        'year': ['exact', 'gte', 'lte'],
+        'win_team': ['exact', 'in'],
+        'win_coach': ['exact', 'in'],
+    }
+    ordering_fields = ['year']
+
     def __init__(self):
         super().__init__(History)
\ No newline at end of file
@@ -1,7 +1,158 @@
+from datetime import date
+
+from django.db import connections, router
+from django.db.models import Count, Q, Sum, Case, When, F
+
 from .base_repository import BaseRepository
 from main.models import Match
+from main.signals import rows_updated
 
 class MatchRepository(BaseRepository):
+    filter_fields = {
+        'home_team': ['exact', 'in'],
+        'away_team': ['exact', 'in'],
+        'event': ['exact', 'in'],
+    }
+    ordering_fields = ['match_id']
+
+    live_topic = 'match'
+    live_fields = ('home_team', 'away_team', 'home_team_score', 'away_team_score')
+
     def __init__(self):
         super().__init__(Match)
 
+    def get_all(self):
+        # home_team_name / away_team_name are read on every row
+        return self.model.objects.select_related('home_team', 'away_team')
+
+    def on_dates(self, dates):
+        """
+        Matches of the calendar events on the given dates (one query:
+        calendar_event_date_idx, then the matches.event_id index)
+        """
+        return self.get_all().select_related('event').filter(event__event_date__in=dates).order_by('match_id')
+
+    def fixtures(self, date_from, date_to=None, team=None, after=None):
+        """
+        Matches by event date then match_id, from date_from (to date_to).
+        after=(event_date, match_id) continues after that match (keyset
+        pagination: a page costs the same at the end of a long calendar
+        as at the start)
+        """
+        queryset = self.get_all().select_related('event').filter(event__event_date__gte=date_from)
+        if date_to is not None:
+            queryset = queryset.filter(event__event_date__lte=date_to)
+        if team is not None:
+            queryset = queryset.filter(Q(home_team=team) | Q(away_team=team))
+        if after is not None:
+            after_date, after_id = after
+            # The >= bound keeps the calendar_event_date_idx range scan
+            queryset = queryset.filter(event__event_date__gte=after_date).filter(
+                Q(event__event_date__gt=after_date) | Q(event__event_date=after_date, match_id__gt=after_id)
+            )
+        return queryset.order_by('event__event_date', 'match_id')
+
+    def between(self, team_a, team_b):
+        """Matches of the two teams against each other (matches_home_away_idx)"""
+        return self.model.objects.filter(
+            Q(home_team=team_a, away_team=team_b) | Q(home_team=team_b, away_team=team_a)
+        )
+
+    def head_to_head(self, team_a, team_b):
+        """Totals of team_a vs team_b in one aggregate query"""
+        a_home = Q(home_team=team_a)
+        a_away = Q(away_team=team_a)
+        totals = self.between(team_a, team_b).aggregate(
+            played=Count('pk'),
+            team_a_wins=Count('pk', filter=(a_home & Q(home_team_score__gt=F('away_team_score')))
+                              | (a_away & Q(away_team_score__gt=F('home_team_score')))),
+            team_b_wins=Count('pk', filter=(a_home & Q(home_team_score__lt=F('away_team_score')))
+                              | (a_away & Q(away_team_score__lt=F('home_team_score')))),
+            draws=Count('pk', filter=Q(home_team_score=F('away_team_score'))),
+            team_a_goals=Sum(Case(When(a_home, then=F('home_team_score')), default=F('away_team_score'))),
+            team_b_goals=Sum(Case(When(a_home, then=F('away_team_score')), default=F('home_team_score'))),
+        )
+        # Sum() of no rows is None
+        return {key: value or 0 for key, value in totals.items()}
+
+    def recent_between(self, team_a, team_b, limit):
+        """Last limit matches of team_a vs team_b, newest first"""
+        return self.between(team_a, team_b).select_related('home_team', 'away_team').order_by('-match_id')[:limit]
+
+    def recent(self, team, limit):
+        """
+        Last limit matches of a team, newest first: by calendar date, then
+        match_id (matches without a calendar event count as the oldest).
+        Two LIMIT queries, home and away, instead of one OR over all of
+        the team's matches. The date is in the calendar table, so no index
+        on matches gives this order: each query reads the team's home (or
+        away) matches by the foreign key index and sorts them
+        """
+        order = [F('event_date').desc(nulls_last=True), '-match_id']
+        matches = self.model.objects.annotate(event_date=F('event__event_date'))
+        home = matches.filter(home_team=team).order_by(*order)[:limit]
+        away = matches.filter(away_team=team).order_by(*order)[:limit]
+        return sorted(
+            [*home, *away],
+            key=lambda match: (match.event_date or date.min, match.match_id),
+            reverse=True
+        )[:limit]
+
+    def teams_and_scores(self, match_ids):
+        """
+        {match_id: (home_team_id, away_team_id, home score, away score,
+        score_seq)} of the matches that exist, locked until the end of
+        the transaction
+        """
+        rows = self.model.objects.select_for_update().filter(pk__in=match_ids).values_list(
+            'pk', 'home_team_id', 'away_team_id', 'home_team_score', 'away_team_score', 'score_seq'
+        )
+        return {pk: tuple(values) for pk, *values in rows}
+
+    def update_scores(self, scores, batch_size=500):
+        """
+        Set the scores of many matches, {match_id: (home, away, seq)},
+        where seq is above the match's score_seq: one
+        UPDATE ... SET home_team_score = CASE WHEN match_id = ... AND
+        score_seq < ... per batch_size matches, so an older event never
+        overwrites a newer score. Sends rows_updated (main/signals.py)
+        instead of post_save.
+
+        The statement is written by hand: building the same UPDATE from
+        Case(When(...)) expressions costs more than running it
+        """
+        connection = connections[router.db_for_write(self.model)]
+        quote = connection.ops.quote_name
+        meta = self.model._meta
+        table, pk = quote(meta.db_table), quote(meta.pk.column)
+        home = quote(meta.get_field('home_team_score').column)
+        away = quote(meta.get_field('away_team_score').column)
+        seq = quote(meta.get_field('score_seq').column)
+
+        match_ids = list(scores)
+        updated = 0
+        with connection.cursor() as cursor:
+            for start in range(0, len(match_ids), batch_size):
+                batch = match_ids[start:start + batch_size]
+                whens = ' '.join([f'WHEN {pk} = %s AND {seq} < %s THEN %s'] * len(batch))
+                placeholders = ', '.join(['%s'] * len(batch))
+                params = []
+                for position in range(3):
+                    params += [
+                        value for pk_value in batch
+                        for value in (pk_value, scores[pk_value][2], scores[pk_value][position])
+                    ]
+                # MySQL assigns left to right: score_seq goes last, the
+                # scores still compare against the old one
+                cursor.execute(
+                    f"UPDATE {table} SET "
+                    f"{home} = CASE {whens} ELSE {home} END, "
+                    f"{away} = CASE {whens} ELSE {away} END, "
+                    f"{seq} = CASE {whens} ELSE {seq} END "
+                    f"WHERE {pk} IN ({placeholders})",
+                    params + batch
+                )
+                updated += cursor.rowcount
+        if match_ids:
+            rows_updated.send(sender=self.model, using=connection.alias)
+        return updated
@@ -2,5 +2,11 @@ from .base_repository import BaseRepository
 from main.models import PlayerDetailed
 
 class PlayerDetailedRepository(BaseRepository):
+    filter_fields = {
+        'player_country': ['exact', 'in'],
+        'player_age': ['exact', 'gte', 'lte'],
+    }
+    ordering_fields = ['player_age']
+
     def __init__(self):
         super().__init__(PlayerDetailed)
\ No newline at end of file
@@ -2,5 +2,17 @@ from .base_repository import BaseRepository
 from main.models import PlayerTechnical
 
 class PlayerTechnicalRepository(BaseRepository):
+    filter_fields = {
+        'player_team': ['exact', 'in'],
+        'position': ['exact', 'in'],
+        'goal_scored': ['exact', 'gte', 'lte'],
+        'assist_scored': ['exact', 'gte', 'lte'],
+    }
+    ordering_fields = ['player_name', 'goal_scored', 'assist_scored']
+    search_fields = ['player_name']
+
     def __init__(self):
-        super().__init__(PlayerTechnical)
\ No newline at end of file
+        super().__init__(PlayerTechnical)
+
+    def get_all(self):
+        return self.model.objects.select_related('player_team')
\ No newline at end of file
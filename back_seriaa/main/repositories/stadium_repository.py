@@ -2,5 +2,16 @@ from .base_repository import BaseRepository
 from main.models import Stadium
 
 class StadiumRepository(BaseRepository):
+    # Rarely written, read on every retrieve
+    cache_timeout = 300
+
+    filter_fields = {
+        'stadium_team': ['exact', 'in'],
+    }
+
     def __init__(self):
-        super().__init__(Stadium)
\ No newline at end of file
+        super().__init__(Stadium)
+
+    def get_all(self):
+        # team of the detail serializer reads stadium_team on every row
+        return self.model.objects.select_related('stadium_team')
@@ -0,0 +1,117 @@
+# repositories/team_form_repository.py
+"""
+Per-team form: wins / draws / loses, points and goals of the last
+TeamForm.FORM_MATCHES matches (newest = latest calendar date, then
+highest match_id), stored in the team_form table so /api/match/form/ is
+one query.
+
+A Match save or delete refreshes the form of both teams (and of the
+previous teams if they changed) after the transaction commits; each
+refresh reads the team's home and away matches with their calendar
+dates (MatchRepository.recent()). bulk_create() / QuerySet.update() send no
+signals: call refresh() with the affected team ids, or run
+`manage.py rebuild_team_form`. Teams without a row get one on first read.
+"""
+from django.db import connections, router, transaction
+from django.db.models.signals import pre_save, post_save, post_delete
+
+from .base_repository import BaseRepository
+from .match_repository import MatchRepository
+from main.models import Match, Team, TeamForm
+
+
+def match_result(match, team_id):
+    """(result letter, goals for, goals against) of a match for one of its teams"""
+    if match.home_team_id == team_id:
+        scored, conceded = match.home_team_score, match.away_team_score
+    else:
+        scored, conceded = match.away_team_score, match.home_team_score
+    if scored > conceded:
+        return 'W', scored, conceded
+    if scored < conceded:
+        return 'L', scored, conceded
+    return 'D', scored, conceded
+
+
+class TeamFormRepository(BaseRepository):
+
+    def __init__(self):
+        super().__init__(TeamForm)
+        self.matches = MatchRepository()
+
+    def get_all(self):
+        return self.model.objects.select_related('team').order_by('-points', '-goals_for', 'team_id')
+
+    def compute(self, team_id):
+        """Unsaved TeamForm of a team from its last FORM_MATCHES matches"""
+        form = TeamForm(team_id=team_id)
+        recent = self.matches.recent(team_id, TeamForm.FORM_MATCHES)
+        results = []
+        for match in recent:
+            result, scored, conceded = match_result(match, team_id)
+            results.append(result)
+            form.goals_for += scored
+            form.goals_against += conceded
+        form.matches = len(results)
+        form.wins = results.count('W')
+        form.draws = results.count('D')
+        form.loses = results.count('L')
+        form.points = 3 * form.wins + form.draws
+        form.results = ''.join(results)
+        form.last_match_id = recent[0].match_id if recent else None
+        return form
+
+    def refresh(self, team_ids):
+        """Recompute and store the form of the given teams (that still exist)"""
+        existing = Team.objects.filter(pk__in=set(team_ids)).values_list('pk', flat=True)
+        forms = [self.compute(team_id) for team_id in existing]
+        fields = [field.name for field in TeamForm._meta.concrete_fields if not field.primary_key]
+        # MySQL's ON DUPLICATE KEY UPDATE takes no conflict target
+        features = connections[router.db_for_write(TeamForm)].features
+        unique_fields = ['team'] if features.supports_update_conflicts_with_target else None
+        TeamForm.objects.bulk_create(
+            forms, update_conflicts=True, unique_fields=unique_fields, update_fields=fields
+        )
+        return forms
+
+    def for_teams(self, team_ids=None):
+        """
+        Stored forms of the given teams (all teams by default). Missing
+        ones are computed, stored and returned as computed: reading them
+        back could hit a read replica that doesn't have them yet
+        """
+        forms = self.get_all()
+        teams = Team.objects.all()
+        if team_ids is not None:
+            forms = forms.filter(team_id__in=team_ids)
+            teams = teams.filter(pk__in=team_ids)
+        forms = list(forms)
+        missing = teams.exclude(pk__in=[form.team_id for form in forms]).in_bulk()
+        if missing:
+            for form in self.refresh(missing):
+                form.team = missing[form.team_id]
+                forms.append(form)
+            forms.sort(key=lambda form: (-form.points, -form.goals_for, form.team_id))
+        return forms
+
+
+def remember_teams(sender, instance, update_fields=None, **kwargs):
+    """Teams of the stored row, whose form changes if the match moves to other teams"""
+    instance._form_previous_teams = ()
+    if instance._state.adding:
+        return
+    if update_fields is not None and not {'home_team', 'away_team'} & set(update_fields):
+        return
+    row = Match.objects.filter(pk=instance.pk).values_list('home_team_id', 'away_team_id').first()
+    instance._form_previous_teams = row or ()
+
+
+def refresh_form(sender, instance, **kwargs):
+    team_ids = {instance.home_team_id, instance.away_team_id, *getattr(instance, '_form_previous_teams', ())}
+    transaction.on_commit(lambda: TeamFormRepository().refresh(team_ids))
+
+
+def connect_signals():
+    pre_save.connect(remember_teams, sender=Match, dispatch_uid='team_form_previous_teams')
+    post_save.connect(refresh_form, sender=Match, dispatch_uid='team_form_save')
+    post_delete.connect(refresh_form, sender=Match, dispatch_uid='team_form_delete')
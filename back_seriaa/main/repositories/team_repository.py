@@ -2,5 +2,19 @@ from .base_repository import BaseRepository
 from main.models import Team
 
 class TeamRepository(BaseRepository):
+    # Rarely written, read on every retrieve
+    cache_timeout = 300
+
+    filter_fields = {
+        'team_name': ['exact'],
+        'points': ['exact', 'gte', 'lte'],
+        'goal_difference': ['gte', 'lte'],
+    }
+    ordering_fields = ['team_name', 'points', 'goal_difference']
+    search_fields = ['team_name']
+
+    live_topic = 'team'
+    live_fields = ('points', 'wins', 'draws', 'loses', 'goal_difference')
+
     def __init__(self):
         super().__init__(Team)
\ No newline at end of file
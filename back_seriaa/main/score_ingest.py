@@ -0,0 +1,229 @@
+# main/score_ingest.py
+"""
+Live score ingestion: POST /api/match/scores/.
+
+The feed posts batches of absolute scores, each with its own idempotency
+key and the match's sequence number (increasing with every score event
+of that match):
+
+    {"events": [
+        {"key": "feed-8812", "match_id": 17, "seq": 1, "home_team_score": 1, "away_team_score": 0},
+        {"key": "feed-8813", "match_id": 17, "seq": 2, "home_team_score": 2, "away_team_score": 0},
+        ...
+    ]}
+
+* Keys already applied (in this batch, or stored in ScoreEventKey in the
+  last KEY_TTL seconds) are dropped, so a retried batch is applied once
+  whichever process gets it.
+* The remaining events are coalesced per match, the highest seq wins.
+  An event whose seq is not above the match's score_seq is stale (an
+  older retry arriving late) and changes nothing: the UPDATE checks
+  score_seq per row as well.
+* Concurrent requests are group-committed: while one request writes,
+  the others queue their events; the next writer waits
+  SCORE_INGEST_WINDOW seconds for more requests, takes the whole queue,
+  coalesces it again and applies it with one
+  UPDATE ... SET home_team_score = CASE WHEN match_id = ... (per 500
+  matches), in one transaction, instead of a get_by_id + serializer +
+  save() per update.
+
+The matches are locked (SELECT ... FOR UPDATE) and the keys are stored
+in the same transaction as the scores, so a failed batch can be retried
+as is. A match.updated event per match whose score changed is recorded
+for the live stream (main/live.py) in that transaction too; after commit
+the form of the affected teams is refreshed and their cached Match rows
+are dropped.
+"""
+import hashlib
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import router, transaction
+from django.utils import timezone
+
+from . import live
+from .models import Match, ScoreEventKey
+from .repositories.cache import RepositoryCache
+from .repositories.match_repository import MatchRepository
+from .repositories.team_form_repository import TeamFormRepository
+
+
+MAX_EVENTS = 5000
+MAX_KEY_LENGTH = 100
+# Seconds a key is remembered
+KEY_TTL = 6 * 3600
+# Seconds between deletes of expired keys (per process)
+PRUNE_INTERVAL = 600
+# Keys per SELECT ... WHERE key IN (...)
+KEY_BATCH = 1000
+
+SCORE_FIELDS = ('home_team_score', 'away_team_score')
+
+
+def parse_events(data):
+    """[(key hash, match_id, home score, away score, seq)] from the request body; raises ValueError"""
+    events = data.get('events') if isinstance(data, dict) else data
+    if not isinstance(events, list) or not events:
+        raise ValueError("events must be a non-empty list")
+    if len(events) > MAX_EVENTS:
+        raise ValueError(f"At most {MAX_EVENTS} events per request")
+
+    parsed = []
+    for position, event in enumerate(events):
+        if not isinstance(event, dict):
+            raise ValueError(f"events[{position}] must be an object")
+        key = event.get('key')
+        if not isinstance(key, str) or not key or len(key) > MAX_KEY_LENGTH:
+            raise ValueError(f"events[{position}].key must be a string of 1-{MAX_KEY_LENGTH} characters")
+        values = []
+        for field in ('match_id',) + SCORE_FIELDS:
+            value = event.get(field)
+            # bool is an int too
+            if type(value) is not int or value < 0:
+                raise ValueError(f"events[{position}].{field} must be a non-negative integer")
+            values.append(value)
+        seq = event.get('seq')
+        if type(seq) is not int or seq < 1:
+            raise ValueError(f"events[{position}].seq must be a positive integer")
+        parsed.append((key_hash(key), *values, seq))
+    return parsed
+
+
+def key_hash(key):
+    return hashlib.sha1(key.encode()).hexdigest()
+
+
+def applied_keys(keys, using):
+    """The keys stored in ScoreEventKey"""
+    keys = list(keys)
+    found = set()
+    for start in range(0, len(keys), KEY_BATCH):
+        found.update(
+            ScoreEventKey.objects.using(using).filter(key__in=keys[start:start + KEY_BATCH])
+            .values_list('key', flat=True)
+        )
+    return found
+
+
+class ScoreWriter:
+    """Group commit of score updates from concurrent requests"""
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.queue = []
+        self.writing = False
+        # Transactions written and requests they carried, for the benchmark
+        self.flushes = 0
+        self.requests = 0
+        self.last_prune = 0.0
+
+    def submit(self, events):
+        """Apply parsed events; returns the counts for the response"""
+        entry = {'events': events, 'done': False, 'result': None, 'error': None}
+        with self.condition:
+            self.queue.append(entry)
+            while self.writing and not entry['done']:
+                self.condition.wait()
+            leader = not entry['done']
+            if leader:
+                # This request writes everything queued by the end of the window
+                self.writing = True
+
+        if leader:
+            if settings.SCORE_INGEST_WINDOW:
+                time.sleep(settings.SCORE_INGEST_WINDOW)
+            with self.condition:
+                batch, self.queue = self.queue, []
+            try:
+                self.write(batch)
+            except Exception as exc:
+                for queued in batch:
+                    queued['error'] = exc
+            finally:
+                with self.condition:
+                    for queued in batch:
+                        queued['done'] = True
+                    self.writing = False
+                    self.condition.notify_all()
+
+        if entry['error'] is not None:
+            raise entry['error']
+        return entry['result']
+
+    def write(self, batch):
+        match_ids = {event[1] for entry in batch for event in entry['events']}
+        keys = {event[0] for entry in batch for event in entry['events']}
+
+        repository = MatchRepository()
+        using = router.db_for_write(Match)
+        with transaction.atomic(using=using):
+            current = repository.teams_and_scores(list(match_ids))
+            seen = applied_keys(keys, using)
+
+            # {match_id: (home, away, seq)} of the newest event per match
+            latest, new_keys = {}, []
+            for entry in batch:
+                duplicates = stale = 0
+                for key, match_id, home, away, seq in entry['events']:
+                    if key in seen:
+                        duplicates += 1
+                        continue
+                    seen.add(key)
+                    if match_id not in current:
+                        # Not remembered: the feed may retry once the match exists
+                        continue
+                    new_keys.append(ScoreEventKey(key=key))
+                    if seq <= current[match_id][4]:
+                        stale += 1
+                    elif match_id not in latest or seq >= latest[match_id][2]:
+                        latest[match_id] = (home, away, seq)
+                entry['result'] = {
+                    "received": len(entry['events']),
+                    "duplicates": duplicates,
+                    "stale": stale,
+                    "unknown_matches": sorted({event[1] for event in entry['events']} - set(current)),
+                }
+
+            repository.update_scores(latest)
+            ScoreEventKey.objects.using(using).bulk_create(new_keys, batch_size=KEY_BATCH, ignore_conflicts=True)
+
+            changed = {pk: values[:2] for pk, values in latest.items() if values[:2] != current[pk][2:4]}
+            team_ids = {team for pk in changed for team in current[pk][:2]}
+            if team_ids:
+                transaction.on_commit(lambda: TeamFormRepository().refresh(team_ids), using=using)
+            for pk in latest:
+                # score_seq changed even where the score did not
+                RepositoryCache.invalidate(Match, pk, using=using)
+            events = []
+            for pk in changed:
+                before = dict(zip(repository.live_fields, current[pk]))
+                after = dict(zip(repository.live_fields, current[pk][:2] + changed[pk]))
+                events.append((repository.live_topic, 'updated', live.change(pk, before, after)))
+            if events:
+                live.publish_many(events, using=using)
+
+        for entry in batch:
+            entry['result']['matches_updated'] = len({event[1] for event in entry['events']} & changed.keys())
+        self.flushes += 1
+        self.requests += len(batch)
+        self.prune(using)
+
+    def prune(self, using):
+        """Delete keys older than KEY_TTL, at most once per PRUNE_INTERVAL"""
+        now = time.monotonic()
+        if now - self.last_prune < PRUNE_INTERVAL:
+            return
+        self.last_prune = now
+        ScoreEventKey.objects.using(using).filter(
+            created_at__lt=timezone.now() - timedelta(seconds=KEY_TTL)
+        ).delete()
+
+
+writer = ScoreWriter()
+
+
+def ingest(data):
+    """Apply a batch of score events; returns counts for the response"""
+    return writer.submit(parse_events(data))
@@ -0,0 +1,424 @@
+# main/search.py
+"""
+In-process search index over team and player names.
+
+Names are normalized (accents stripped, case-folded, split into words)
+and kept in numpy arrays, a few tens of bytes per name:
+
+* a sorted array of full names and one of words - a word or full-name
+  prefix is a pair of binary searches (np.searchsorted);
+* trigram postings (CSR: sorted trigram codes -> name indexes) - a typo
+  or a fragment from the middle of a name is found by counting shared
+  trigrams with np.bincount.
+
+search() ranks exact name > name prefix > every query word is a prefix of
+a word in the name > trigram similarity (at least MIN_TRIGRAM_SIMILARITY
+of the query's trigrams); ties go to the shorter name, then alphabetical.
+Only ids come out of the index, names are read back by primary key.
+numpy is imported on the first build or query, not with the module.
+candidate_ids() gives the rows a name__icontains filter can match, so the
+dashboard narrows its query by primary key before the LIKE recheck - only
+from an index built at the current version, since a missing candidate
+would drop a row. That needs a shared repositories cache (file, Redis):
+with a per-process one (locmem) a process can't see other processes'
+renames, and candidate_ids() always returns None - the dashboard then
+filters with LIKE alone.
+
+The first search in each process starts building the index in a
+background thread, and search() answers from the database (LIKE on
+every query word, without typo tolerance) until it is ready, so no
+request waits for a full scan of both tables. Saving or deleting a Team /
+PlayerTechnical bumps a version (in this process and in the
+repositories cache, so other processes sharing a file or Redis cache see
+it too); the next search rebuilds the index, synchronously for small
+tables and in the background above SYNC_REBUILD_ROWS names while the
+previous index keeps answering.
+"""
+import re
+import threading
+import unicodedata
+
+from django.core.cache import caches
+from django.db import connections
+from django.db.models import Q
+from django.db.models.functions import Length
+from django.db.models.signals import post_save, post_delete
+
+from .models import Team, PlayerTechnical
+from .repositories.cache import cache_alias, is_shared
+
+
+# (model, result type, name field)
+SEARCH_MODELS = [
+    (Team, 'team', 'team_name'),
+    (PlayerTechnical, 'player', 'player_name'),
+]
+
+# Bytes of the normalized name / word kept for prefix search and trigrams
+NAME_BYTES = 32
+WORD_BYTES = 12
+TRIGRAM_BYTES = 24
+
+MIN_TRIGRAM_SIMILARITY = 0.5
+
+# Bigger indexes are rebuilt in a background thread
+SYNC_REBUILD_ROWS = 50_000
+
+VERSION_KEY = 'search:version'
+
+_WORD = re.compile(r'\w+')
+
+
+def normalize(text):
+    """'Alessandro Del Piero' / 'DEL PIÈRO' -> 'alessandro del piero' / 'del piero'"""
+    text = text or ''
+    if not text.isascii():
+        text = ''.join(ch for ch in unicodedata.normalize('NFKD', text) if not unicodedata.combining(ch))
+    return ' '.join(_WORD.findall(text.casefold()))
+
+
+def prefix_range(sorted_values, prefix, width):
+    """[lo, hi) of the values in a sorted S<width> array that start with prefix"""
+    import numpy as np
+
+    prefix = prefix[:width]
+    lo = np.searchsorted(sorted_values, prefix, side='left')
+    if len(prefix) == width:
+        # Stored values are cut at width bytes: a full-width prefix is an exact match
+        hi = np.searchsorted(sorted_values, prefix, side='right')
+    else:
+        hi = np.searchsorted(sorted_values, prefix + b'\xff', side='left')
+    return int(lo), int(hi)
+
+
+def sorted_unique(values):
+    """np.unique for 1-d arrays by sorting (its hash-based path is slower here)"""
+    import numpy as np
+
+    values = np.sort(values)
+    if len(values):
+        values = values[np.append(True, values[1:] != values[:-1])]
+    return values
+
+
+def trigram_codes(names):
+    """(row, trigram code) pairs of an S<TRIGRAM_BYTES> array, one per distinct trigram"""
+    import numpy as np
+
+    matrix = names.astype(f'S{TRIGRAM_BYTES}').view(np.uint8).reshape(len(names), TRIGRAM_BYTES).astype(np.int64)
+    codes = (matrix[:, :-2] << 16) | (matrix[:, 1:-1] << 8) | matrix[:, 2:]
+    rows = np.broadcast_to(np.arange(len(names), dtype=np.int64)[:, None], codes.shape)
+    valid = matrix[:, 2:] != 0
+    # code << 32 | row, deduplicated and sorted by code then row
+    keys = sorted_unique((codes[valid] << 32) | rows[valid])
+    return (keys & 0xFFFFFFFF).astype(np.int32), (keys >> 32).astype(np.int32)
+
+
+class SearchIndex:
+
+    def __init__(self, kinds, ids, names, version=None):
+        """kinds: index into SEARCH_MODELS, ids: primary keys, names: normalized names"""
+        import numpy as np
+
+        self.version = version
+        self.kinds = np.asarray(kinds, dtype=np.int8)
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.size = len(self.ids)
+
+        encoded = [name.encode() for name in names]
+        full = np.array(encoded, dtype=f'S{NAME_BYTES}') if encoded else np.array([], dtype=f'S{NAME_BYTES}')
+        self.lengths = np.fromiter((len(name) for name in encoded), dtype=np.int64, count=self.size)
+
+        # Full names in sorted order; rank[i] = position of name i in it
+        self.name_order = np.argsort(full, kind='stable').astype(np.int32)
+        self.sorted_names = full[self.name_order]
+        self.rank = np.empty(self.size, dtype=np.int64)
+        self.rank[self.name_order] = np.arange(self.size)
+
+        words, word_rows = [], []
+        for row, name in enumerate(encoded):
+            for word in name.split():
+                words.append(word[:WORD_BYTES])
+                word_rows.append(row)
+        words = np.array(words, dtype=f'S{WORD_BYTES}')
+        order = np.argsort(words, kind='stable')
+        self.sorted_words = words[order]
+        self.word_rows = np.asarray(word_rows, dtype=np.int32)[order]
+
+        rows, codes = trigram_codes(full)
+        starts = np.flatnonzero(np.append(True, codes[1:] != codes[:-1])) if len(codes) else np.array([], dtype=np.int64)
+        self.trigram_keys = codes[starts]
+        self.trigram_offsets = np.append(starts, len(codes)).astype(np.int64)
+        self.trigram_rows = rows
+
+    @classmethod
+    def build(cls, version=None):
+        kinds, ids, names = [], [], []
+        for kind, (model, _, field) in enumerate(SEARCH_MODELS):
+            for pk, name in model.objects.values_list('pk', field).iterator(chunk_size=10000):
+                kinds.append(kind)
+                ids.append(pk)
+                names.append(normalize(name))
+        return cls(kinds, ids, names, version)
+
+    def word_matches(self, words):
+        """Rows where every query word is a prefix of some word of the name"""
+        import numpy as np
+
+        ranges = sorted(
+            (prefix_range(self.sorted_words, word.encode(), WORD_BYTES) for word in words),
+            key=lambda bounds: bounds[1] - bounds[0]
+        )
+        rows = sorted_unique(self.word_rows[ranges[0][0]:ranges[0][1]])
+        for lo, hi in ranges[1:]:
+            if not len(rows):
+                break
+            matched = np.zeros(self.size, dtype=bool)
+            matched[self.word_rows[lo:hi]] = True
+            rows = rows[matched[rows]]
+        return rows
+
+    def trigram_matches(self, query, exclude):
+        """(rows, shared trigram count, query trigram count) for fuzzy matches"""
+        import numpy as np
+
+        _, codes = trigram_codes(np.array([query], dtype=f'S{NAME_BYTES}'))
+        positions = np.searchsorted(self.trigram_keys, codes)
+        found = positions < len(self.trigram_keys)
+        found[found] = self.trigram_keys[positions[found]] == codes[found]
+        positions = positions[found]
+        if not len(positions):
+            return np.array([], dtype=np.int64), np.array([], dtype=np.int64), len(codes)
+
+        postings = np.concatenate([
+            self.trigram_rows[self.trigram_offsets[p]:self.trigram_offsets[p + 1]] for p in positions
+        ])
+        counts = np.bincount(postings, minlength=self.size)
+        counts[exclude] = 0
+        needed = max(1, int(np.ceil(MIN_TRIGRAM_SIMILARITY * len(codes))))
+        rows = np.flatnonzero(counts >= needed)
+        return rows, counts[rows], len(codes)
+
+    def containing(self, fragment, kind):
+        """
+        Ids of the given kind whose name may contain fragment (a superset:
+        every trigram of the fragment is in the name, or the name is longer
+        than the indexed TRIGRAM_BYTES)
+        """
+        import numpy as np
+
+        _, codes = trigram_codes(np.array([fragment.encode()], dtype=f'S{NAME_BYTES}'))
+        positions = np.searchsorted(self.trigram_keys, codes)
+        found = positions < len(self.trigram_keys)
+        found[found] = self.trigram_keys[positions[found]] == codes[found]
+
+        candidates = self.lengths > TRIGRAM_BYTES
+        if found.all():
+            postings = np.concatenate([
+                self.trigram_rows[self.trigram_offsets[p]:self.trigram_offsets[p + 1]] for p in positions
+            ])
+            candidates |= np.bincount(postings, minlength=self.size) == len(codes)
+        candidates &= self.kinds == kind
+        return self.ids[candidates]
+
+    def top(self, rows, primary, limit):
+        """
+        Positions in rows of the first limit rows ordered by primary
+        (ascending), then name length and name
+        """
+        import numpy as np
+
+        keys = (primary.astype(np.int64) << 40) | (self.lengths[rows] << 24) | self.rank[rows]
+        positions = np.arange(len(rows))
+        if len(rows) > limit:
+            positions = np.argpartition(keys, limit)[:limit]
+        return positions[np.argsort(keys[positions], kind='stable')]
+
+    def search(self, query, limit=10, types=None):
+        """[(result type, pk, score)] best first; score 3 exact, 2 prefix, 1 words, <1 trigram"""
+        import numpy as np
+
+        query = normalize(query)
+        if not query or not self.size:
+            return []
+        encoded = query.encode()
+
+        allowed = None
+        if types:
+            allowed = np.array([kind for kind, (_, label, _) in enumerate(SEARCH_MODELS) if label in types])
+
+        rows = self.word_matches(query.split())
+        if allowed is not None:
+            rows = rows[np.isin(self.kinds[rows], allowed)]
+
+        # Name prefix / exact name: ranges of the sorted full names
+        lo, hi = prefix_range(self.sorted_names, encoded, NAME_BYTES)
+        exact_lo = int(np.searchsorted(self.sorted_names, encoded[:NAME_BYTES], side='left'))
+        exact_hi = int(np.searchsorted(self.sorted_names, encoded[:NAME_BYTES], side='right'))
+        ranks = self.rank[rows]
+        quality = 1 + ((ranks >= lo) & (ranks < hi)) + ((ranks >= exact_lo) & (ranks < exact_hi))
+
+        best = self.top(rows, 3 - quality, limit)
+        results = list(zip(rows[best].tolist(), quality[best].astype(float).tolist()))
+
+        if len(results) < limit and len(encoded) >= 3:
+            fuzzy, shared, total = self.trigram_matches(encoded, rows)
+            if allowed is not None:
+                keep = np.isin(self.kinds[fuzzy], allowed)
+                fuzzy, shared = fuzzy[keep], shared[keep]
+            best = self.top(fuzzy, total - shared, limit - len(results))
+            results += zip(fuzzy[best].tolist(), np.round(shared[best] / total, 3).tolist())
+
+        return [(SEARCH_MODELS[self.kinds[row]][1], int(self.ids[row]), score) for row, score in results]
+
+
+_index = None
+_index_lock = threading.Lock()
+_rebuilding = threading.Event()
+_local_version = 0
+
+
+def current_version():
+    """Writes seen by this process and, through the shared cache, by others"""
+    alias = cache_alias()
+    shared = caches[alias].get(VERSION_KEY, 0) if alias else 0
+    return (_local_version, shared)
+
+
+def bump_version(sender, instance=None, update_fields=None, **kwargs):
+    global _local_version
+    name_field = next(field for model, _, field in SEARCH_MODELS if model is sender)
+    if update_fields is not None and name_field not in update_fields:
+        return
+    _local_version += 1
+    alias = cache_alias()
+    if alias:
+        cache = caches[alias]
+        try:
+            cache.incr(VERSION_KEY)
+        except ValueError:
+            cache.set(VERSION_KEY, 1, None)
+
+
+def rebuild(version):
+    global _index
+    index = SearchIndex.build(version)
+    with _index_lock:
+        _index = index
+    return index
+
+
+def rebuild_in_background(version):
+    def run():
+        try:
+            rebuild(version)
+        finally:
+            connections.close_all()
+            _rebuilding.clear()
+
+    with _index_lock:
+        if _rebuilding.is_set():
+            return
+        _rebuilding.set()
+    threading.Thread(target=run, name='search-index-rebuild', daemon=True).start()
+
+
+def search_index():
+    """
+    Current index, rebuilt if names changed since it was built, or None
+    while the first build is running in the background
+    """
+    version = current_version()
+    index = _index
+    if index is not None and index.version == version:
+        return index
+    if index is not None and index.size < SYNC_REBUILD_ROWS:
+        return rebuild(version)
+    # First build or a large index: the previous one (or the database) answers meanwhile
+    rebuild_in_background(version)
+    return index
+
+
+def database_search(query, limit=10, types=None):
+    """
+    SearchIndex.search() from the database, for a process whose index is
+    not built yet: names containing every query word, exact name > name
+    prefix > the rest, shorter names first. No typo tolerance, and accents
+    are compared as the database collation does
+    """
+    query = normalize(query)
+    if not query:
+        return []
+
+    hits = []
+    for model, label, field in SEARCH_MODELS:
+        if types and label not in types:
+            continue
+        condition = Q()
+        for word in query.split():
+            condition &= Q(**{f'{field}__icontains': word})
+        names = model.objects.filter(condition).order_by(Length(field), field).values_list('pk', field)
+        for pk, name in names[:limit]:
+            name = normalize(name)
+            score = 3.0 if name == query else 2.0 if name.startswith(query) else 1.0
+            hits.append((label, pk, score, name))
+
+    hits.sort(key=lambda hit: (-hit[2], len(hit[3]), hit[3]))
+    return [(label, pk, score) for label, pk, score, _ in hits[:limit]]
+
+
+def search(query, limit=10, types=None):
+    """Ranked [{'type', 'id', 'name', 'score', ...}] for /api/search/"""
+    index = search_index()
+    if index is None:
+        hits = database_search(query, limit, types)
+    else:
+        hits = index.search(query, limit, types)
+
+    rows = {}
+    for model, label, field in SEARCH_MODELS:
+        ids = [pk for kind, pk, _ in hits if kind == label]
+        if not ids:
+            continue
+        if model is PlayerTechnical:
+            values = model.objects.filter(pk__in=ids).values_list('pk', field, 'player_team__team_name')
+            rows.update({(label, pk): {'name': name, 'team': team} for pk, name, team in values})
+        else:
+            values = model.objects.filter(pk__in=ids).values_list('pk', field)
+            rows.update({(label, pk): {'name': name} for pk, name in values})
+
+    # Rows deleted since the index was built are skipped
+    return [
+        {'type': label, 'id': pk, 'score': score, **rows[(label, pk)]}
+        for label, pk, score in hits if (label, pk) in rows
+    ]
+
+
+def candidate_ids(model, fragment):
+    """
+    Primary keys of the model's rows whose name may contain fragment
+    (name__icontains), or None when the index can't narrow it down - a
+    fragment shorter than a trigram or with characters normalize() drops,
+    no index yet, or an index that may miss recent writes: one still being
+    rebuilt in the background, or any index when the version lives in a
+    per-process cache and other processes' writes are not seen (so with
+    locmem it is always None)
+    """
+    kind = next(kind for kind, (search_model, _, _) in enumerate(SEARCH_MODELS) if search_model is model)
+    fragment = fragment.strip()
+    normalized = normalize(fragment)
+    if len(normalized) < 3 or normalized != fragment.casefold():
+        return None
+    if not is_shared():
+        return None
+    version = current_version()
+    index = search_index()
+    if index is None or index.version != version:
+        return None
+    return index.containing(normalized, kind).tolist()
+
+
+def connect_signals():
+    for model, label, _ in SEARCH_MODELS:
+        post_save.connect(bump_version, sender=model, dispatch_uid=f'search_index_save_{label}')
+        post_delete.connect(bump_version, sender=model, dispatch_uid=f'search_index_delete_{label}')
@@ -1,8 +1,14 @@
 # main/serializers.py
+from collections import defaultdict
+
+from django.utils import timezone
 from rest_framework import serializers
+from .fast_serializers import ValuesSerializer
+from .repositories.calendar_repository import CalendarRepository
+from .repositories.match_repository import MatchRepository
 from .models import (
     Team, Coach, Stadium, Calendar, 
-    History, Match, PlayerDetailed, PlayerTechnical
+    History, Match, PlayerDetailed, PlayerTechnical, TeamForm
 )
 
 
@@ -40,7 +46,7 @@ class HistoryCreateSerializer(serializers.ModelSerializer):
 class MatchCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Match
-        fields = ['match_id', 'home_team', 'away_team', 'home_team_score', 'away_team_score']
+        fields = ['match_id', 'home_team', 'away_team', 'home_team_score', 'away_team_score', 'event']
 
 
 class PlayerTechnicalBaseSerializer(serializers.ModelSerializer):
@@ -113,18 +119,45 @@ class CoachDetailSerializer(serializers.ModelSerializer):
         return list(winning_years)
 
 
+def upcoming_events(stadium_ids, limit):
+    """{stadium id: [CalendarBaseSerializer data]} of the next events, in one query"""
+    grouped = defaultdict(list)
+    if not stadium_ids:
+        return grouped
+    queryset = CalendarRepository().upcoming(stadium_ids, timezone.localdate(), limit)
+    fast = ValuesSerializer.for_serializer(CalendarBaseSerializer)
+    for row in fast.serialize(queryset) if fast is not None else CalendarBaseSerializer(queryset, many=True).data:
+        grouped[row['event_stadium']].append(row)
+    return grouped
+
+
+class StadiumListSerializer(serializers.ListSerializer):
+    """Loads upcoming_matches for every stadium of the list in one query"""
+
+    def to_representation(self, data):
+        stadiums = list(data.all() if hasattr(data, 'all') else data)
+        if 'upcoming_matches' in self.child.fields:
+            self.upcoming_by_stadium = upcoming_events(
+                {stadium.stadium_id for stadium in stadiums}, self.child.UPCOMING_EVENTS
+            )
+        return super().to_representation(stadiums)
+
+
 class StadiumDetailSerializer(serializers.ModelSerializer):
     # Команда, яка грає на стадіоні
     team = serializers.SerializerMethodField()
     # Матчі на цьому стадіоні
     upcoming_matches = serializers.SerializerMethodField()
 
+    UPCOMING_EVENTS = 5
+
     class Meta:
         model = Stadium
         fields = [
             'stadium_id', 'stadium_name', 'stadium_team', 'capacity', 'city',
             'team', 'upcoming_matches'
         ]
+        list_serializer_class = StadiumListSerializer
 
     def get_team(self, obj):
         if obj.stadium_team:
@@ -132,12 +165,11 @@ class StadiumDetailSerializer(serializers.ModelSerializer):
         return None
 
     def get_upcoming_matches(self, obj):
-        from django.utils import timezone
-        upcoming_matches = Calendar.objects.filter(
-            event_stadium=obj,
-            event_date__gte=timezone.now()
-        ).order_by('event_date')[:5]  # Наступні 5 матчів
-        return CalendarBaseSerializer(upcoming_matches, many=True).data
+        # Наступні UPCOMING_EVENTS подій: у списку - вже завантажені StadiumListSerializer
+        upcoming = getattr(self.parent, 'upcoming_by_stadium', None)
+        if upcoming is None:
+            upcoming = upcoming_events([obj.stadium_id], self.UPCOMING_EVENTS)
+        return upcoming.get(obj.stadium_id, [])
 
 
 class PlayerTechnicalDetailSerializer(serializers.ModelSerializer):
@@ -273,12 +305,13 @@ class PlayerDetailedCreateSerializer(serializers.ModelSerializer):
 class MatchBaseSerializer(serializers.ModelSerializer):
     home_team_name = serializers.CharField(source='home_team.team_name', read_only=True)
     away_team_name = serializers.CharField(source='away_team.team_name', read_only=True)
+    event_date = serializers.DateField(source='event.event_date', read_only=True)
 
     class Meta:
         model = Match
         fields = [
             'match_id', 'home_team', 'away_team', 'home_team_name', 'away_team_name',
-            'home_team_score', 'away_team_score'
+            'home_team_score', 'away_team_score', 'event', 'event_date'
         ]
 
 
@@ -290,7 +323,7 @@ class MatchDetailSerializer(serializers.ModelSerializer):
     class Meta:
         model = Match
         fields = [
-            'match_id', 'home_team', 'away_team', 'home_team_score', 'away_team_score',
+            'match_id', 'home_team', 'away_team', 'home_team_score', 'away_team_score', 'event',
             'home_team_info', 'away_team_info', 'match_result'
         ]
 
@@ -309,6 +342,17 @@ class MatchDetailSerializer(serializers.ModelSerializer):
             return "Нічия"
 
 
+class TeamFormSerializer(serializers.ModelSerializer):
+    team_name = serializers.CharField(source='team.team_name', read_only=True)
+
+    class Meta:
+        model = TeamForm
+        fields = [
+            'team', 'team_name', 'matches', 'wins', 'draws', 'loses', 'points',
+            'goals_for', 'goals_against', 'results', 'last_match_id'
+        ]
+
+
 class CalendarBaseSerializer(serializers.ModelSerializer):
     stadium_name = serializers.CharField(source='event_stadium.stadium_name', read_only=True)
     stadium_city = serializers.CharField(source='event_stadium.city', read_only=True)
@@ -318,6 +362,28 @@ class CalendarBaseSerializer(serializers.ModelSerializer):
         fields = ['event_id', 'event_date', 'event_stadium', 'stadium_name', 'stadium_city']
 
 
+def matches_by_date(dates):
+    """{event date: [MatchBaseSerializer data]} of the given dates in one query"""
+    grouped = defaultdict(list)
+    if not dates:
+        return grouped
+    queryset = MatchRepository().on_dates(dates)
+    fast = ValuesSerializer.for_serializer(MatchBaseSerializer)
+    for row in fast.serialize(queryset) if fast is not None else MatchBaseSerializer(queryset, many=True).data:
+        grouped[row['event_date']].append(row)
+    return grouped
+
+
+class CalendarListSerializer(serializers.ListSerializer):
+    """Loads matches_on_date for every event of the list in one query"""
+
+    def to_representation(self, data):
+        events = list(data.all() if hasattr(data, 'all') else data)
+        if 'matches_on_date' in self.child.fields:
+            self.matches_by_date = matches_by_date({event.event_date for event in events})
+        return super().to_representation(events)
+
+
 class CalendarDetailSerializer(serializers.ModelSerializer):
     stadium_info = serializers.SerializerMethodField()
     matches_on_date = serializers.SerializerMethodField()
@@ -325,6 +391,7 @@ class CalendarDetailSerializer(serializers.ModelSerializer):
     class Meta:
         model = Calendar
         fields = ['event_id', 'event_date', 'event_stadium', 'stadium_info', 'matches_on_date']
+        list_serializer_class = CalendarListSerializer
 
     def get_stadium_info(self, obj):
         if obj.event_stadium:
@@ -332,8 +399,11 @@ class CalendarDetailSerializer(serializers.ModelSerializer):
         return None
 
     def get_matches_on_date(self, obj):
-        # Матчі, заплановані на цю дату (можна додати логіку зв'язку з Match)
-        return []  # Поки що пустий список - можна розширити
+        # Матчі всіх подій цієї дати: у списку - вже завантажені CalendarListSerializer
+        matches = getattr(self.parent, 'matches_by_date', None)
+        if matches is None:
+            matches = matches_by_date([obj.event_date])
+        return matches.get(obj.event_date.isoformat(), [])
 
 
 class HistoryBaseSerializer(serializers.ModelSerializer):
@@ -0,0 +1,8 @@
+# main/signals.py
+from django.dispatch import Signal
+
+
+# QuerySet.update() and raw UPDATEs send no post_save: the bulk write
+# paths (MatchRepository.update_scores, stat_counters.apply) send this
+# instead, inside their transaction. Arguments: sender (model), using.
+rows_updated = Signal()
@@ -0,0 +1,72 @@
+# main/sparse_fields.py
+"""
+?fields= and ?expand= for BaseViewSet list/retrieve.
+
+Fields of a serializer are either plain (model columns, dotted sources)
+or expandable (SerializerMethodField and nested serializers, which run
+their own queries for every object).
+
+    (no parameters)             every field, as before
+    ?fields=team_id,team_name   only these fields
+    ?expand=players             the plain fields + players
+    ?fields=team_name&expand=stadium
+                                team_name + stadium
+
+Unrequested fields are removed from the serializer before it runs, so
+their SerializerMethodField is never called. On list endpoints ?expand=
+switches to the detail serializer, and the compiled ValuesSerializer only
+SELECTs the requested columns.
+"""
+import functools
+
+from rest_framework import serializers
+
+
+def query_names(request, param):
+    """Comma-separated names from ?param=, or None if it isn't given"""
+    value = request.query_params.get(param)
+    if value is None:
+        return None
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+@functools.lru_cache(maxsize=None)
+def serializer_fields(serializer_class):
+    """(all field names in order, expandable field names)"""
+    fields = serializer_class().fields
+    expandable = frozenset(
+        name for name, field in fields.items()
+        if isinstance(field, (serializers.SerializerMethodField, serializers.BaseSerializer))
+    )
+    return tuple(fields), expandable
+
+
+def selected_fields(request, serializer_class):
+    """
+    Field names to serialize for the request, or None for all of them.
+    Raises ValueError for names the serializer doesn't have
+    """
+    fields = query_names(request, 'fields')
+    expand = query_names(request, 'expand')
+    if fields is None and expand is None:
+        return None
+
+    names, expandable = serializer_fields(serializer_class)
+    unknown = ((fields or set()) | (expand or set())) - set(names)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+
+    if fields is None:
+        fields = set(names) - expandable
+    return frozenset(fields | (expand or set()))
+
+
+def trim(serializer, keep):
+    """Drop the fields that are not in keep (before serializer.data is built)"""
+    if keep is None:
+        return serializer
+    fields = serializer.child.fields if isinstance(serializer, serializers.ListSerializer) else serializer.fields
+    for name in list(fields):
+        if name not in keep:
+            fields.pop(name)
+    return serializer
@@ -0,0 +1,326 @@
+# main/stat_counters.py
+"""
+Write-behind counters for PlayerTechnical.goal_scored / assist_scored:
+POST /api/player-technical/<id>/increment/ {"goal_scored": 1}.
+
+BaseRepository.update() reads the row, adds in Python and saves the
+total back, so two events for the same player at once lose one of them.
+Here an increment is
+
+1. appended to the durability log, STAT_COUNTERS_LOG_DIR/<segment>.log
+   (one JSON line [player_id, goals, assists], fsync'ed before the
+   request returns), and
+2. added to the player's pending deltas in memory.
+
+Every STAT_COUNTERS_FLUSH_INTERVAL seconds a background thread seals the
+current segment and applies its deltas as
+UPDATE ... SET goal_scored = goal_scored + 1 (F() expressions, one
+statement per distinct pair of deltas), in a transaction that also
+records the segment in CounterFlush. After commit the segment file is
+removed. A segment whose transaction fails is kept and retried by the
+next flush.
+
+A process holds an exclusive flock on each of its segments from creation
+(as <segment>.tmp, renamed to .log once locked) until the file is
+removed. replay() applies the segments nobody holds - those of stopped
+or crashed processes - and skips the locked ones, so it is safe to run
+while other servers are writing. A server process replays in the
+background at startup when there are segments left
+(MainConfig.ready()); `manage.py replay_stat_counters` does the same on
+demand. CounterFlush makes the replay idempotent: a segment committed
+but not yet removed is skipped. A torn last line was never acknowledged
+and is ignored. Without fcntl (Windows) segments are not locked: run the
+replay only while no server is.
+
+Reads see the new totals after the next flush. The buffer is per
+process; each process writes its own segments.
+"""
+import atexit
+import logging
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import defaultdict
+from pathlib import Path
+
+import orjson
+from django.conf import settings
+from django.db import close_old_connections, connections, router, transaction
+from django.db.models import F
+
+from .models import CounterFlush, PlayerTechnical
+from .repositories.cache import RepositoryCache
+from .signals import rows_updated
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: no segment locks
+    fcntl = None
+
+
+logger = logging.getLogger(__name__)
+
+FIELDS = ('goal_scored', 'assist_scored')
+MAX_INCREMENT = 100
+# Players per UPDATE ... WHERE player_id IN (...)
+BATCH_SIZE = 500
+
+
+def log_dir():
+    return Path(settings.STAT_COUNTERS_LOG_DIR)
+
+
+def parse_increment(data):
+    """(goals, assists) from the request body; raises ValueError"""
+    if not isinstance(data, dict):
+        raise ValueError(f"Expected an object with {' / '.join(FIELDS)}")
+    values = []
+    for field in FIELDS:
+        value = data.get(field, 0)
+        # bool is an int too
+        if type(value) is not int or not 0 <= value <= MAX_INCREMENT:
+            raise ValueError(f"{field} must be an integer from 0 to {MAX_INCREMENT}")
+        values.append(value)
+    if not any(values):
+        raise ValueError(f"Nothing to add, set {' or '.join(FIELDS)}")
+    return tuple(values)
+
+
+def read_segment(log):
+    """{player_id: [goals, assists]} of an open segment file"""
+    deltas = defaultdict(lambda: [0, 0])
+    for line in log:
+        if not line.endswith(b'\n'):
+            # Torn write, the request never returned
+            break
+        pk, goals, assists = orjson.loads(line)
+        deltas[pk][0] += goals
+        deltas[pk][1] += assists
+    return dict(deltas)
+
+
+def lock(log):
+    """Take the segment's exclusive lock; False if another process holds it"""
+    if fcntl is None:
+        return True
+    try:
+        fcntl.flock(log.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        return False
+    return True
+
+
+def fsync_dir(directory):
+    """Make a created, renamed or removed segment file durable"""
+    if not hasattr(os, 'O_DIRECTORY'):
+        return
+    fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def is_linked(log, path):
+    """The open file is still the one at path (not removed by its flush)"""
+    try:
+        return os.stat(path).st_ino == os.fstat(log.fileno()).st_ino
+    except FileNotFoundError:
+        return False
+
+
+def apply(segment, deltas):
+    """Add a segment's deltas to the players; False if it was applied already"""
+    using = router.db_for_write(PlayerTechnical)
+    with transaction.atomic(using=using):
+        _, created = CounterFlush.objects.using(using).get_or_create(segment=segment)
+        if not created:
+            return False
+        by_delta = defaultdict(list)
+        for pk, (goals, assists) in deltas.items():
+            if goals or assists:
+                by_delta[goals, assists].append(pk)
+        for (goals, assists), pks in by_delta.items():
+            for start in range(0, len(pks), BATCH_SIZE):
+                PlayerTechnical.objects.using(using).filter(pk__in=pks[start:start + BATCH_SIZE]).update(
+                    goal_scored=F('goal_scored') + goals,
+                    assist_scored=F('assist_scored') + assists,
+                )
+        # QuerySet.update() sends no post_save
+        for pk in deltas:
+            RepositoryCache.invalidate(PlayerTechnical, pk, using=using)
+        rows_updated.send(sender=PlayerTechnical, using=using)
+    return True
+
+
+def forget(segment, path):
+    """Drop a segment once it is applied: the file, then its CounterFlush row"""
+    path.unlink(missing_ok=True)
+    fsync_dir(path.parent)
+    CounterFlush.objects.using(router.db_for_write(PlayerTechnical)).filter(segment=segment).delete()
+
+
+def replay():
+    """
+    Apply the segments in STAT_COUNTERS_LOG_DIR that no running process
+    holds; returns (applied, already applied, held by a running process)
+    """
+    applied = skipped = held = 0
+    directory = log_dir()
+    if not directory.is_dir():
+        return applied, skipped, held
+    # Segments of this process are flushed by buffer (and unlocked without fcntl)
+    own = buffer.segments()
+    for path in sorted(directory.glob('*.log')):
+        if path.stem in own:
+            held += 1
+            continue
+        try:
+            log = open(path, 'rb')
+        except FileNotFoundError:
+            # Flushed meanwhile
+            continue
+        # Closing the file releases the lock
+        with log:
+            if not lock(log):
+                held += 1
+                continue
+            if not is_linked(log, path):
+                continue
+            if apply(path.stem, read_segment(log)):
+                applied += 1
+            else:
+                skipped += 1
+            forget(path.stem, path)
+    return applied, skipped, held
+
+
+def replay_on_start():
+    """
+    Replay in a background thread when a server process starts and there
+    are segments left; not for management commands other than runserver
+    """
+    program = os.path.basename(sys.argv[0]) if sys.argv else ''
+    if program in ('manage.py', 'django-admin', '__main__.py') and sys.argv[1:2] != ['runserver']:
+        return None
+    directory = log_dir()
+    if not directory.is_dir() or not any(directory.glob('*.log')):
+        return None
+
+    def run():
+        try:
+            applied, skipped, held = replay()
+            if applied or skipped:
+                logger.info("Replayed %d player stat log segments (%d already applied)", applied, skipped)
+        except Exception:
+            logger.exception("Replaying player stat increments failed, run manage.py replay_stat_counters")
+        finally:
+            connections.close_all()
+
+    thread = threading.Thread(target=run, name='stat-counters-replay', daemon=True)
+    thread.start()
+    return thread
+
+
+class CounterBuffer:
+    """Pending increments of this process and its current log segment"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # One flush at a time (background thread, atexit, benchmark)
+        self.flush_lock = threading.Lock()
+        self.pending = defaultdict(lambda: [0, 0])
+        # (segment, path, open file) being written
+        self.segment = None
+        # [(segment, path, open file, deltas)] sealed but not applied yet;
+        # the files stay open (and locked) until they are removed
+        self.sealed = []
+        self.thread = None
+        # Increments logged and flushes applied, for the benchmark
+        self.increments = 0
+        self.flushes = 0
+
+    def increment(self, pk, goals, assists):
+        """Log the increment and queue it for the next flush"""
+        line = orjson.dumps([pk, goals, assists]) + b"\n"
+        with self.lock:
+            if self.segment is None:
+                self.open_segment()
+            log = self.segment[2]
+            log.write(line)
+            log.flush()
+            os.fsync(log.fileno())
+            delta = self.pending[pk]
+            delta[0] += goals
+            delta[1] += assists
+            self.increments += 1
+            if self.thread is None:
+                self.start()
+
+    def queued(self, pk):
+        """Increments of a player not flushed yet (in this process)"""
+        with self.lock:
+            return dict(zip(FIELDS, self.pending.get(pk, (0, 0))))
+
+    def segments(self):
+        with self.lock:
+            current = [self.segment[0]] if self.segment else []
+            return set(current + [sealed[0] for sealed in self.sealed])
+
+    def open_segment(self):
+        directory = log_dir()
+        directory.mkdir(parents=True, exist_ok=True)
+        segment = uuid.uuid4().hex
+        path = directory / f"{segment}.log"
+        if fcntl is None:
+            log = open(path, 'ab')
+        else:
+            # replay() only looks at .log files, which are locked already
+            created = directory / f"{segment}.tmp"
+            log = open(created, 'ab')
+            lock(log)
+            os.replace(created, path)
+        fsync_dir(directory)
+        self.segment = (segment, path, log)
+
+    def flush(self):
+        """Apply everything logged so far; returns the number of players updated"""
+        with self.flush_lock:
+            with self.lock:
+                if self.segment is not None:
+                    segment, path, log = self.segment
+                    self.sealed.append((segment, path, log, dict(self.pending)))
+                    self.segment = None
+                    self.pending = defaultdict(lambda: [0, 0])
+            updated = 0
+            while self.sealed:
+                segment, path, log, deltas = self.sealed[0]
+                # On error the segment stays sealed for the next flush
+                apply(segment, deltas)
+                forget(segment, path)
+                log.close()
+                with self.lock:
+                    self.sealed.pop(0)
+                updated += len(deltas)
+                self.flushes += 1
+            return updated
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, name='stat-counters', daemon=True)
+        self.thread.start()
+        atexit.register(self.flush)
+
+    def run(self):
+        while True:
+            time.sleep(settings.STAT_COUNTERS_FLUSH_INTERVAL)
+            close_old_connections()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Flushing player stat increments failed, retrying")
+
+
+buffer = CounterBuffer()
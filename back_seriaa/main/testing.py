@@ -0,0 +1,116 @@
+# main/testing.py
+"""
+Test data shared by the test suites and the benchmarks: a synthetic
+league seeded into the current database, and an API user.
+"""
+import random
+from datetime import date, timedelta
+
+from .models import (
+    Team, Coach, Stadium, Calendar,
+    History, Match, PlayerDetailed, PlayerTechnical
+)
+
+
+COUNTRIES = ['IT', 'BR', 'AR', 'FR', 'ES', 'DE', 'PT', 'NL', 'RS', 'HR', 'PL', 'BE']
+POSITIONS = ['GK', 'DF', 'MF', 'FW']
+
+
+def seed_league(teams=20, players_per_team=25, matches=380, years=30, events=200, seed=42):
+    """Fill the current database with a synthetic league"""
+    rnd = random.Random(seed)
+
+    Team.objects.bulk_create([
+        Team(
+            team_name=f"Team {i}",
+            points=rnd.randint(10, 95),
+            wins=rnd.randint(0, 30),
+            loses=rnd.randint(0, 30),
+            draws=rnd.randint(0, 15),
+            goal_difference=rnd.randint(-40, 60),
+        )
+        for i in range(teams)
+    ], batch_size=1000)
+    team_ids = list(Team.objects.values_list('team_id', flat=True))
+
+    Coach.objects.bulk_create([
+        Coach(
+            coach_name=f"Coach {i}",
+            experience=rnd.randint(1, 30),
+            coach_country=rnd.choice(COUNTRIES),
+        )
+        for i in range(teams)
+    ], batch_size=1000)
+    coach_ids = list(Coach.objects.values_list('coach_id', flat=True))
+
+    Stadium.objects.bulk_create([
+        Stadium(
+            stadium_name=f"Stadium {i}",
+            stadium_team_id=team_id,
+            capacity=rnd.randint(10000, 80000),
+            city=f"City {i}",
+        )
+        for i, team_id in enumerate(team_ids)
+    ], batch_size=1000)
+    stadium_ids = list(Stadium.objects.values_list('stadium_id', flat=True))
+
+    start = date.today() - timedelta(days=events // 2)
+    Calendar.objects.bulk_create([
+        Calendar(
+            event_date=start + timedelta(days=i),
+            event_stadium_id=rnd.choice(stadium_ids),
+        )
+        for i in range(events)
+    ], batch_size=1000)
+
+    History.objects.bulk_create([
+        History(
+            year=2024 - i,
+            win_team_id=rnd.choice(team_ids),
+            win_coach_id=rnd.choice(coach_ids),
+        )
+        for i in range(years)
+    ], batch_size=1000)
+
+    event_ids = list(Calendar.objects.order_by('event_date').values_list('event_id', flat=True))
+    Match.objects.bulk_create([
+        Match(
+            match_id=i + 1,
+            home_team_id=home,
+            away_team_id=away,
+            home_team_score=rnd.randint(0, 5),
+            away_team_score=rnd.randint(0, 5),
+            event_id=event_ids[i % len(event_ids)] if event_ids else None,
+        )
+        for i, (home, away) in enumerate(
+            rnd.sample(team_ids, 2) for _ in range(matches)
+        )
+    ], batch_size=1000)
+
+    PlayerTechnical.objects.bulk_create([
+        PlayerTechnical(
+            player_name=f"Player {team_id}-{n}",
+            player_team_id=team_id,
+            position=rnd.choice(POSITIONS),
+            goal_scored=rnd.randint(0, 30),
+            assist_scored=rnd.randint(0, 20),
+        )
+        for team_id in team_ids
+        for n in range(players_per_team)
+    ], batch_size=1000)
+
+    PlayerDetailed.objects.bulk_create([
+        PlayerDetailed(
+            player_detailed_id_id=player_id,
+            player_physic=rnd.randint(40, 99),
+            player_country=rnd.choice(COUNTRIES),
+            player_age=rnd.randint(17, 38),
+            player_foot=rnd.choice(['left', 'right', 'both']),
+        )
+        for player_id in PlayerTechnical.objects.values_list('player_id', flat=True)
+    ], batch_size=1000)
+
+
+def create_api_user(username='bench', password='bench'):
+    from django.contrib.auth.models import User
+    return User.objects.create_user(username=username, password=password)
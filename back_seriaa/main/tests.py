@@ -1,3 +1,1068 @@
-from django.test import TestCase
+"""
+Tests of the main app and of the project-level helpers it relies on.
 
-# Create your tests here.
+    python manage.py test main
+
+The replica tests that go through the router need a 'replica' alias:
+
+    SERIAA_DB_ENGINE=sqlite SERIAA_DB_REPLICA_NAME=replica.sqlite3 python manage.py test main
+
+(under tests the replica mirrors the test database, so each alias keeps
+its own query log).
+"""
+import asyncio
+import shutil
+import tempfile
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from io import BytesIO
+from pathlib import Path
+from unittest import mock
+from uuid import UUID
+
+import orjson
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.db import connections
+from django.db.models import Max
+from django.http import HttpResponse
+from django.test import (
+    AsyncClient, RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+)
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.parsers import JSONParser
+from rest_framework.permissions import IsAdminUser
+from rest_framework.renderers import JSONRenderer
+
+from seriaa import db_router, db_settings
+from main import live, score_ingest, search, stat_counters, views
+from main.async_views import AsyncTeamView
+from main.fast_serializers import ValuesSerializer
+from main.models import (
+    Calendar, CounterFlush, History, LiveEvent, Match, PlayerDetailed, PlayerTechnical, ScoreEventKey, Stadium,
+    Team, TeamForm,
+)
+from main.repositories.cache import RepositoryCache, cache_alias
+from main.repositories.calendar_repository import CalendarRepository
+from main.repositories.match_repository import MatchRepository
+from main.repositories.stadium_repository import StadiumRepository
+from main.repositories.team_repository import TeamRepository
+from main.renderers import ORJSONParser, ORJSONRenderer
+from main.serializers import (
+    CalendarDetailSerializer, MatchBaseSerializer, PlayerDetailedBaseSerializer, StadiumDetailSerializer,
+    TeamDetailSerializer, upcoming_events,
+)
+from main.sparse_fields import trim
+from main.testing import create_api_user, seed_league
+
+
+class ReplicaRouterTests(SimpleTestCase):
+
+    def setUp(self):
+        patcher = mock.patch.object(db_router, 'replica_alias', return_value='replica')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.router = db_router.ReplicaRouter()
+
+    def test_reads_go_to_the_replica_only_when_the_request_allows_it(self):
+        self.assertIsNone(self.router.db_for_read(Team))
+        token = db_router._read_from_replica.set(True)
+        try:
+            self.assertEqual(self.router.db_for_read(Team), 'replica')
+            # auth and sessions are not replicated
+            self.assertIsNone(self.router.db_for_read(User))
+            self.assertEqual(self.router.db_for_write(Team), 'default')
+        finally:
+            db_router._read_from_replica.reset(token)
+
+
+class ReplicaRoutingMiddlewareTests(SimpleTestCase):
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.seen = []
+
+    def get_response(self, request):
+        self.seen.append(db_router._read_from_replica.get())
+        return HttpResponse()
+
+    async def aget_response(self, request):
+        return self.get_response(request)
+
+    def call(self, request):
+        return db_router.ReplicaRoutingMiddleware(self.get_response)(request)
+
+    def test_safe_api_requests_read_from_the_replica(self):
+        self.call(self.factory.get('/api/teams/'))
+        self.call(self.factory.get('/dashboard/api/top-players/'))
+        self.call(self.factory.get('/admin/'))
+        self.assertEqual(self.seen, [True, True, False])
+        self.assertFalse(db_router._read_from_replica.get())
+
+    def test_write_reads_from_default_and_pins_the_client(self):
+        response = self.call(self.factory.post('/api/teams/'))
+        self.assertEqual(self.seen, [False])
+        cookie = response.cookies[db_router.PIN_COOKIE]
+        self.assertEqual(cookie['max-age'], settings.REPLICA_STICKY_SECONDS)
+        self.assertTrue(cookie['httponly'])
+
+    def test_pinned_client_reads_from_default(self):
+        request = self.factory.get('/api/teams/')
+        request.COOKIES[db_router.PIN_COOKIE] = '1'
+        response = self.call(request)
+        self.call(self.factory.get('/api/teams/', HTTP_X_PIN_PRIMARY='1'))
+        self.call(self.factory.get('/api/teams/', HTTP_X_PIN_PRIMARY='0'))
+        self.assertEqual(self.seen, [False, False, True])
+        # Reads don't extend the pin
+        self.assertNotIn(db_router.PIN_COOKIE, response.cookies)
+
+    def test_async(self):
+        middleware = db_router.ReplicaRoutingMiddleware(self.aget_response)
+        async_to_sync(middleware)(self.factory.get('/api/teams/'))
+        response = async_to_sync(middleware)(self.factory.delete('/api/teams/1/'))
+        self.assertEqual(self.seen, [True, False])
+        self.assertIn(db_router.PIN_COOKIE, response.cookies)
+
+
+HAS_REPLICA = db_router.replica_alias() is not None
+
+
+class ApiUserMixin:
+    # The replica is another connection and doesn't see the rows a
+    # TestCase hasn't committed: requests read from 'default'
+    replica_reads = False
+
+    def setUp(self):
+        super().setUp()
+        if not self.replica_reads:
+            replica_paths = override_settings(REPLICA_READ_PATHS=())
+            replica_paths.enable()
+            self.addCleanup(replica_paths.disable)
+        self.user = create_api_user('api', 'api')
+        self.client.force_login(self.user)
+
+
+class ReplicaReadYourWritesTests(ApiUserMixin, TransactionTestCase):
+    # The replica is another connection: it only sees committed rows
+    replica_reads = True
+    databases = {'default', 'replica'} if HAS_REPLICA else {'default'}
+
+    def setUp(self):
+        if not HAS_REPLICA:
+            self.skipTest("No 'replica' database, set SERIAA_DB_REPLICA_NAME")
+        super().setUp()
+        Team.objects.create(team_name="Juventus", points=80, wins=25, loses=3, draws=5, goal_difference=40)
+
+    def queries(self, request):
+        """(response, queries on default, queries on the replica)"""
+        with CaptureQueriesContext(connections['default']) as default, \
+                CaptureQueriesContext(connections['replica']) as replica:
+            response = request()
+        return response, len(default), len(replica)
+
+    def test_reads_replica_writes_default_then_pinned_to_default(self):
+        # The session is read from 'default' in any case
+        response, _, replica = self.queries(lambda: self.client.get('/api/teams/'))
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(replica, 0)
+
+        response, default, replica = self.queries(lambda: self.client.post(
+            '/api/teams/',
+            {'team_name': "Inter", 'points': 70, 'wins': 20, 'loses': 5, 'draws': 10, 'goal_difference': 30},
+            content_type='application/json'
+        ))
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertGreater(default, 0)
+        self.assertEqual(replica, 0)
+
+        # The client now carries the pin cookie
+        response, _, replica = self.queries(lambda: self.client.get('/api/teams/'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(replica, 0)
+        self.assertIn("Inter", [team['team_name'] for team in response.json()])
+
+
+class AsyncListTests(ApiUserMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        seed_league(teams=5, players_per_team=1, matches=3, years=1, events=3)
+        self.async_client.force_login(self.user)
+
+    async def test_limit_and_offset(self):
+        response = await self.async_client.get('/api/async/teams/', {'limit': 2, 'offset': 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Total-Count'], '5')
+        ids = [team['team_id'] async for team in Team.objects.order_by('pk').values('team_id')]
+        self.assertEqual([team['team_id'] for team in response.json()], ids[1:3])
+
+    async def test_without_limit_everything_is_returned(self):
+        response = await self.async_client.get('/api/async/teams/')
+        self.assertEqual(len(response.json()), 5)
+        self.assertNotIn('X-Total-Count', response)
+
+    async def test_bad_limit_or_offset(self):
+        for params in ({'limit': 'x'}, {'limit': -1}, {'limit': 2, 'offset': -1}):
+            with self.subTest(params=params):
+                response = await self.async_client.get('/api/async/teams/', params)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('error', response.json())
+
+    async def test_anonymous_gets_401_with_a_challenge(self):
+        response = await AsyncClient().get('/api/async/teams/')
+        self.assertEqual(response.status_code, 401)
+        self.assertIn('Basic', response['WWW-Authenticate'])
+
+    async def test_denied_permission_sends_its_message(self):
+        class StaffOnly(IsAdminUser):
+            message = "Staff only"
+
+        with mock.patch.object(AsyncTeamView, 'permission_classes', [StaffOnly]):
+            response = await self.async_client.get('/api/async/teams/')
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response.json(), {'detail': "Staff only"})
+
+
+class DatabaseSettingsTests(SimpleTestCase):
+    base_dir = Path('/srv/seriaa')
+
+    def test_wsgi_keeps_checked_persistent_connections(self):
+        database = db_settings.database_settings(self.base_dir, {})
+        self.assertEqual(database['ENGINE'], 'django.db.backends.mysql')
+        self.assertEqual(database['CONN_MAX_AGE'], db_settings.DEFAULT_CONN_MAX_AGE)
+        self.assertTrue(database['CONN_HEALTH_CHECKS'])
+
+        database = db_settings.database_settings(self.base_dir, {'SERIAA_DB_CONN_MAX_AGE': '0'})
+        self.assertEqual(database['CONN_MAX_AGE'], 0)
+        self.assertFalse(database['CONN_HEALTH_CHECKS'])
+
+    def test_asgi_has_no_persistent_connections(self):
+        env = {'SERIAA_SERVER_MODE': 'asgi', 'SERIAA_DB_CONN_MAX_AGE': '600'}
+        with mock.patch.object(db_settings, 'pool_available', return_value=False):
+            database = db_settings.database_settings(self.base_dir, env)
+        self.assertEqual(database['ENGINE'], 'django.db.backends.mysql')
+        self.assertEqual(database['CONN_MAX_AGE'], 0)
+        self.assertFalse(database['CONN_HEALTH_CHECKS'])
+        self.assertNotIn('POOL_OPTIONS', database)
+
+    def test_asgi_uses_the_pool_when_installed(self):
+        env = {'SERIAA_SERVER_MODE': 'asgi', 'ASGI_THREADS': '8'}
+        with mock.patch.object(db_settings, 'pool_available', return_value=True):
+            database = db_settings.database_settings(self.base_dir, env)
+            sqlite = db_settings.database_settings(self.base_dir, {**env, 'SERIAA_DB_ENGINE': 'sqlite'})
+        self.assertEqual(database['ENGINE'], db_settings.POOL_ENGINES['mysql'])
+        self.assertEqual(database['POOL_OPTIONS']['POOL_SIZE'], 8)
+        self.assertEqual(database['POOL_OPTIONS']['MAX_OVERFLOW'], 4)
+        self.assertEqual(database['CONN_MAX_AGE'], 0)
+        # No pool backend for SQLite
+        self.assertEqual(sqlite['ENGINE'], 'django.db.backends.sqlite3')
+        self.assertNotIn('POOL_OPTIONS', sqlite)
+
+    def test_unknown_engine_or_mode(self):
+        for env in ({'SERIAA_DB_ENGINE': 'postgres'}, {'SERIAA_SERVER_MODE': 'fastcgi'}):
+            with self.subTest(env=env), self.assertRaises(ValueError):
+                db_settings.database_settings(self.base_dir, env)
+
+    def test_replica_inherits_default(self):
+        self.assertIsNone(db_settings.replica_settings(self.base_dir, {}))
+        env = {'SERIAA_SERVER_MODE': 'asgi', 'SERIAA_DB_REPLICA_HOST': 'replica.local'}
+        with mock.patch.object(db_settings, 'pool_available', return_value=False):
+            replica = db_settings.replica_settings(self.base_dir, env)
+        self.assertEqual(replica['HOST'], 'replica.local')
+        self.assertEqual(replica['NAME'], 'seriaa')
+        self.assertEqual(replica['CONN_MAX_AGE'], 0)
+        self.assertEqual(replica['TEST'], {'MIRROR': 'default'})
+
+
+@override_settings(REPOSITORY_CACHE_LOCAL=True)
+class RepositoryCacheTests(TestCase):
+
+    def setUp(self):
+        caches[cache_alias()].clear()
+        self.team = Team.objects.create(team_name="Juventus", points=80, wins=25, loses=3, draws=5, goal_difference=40)
+        self.repository = TeamRepository()
+
+    def cached_read(self, pk):
+        with self.assertNumQueries(0):
+            return self.repository.get_by_id(pk)
+
+    def test_update_through_the_repository(self):
+        self.repository.get_by_id(self.team.pk)
+        self.assertEqual(self.cached_read(self.team.pk).points, 80)
+        self.repository.update(self.team.pk, points=83)
+        self.assertEqual(self.repository.get_by_id(self.team.pk).points, 83)
+        self.assertEqual(self.cached_read(self.team.pk).points, 83)
+
+    def test_save_and_delete_elsewhere(self):
+        self.repository.get_by_id(self.team.pk)
+        Team.objects.filter(pk=self.team.pk).update(points=1)
+        # No signal for QuerySet.update(): still the cached row
+        self.assertEqual(self.cached_read(self.team.pk).points, 80)
+
+        self.team.points = 90
+        self.team.save()
+        self.assertEqual(self.repository.get_by_id(self.team.pk).points, 90)
+
+        self.team.delete()
+        self.assertIsNone(self.repository.get_by_id(self.team.pk))
+        # Negative cache
+        self.assertIsNone(self.cached_read(self.team.pk))
+
+    def test_invalidate_after_queryset_update(self):
+        self.repository.get_by_id(self.team.pk)
+        Team.objects.filter(pk=self.team.pk).update(points=1)
+        RepositoryCache.invalidate(Team, self.team.pk)
+        self.assertEqual(self.repository.get_by_id(self.team.pk).points, 1)
+
+    def test_row_loaded_before_an_update_is_not_served(self):
+        cache = RepositoryCache(Team, timeout=60, miss_timeout=60)
+
+        def load():
+            # Another request saves the team between this read and the cache set
+            row = Team.objects.get(pk=self.team.pk)
+            Team.objects.filter(pk=self.team.pk).update(points=95)
+            RepositoryCache.invalidate(Team, self.team.pk)
+            return row
+
+        self.assertEqual(cache.get(self.team.pk, load).points, 80)
+        self.assertEqual(cache.get(self.team.pk, lambda: Team.objects.get(pk=self.team.pk)).points, 95)
+        with self.assertNumQueries(0):
+            self.assertEqual(cache.get(self.team.pk, lambda: None).points, 95)
+
+    def test_invalidation_on_commit_after_a_concurrent_read(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.team.points = 70
+            self.team.save()
+            # A reader that doesn't see the uncommitted write caches the old row
+            stale = Team(pk=self.team.pk, team_name="Juventus", points=80, wins=25, loses=3, draws=5,
+                         goal_difference=40)
+            self.repository.cache.get(self.team.pk, lambda: stale)
+        self.assertEqual(self.repository.get_by_id(self.team.pk).points, 70)
+
+    @override_settings(REPOSITORY_CACHE_LOCAL=False)
+    def test_per_process_cache_is_not_used_by_default(self):
+        self.assertIsNone(TeamRepository().cache)
+
+
+class SparseFieldsTests(ApiUserMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        seed_league(teams=3, players_per_team=2, matches=3, years=2, events=3)
+        self.team = Team.objects.order_by('pk').first()
+
+    def test_fields_on_list_and_retrieve(self):
+        response = self.client.get('/api/teams/', {'fields': 'team_id,team_name'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 3)
+        self.assertEqual({tuple(team) for team in response.json()}, {('team_id', 'team_name')})
+
+        response = self.client.get(f'/api/teams/{self.team.pk}/', {'fields': 'team_name'})
+        self.assertEqual(response.json(), {'team_name': self.team.team_name})
+
+    def test_unrequested_method_fields_are_not_run(self):
+        with mock.patch.object(TeamDetailSerializer, 'get_players') as get_players:
+            response = self.client.get(f'/api/teams/{self.team.pk}/', {'fields': 'team_id,stadium'})
+        self.assertEqual(set(response.json()), {'team_id', 'stadium'})
+        get_players.assert_not_called()
+
+    def test_expand_on_list(self):
+        response = self.client.get('/api/teams/', {'expand': 'players'})
+        self.assertEqual(response.status_code, 200)
+        team = response.json()[0]
+        self.assertIn('team_name', team)
+        self.assertEqual(len(team['players']), 2)
+        self.assertNotIn('stadium', team)
+
+        response = self.client.get('/api/teams/', {'fields': 'team_name', 'expand': 'stadium'})
+        self.assertEqual(set(response.json()[0]), {'team_name', 'stadium'})
+
+    def test_unknown_fields(self):
+        for params in ({'fields': 'team_name,budget'}, {'expand': 'budget'}):
+            with self.subTest(params=params):
+                response = self.client.get('/api/teams/', params)
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json(), {'error': "Unknown fields: budget"})
+        response = self.client.get(f'/api/teams/{self.team.pk}/', {'fields': 'budget'})
+        self.assertEqual(response.status_code, 400)
+
+
+class ListFilterTests(ApiUserMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        seed_league(teams=3, players_per_team=4, matches=3, years=2, events=3)
+
+    def get(self, **params):
+        return self.client.get('/api/player-technical/', params)
+
+    def test_filter_order_and_search(self):
+        team = Team.objects.order_by('pk').first()
+        response = self.get(player_team=team.pk, ordering='-goal_scored')
+        players = response.json()
+        self.assertEqual(len(players), 4)
+        self.assertEqual([player['goal_scored'] for player in players],
+                         sorted((player['goal_scored'] for player in players), reverse=True))
+
+        response = self.get(search=f"player {team.pk}-")
+        self.assertEqual(len(response.json()), 4)
+
+        goals = sorted(PlayerTechnical.objects.values_list('goal_scored', flat=True))
+        response = self.get(goal_scored__gte=goals[6])
+        self.assertEqual(len(response.json()), sum(1 for value in goals if value >= goals[6]))
+
+    def test_bad_filters(self):
+        for params, error in [
+            ({'player_name': 'Player 1-1'}, "Filtering by player_name is not supported"),
+            ({'position__gte': 'FW'}, "Unsupported lookup position__gte, use one of: exact, in"),
+            ({'goal_scored': 'many'}, "Invalid value for goal_scored: 'many'"),
+            ({'player_team__in': '1,x'}, "Invalid value for player_team: 'x'"),
+            ({'ordering': 'player_id'}, "Ordering by player_id is not supported"),
+        ]:
+            with self.subTest(params=params):
+                response = self.get(**params)
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json(), {'error': error})
+
+    def test_other_parameters_are_ignored(self):
+        response = self.get(format='json', page='2')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 12)
+
+
+class SearchIndexTests(SimpleTestCase):
+
+    def setUp(self):
+        teams = ["Juventus", "Inter", "Internazionale Milano"]
+        players = ["Alessandro Del Piero", "Gianluigi Buffon", "Javier Zanetti", "Del Bosque"]
+        self.index = search.SearchIndex(
+            [0] * len(teams) + [1] * len(players),
+            list(range(1, len(teams) + 1)) + list(range(1, len(players) + 1)),
+            [search.normalize(name) for name in teams + players],
+        )
+
+    def test_normalize(self):
+        self.assertEqual(search.normalize("DEL PIÈRO"), "del piero")
+        self.assertEqual(search.normalize("  Buffon,  G. "), "buffon g")
+
+    def test_ranking(self):
+        self.assertEqual(self.index.search("inter"), [('team', 2, 3.0), ('team', 3, 2.0)])
+        # Every word a prefix of a word in the name
+        self.assertEqual(self.index.search("piero del")[0], ('player', 1, 1.0))
+        # Shorter name first among equals
+        self.assertEqual([hit[:2] for hit in self.index.search("del")], [('player', 4), ('player', 1)])
+
+    def test_typos_by_trigrams(self):
+        kind, pk, score = self.index.search("juventsu")[0]
+        self.assertEqual((kind, pk), ('team', 1))
+        self.assertLess(score, 1)
+        self.assertEqual(self.index.search("xyzzy"), [])
+
+    def test_types_and_limit(self):
+        self.assertEqual(self.index.search("del", types={'team'}), [])
+        self.assertEqual(len(self.index.search("del", limit=1)), 1)
+
+    def test_containing(self):
+        self.assertEqual(sorted(self.index.containing("nett", 1).tolist()), [3])
+        self.assertEqual(sorted(self.index.containing("ter", 0).tolist()), [2, 3])
+        self.assertEqual(self.index.containing("qqq", 0).tolist(), [])
+
+
+class SearchTests(ApiUserMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.team = Team.objects.create(team_name="Juventus", points=80, wins=25, loses=3, draws=5, goal_difference=40)
+        PlayerTechnical.objects.create(player_name="Alessandro Del Piero", player_team=self.team,
+                                       position='FW', goal_scored=20, assist_scored=5)
+        # A build thread would not see the test transaction's rows
+        search.rebuild(search.current_version())
+
+    def test_api(self):
+        response = self.client.get('/api/search/', {'q': 'del pi'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'], [{
+            'type': 'player', 'id': PlayerTechnical.objects.get().pk, 'score': 1.0,
+            'name': "Alessandro Del Piero", 'team': "Juventus",
+        }])
+        for params in ({}, {'q': 'del', 'limit': 0}, {'q': 'del', 'types': 'coach'}):
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get('/api/search/', params).status_code, 400)
+
+    def test_rebuilt_after_a_rename(self):
+        self.assertEqual(search.search("juventus")[0]['id'], self.team.pk)
+        self.team.team_name = "Juve"
+        self.team.save()
+        self.assertEqual(search.search("juventus"), [])
+        self.assertEqual(search.search("juve")[0]['name'], "Juve")
+
+    def test_database_answers_until_the_index_is_built(self):
+        PlayerTechnical.objects.create(player_name="Juventino", player_team=self.team,
+                                       position='MF', goal_scored=1, assist_scored=1)
+        with mock.patch.object(search, '_index', None), \
+                mock.patch.object(search, 'rebuild_in_background') as rebuild_in_background, \
+                mock.patch.object(search, 'is_shared', return_value=True):
+            self.assertEqual(
+                [(hit['type'], hit['name'], hit['score']) for hit in search.search("juvent")],
+                [('team', "Juventus", 2.0), ('player', "Juventino", 2.0)],
+            )
+            self.assertEqual(search.search("juventus")[0]['score'], 3.0)
+            self.assertEqual(search.search("del pi", types={'player'})[0]['name'], "Alessandro Del Piero")
+            self.assertEqual(search.search("del pi", types={'team'}), [])
+            self.assertEqual(search.search("juventus", limit=1)[0]['type'], 'team')
+            self.assertIsNone(search.candidate_ids(Team, "vent"))
+            rebuild_in_background.assert_called_with(search.current_version())
+
+    def test_candidate_ids_need_a_shared_version(self):
+        # locmem: other processes' renames would not be seen
+        self.assertIsNone(search.candidate_ids(Team, "vent"))
+        with mock.patch.object(search, 'is_shared', return_value=True):
+            self.assertEqual(search.candidate_ids(Team, "vent"), [self.team.pk])
+            # Too short or changed by normalize()
+            self.assertIsNone(search.candidate_ids(Team, "ve"))
+            self.assertIsNone(search.candidate_ids(Team, "vènt"))
+
+
+@override_settings(SCORE_INGEST_WINDOW=0)
+class ScoreIngestTests(ApiUserMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        seed_league(teams=4, players_per_team=1, matches=3, years=1, events=3)
+        Match.objects.update(home_team_score=0, away_team_score=0)
+        self.match, self.other = Match.objects.order_by('pk')[:2]
+
+    def event(self, key, seq, home, away=0, match=None):
+        return {'key': key, 'match_id': (match or self.match).pk, 'seq': seq,
+                'home_team_score': home, 'away_team_score': away}
+
+    def post(self, *events):
+        return self.client.post('/api/match/scores/', {'events': list(events)}, content_type='application/json')
+
+    def scores(self, match=None):
+        return Match.objects.values_list('home_team_score', 'away_team_score', 'score_seq').get(pk=(match or self.match).pk)
+
+    def test_retried_batch_is_applied_once(self):
+        batch = [self.event('a', 1, 1), self.event('b', 1, 0, 1, match=self.other)]
+        response = self.post(*batch)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'received': 2, 'duplicates': 0, 'stale': 0,
+                                           'unknown_matches': [], 'matches_updated': 2})
+        self.assertEqual(self.scores(), (1, 0, 1))
+
+        response = self.post(*batch, self.event('a', 1, 1))
+        self.assertEqual(response.json()['duplicates'], 3)
+        self.assertEqual(response.json()['matches_updated'], 0)
+        self.assertEqual(ScoreEventKey.objects.count(), 2)
+
+    def test_highest_seq_wins(self):
+        response = self.post(self.event('c', 3, 3), self.event('a', 1, 1), self.event('b', 2, 2))
+        self.assertEqual(response.json()['matches_updated'], 1)
+        self.assertEqual(self.scores(), (3, 0, 3))
+
+    def test_late_events_are_stale(self):
+        self.post(self.event('b', 2, 2))
+        response = self.post(self.event('a', 1, 1), self.event('c', 2, 5))
+        self.assertEqual(response.json()['stale'], 2)
+        self.assertEqual(self.scores(), (2, 0, 2))
+
+    def test_unknown_matches_are_not_remembered(self):
+        response = self.post({**self.event('a', 1, 1), 'match_id': 999999})
+        self.assertEqual(response.json()['unknown_matches'], [999999])
+        self.assertFalse(ScoreEventKey.objects.exists())
+
+    def test_invalid_events(self):
+        for events, error in [
+            ([], "events must be a non-empty list"),
+            ([{**self.event('a', 1, 1), 'seq': 0}], "events[0].seq must be a positive integer"),
+            ([self.event('a', 1, 1), {**self.event('b', 1, 1), 'home_team_score': True}],
+             "events[1].home_team_score must be a non-negative integer"),
+            ([{**self.event('a', 1, 1), 'key': ''}], "events[0].key must be a string of 1-100 characters"),
+        ]:
+            with self.subTest(error=error):
+                response = self.post(*events)
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json(), {'error': error})
+
+    def test_queued_requests_are_written_together(self):
+        writer = score_ingest.ScoreWriter()
+        first = {'events': score_ingest.parse_events([self.event('a', 1, 1), self.event('b', 2, 2)])}
+        second = {'events': score_ingest.parse_events([self.event('b', 2, 2), self.event('c', 3, 4)])}
+        with CaptureQueriesContext(connections['default']) as queries:
+            writer.write([first, second])
+        table = connections['default'].ops.quote_name(Match._meta.db_table)
+        updates = [query['sql'] for query in queries if query['sql'].startswith(f'UPDATE {table}')]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(self.scores(), (4, 0, 3))
+        self.assertEqual((writer.flushes, writer.requests), (1, 2))
+        self.assertEqual(first['result']['duplicates'], 0)
+        self.assertEqual(second['result']['duplicates'], 1)
+        self.assertEqual(LiveEvent.objects.filter(topic='match', action='updated').count(), 1)
+
+
+class LiveChangeTests(SimpleTestCase):
+
+    def test_deltas_of_counters_only(self):
+        before = {'home_team': 1, 'away_team': 2, 'home_team_score': 0, 'away_team_score': 1}
+        after = {'home_team': 3, 'away_team': 2, 'home_team_score': 2, 'away_team_score': 1}
+        self.assertEqual(live.change(5, before, after), {
+            'id': 5, 'values': after, 'delta': {'home_team_score': 2},
+        })
+
+
+@mock.patch.object(live.Broker, 'run', lambda self: None)
+class LiveStreamTests(ApiUserMixin, TestCase):
+    """The poller thread is not started: the tests call Broker.poll() themselves"""
+
+    def setUp(self):
+        super().setUp()
+        seed_league(teams=2, players_per_team=1, matches=1, years=1, events=1)
+        self.match = Match.objects.get()
+        self.broker = live.Broker()
+        patcher = mock.patch.object(live, 'broker', self.broker)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.async_client.force_login(self.user)
+
+    def update_score(self, home):
+        MatchRepository().update(self.match.pk, home_team_score=home)
+        return LiveEvent.objects.latest('id').pk
+
+    async def events(self, headers=None, **params):
+        response = await self.async_client.get('/api/async/stream/', params, headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = aiter(response.streaming_content)
+        self.assertEqual(await anext(stream), b"retry: 3000\n\n")
+        return stream
+
+    async def test_update_event(self):
+        stream = await self.events(topics='match')
+        event_id = await sync_to_async(self.update_score)(self.match.home_team_score + 2)
+        await sync_to_async(self.broker.poll)()
+        frame = await asyncio.wait_for(anext(stream), 5)
+        header, data = frame.decode().rsplit('data: ', 1)
+        self.assertEqual(header, f"id: {event_id}\nevent: match.updated\n")
+        self.assertEqual(orjson.loads(data), {
+            'id': self.match.pk,
+            'values': {
+                'home_team': self.match.home_team_id, 'away_team': self.match.away_team_id,
+                'home_team_score': self.match.home_team_score + 2, 'away_team_score': self.match.away_team_score,
+            },
+            'delta': {'home_team_score': 2},
+        })
+
+    async def test_missed_events_after_reconnect(self):
+        first = await sync_to_async(self.update_score)(self.match.home_team_score + 1)
+        second = await sync_to_async(self.update_score)(self.match.home_team_score + 2)
+        stream = await self.events(headers={'Last-Event-ID': str(first)})
+        self.assertTrue((await anext(stream)).startswith(f"id: {second}\n".encode()))
+
+        stream = await self.events(last_event_id=second + 100)
+        self.assertEqual(await anext(stream), b"event: reset\ndata: {}\n\n")
+
+    async def test_bad_parameters(self):
+        for params in ({'topics': 'match,coach'}, {'last_event_id': 'x'}):
+            with self.subTest(params=params):
+                response = await self.async_client.get('/api/async/stream/', params)
+                self.assertEqual(response.status_code, 400)
+
+
+@mock.patch.object(stat_counters.CounterBuffer, 'start')
+class StatCountersTests(ApiUserMixin, TestCase):
+    """The flush thread is not started: the tests flush themselves"""
+
+    def setUp(self):
+        super().setUp()
+        seed_league(teams=2, players_per_team=1, matches=1, years=1, events=1)
+        self.player = PlayerTechnical.objects.order_by('pk').first()
+        self.log_dir = Path(tempfile.mkdtemp(prefix='stat_counters_'))
+        self.addCleanup(shutil.rmtree, self.log_dir, ignore_errors=True)
+        settings_patcher = override_settings(STAT_COUNTERS_LOG_DIR=str(self.log_dir))
+        settings_patcher.enable()
+        self.addCleanup(settings_patcher.disable)
+        self.buffer = stat_counters.CounterBuffer()
+        patcher = mock.patch.object(stat_counters, 'buffer', self.buffer)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def totals(self):
+        self.player.refresh_from_db()
+        return self.player.goal_scored, self.player.assist_scored
+
+    def write_segment(self, lines, segment='crashed'):
+        path = self.log_dir / f"{segment}.log"
+        path.write_bytes(b''.join(lines))
+        return path
+
+    def test_increment_is_logged_then_flushed(self, start):
+        goals, assists = self.totals()
+        url = f'/api/player-technical/{self.player.pk}/increment/'
+        self.client.post(url, {'goal_scored': 1}, content_type='application/json')
+        response = self.client.post(url, {'goal_scored': 1, 'assist_scored': 2}, content_type='application/json')
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.json(), {'player_id': self.player.pk,
+                                           'queued': {'goal_scored': 2, 'assist_scored': 2}})
+        # Logged, not applied yet
+        [log] = self.log_dir.glob('*.log')
+        self.assertEqual(len(log.read_bytes().splitlines()), 2)
+        self.assertEqual(self.totals(), (goals, assists))
+
+        self.assertEqual(self.buffer.flush(), 1)
+        self.assertEqual(self.totals(), (goals + 2, assists + 2))
+        self.assertEqual(list(self.log_dir.iterdir()), [])
+        self.assertFalse(CounterFlush.objects.exists())
+
+    def test_bad_increments(self, start):
+        url = f'/api/player-technical/{self.player.pk}/increment/'
+        for body in ({'goal_scored': -1}, {'goal_scored': 101}, {'goal_scored': True}, {}):
+            with self.subTest(body=body):
+                response = self.client.post(url, body, content_type='application/json')
+                self.assertEqual(response.status_code, 400)
+        response = self.client.post('/api/player-technical/999999/increment/', {'goal_scored': 1},
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(list(self.log_dir.iterdir()), [])
+
+    def test_replay_of_a_crashed_process(self, start):
+        goals, assists = self.totals()
+        self.write_segment([
+            orjson.dumps([self.player.pk, 1, 0]) + b"\n",
+            orjson.dumps([self.player.pk, 2, 1]) + b"\n",
+            # Torn: never acknowledged
+            orjson.dumps([self.player.pk, 5, 5])[:-3],
+        ])
+        self.assertEqual(stat_counters.replay(), (1, 0, 0))
+        self.assertEqual(self.totals(), (goals + 3, assists + 1))
+        self.assertEqual(list(self.log_dir.iterdir()), [])
+
+    def test_replay_skips_applied_segments(self, start):
+        goals, assists = self.totals()
+        self.write_segment([orjson.dumps([self.player.pk, 1, 0]) + b"\n"], segment='committed')
+        CounterFlush.objects.create(segment='committed')
+        self.assertEqual(stat_counters.replay(), (0, 1, 0))
+        self.assertEqual(self.totals(), (goals, assists))
+        self.assertEqual(list(self.log_dir.iterdir()), [])
+        self.assertFalse(CounterFlush.objects.exists())
+
+    def test_replay_skips_held_segments(self, start):
+        # This process's open segment
+        self.buffer.increment(self.player.pk, 1, 0)
+        self.addCleanup(self.buffer.segment[2].close)
+        if stat_counters.fcntl is not None:
+            # A segment locked by another process
+            path = self.write_segment([orjson.dumps([self.player.pk, 1, 0]) + b"\n"], segment='running')
+            with open(path, 'rb') as log:
+                self.assertTrue(stat_counters.lock(log))
+                self.assertEqual(stat_counters.replay(), (0, 0, 2))
+            self.assertEqual(stat_counters.replay(), (1, 0, 1))
+        else:
+            self.assertEqual(stat_counters.replay(), (0, 0, 1))
+        self.assertEqual(len(list(self.log_dir.glob('*.log'))), 1)
+
+
+class ORJSONTests(ApiUserMixin, TestCase):
+    """ORJSONRenderer / ORJSONParser behave like DRF's JSONRenderer / JSONParser"""
+
+    def assertSameJSON(self, data):
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_renderer_matches_json_renderer(self):
+        cases = {
+            'decimal': {'value': Decimal('1.10'), 'values': [Decimal('-3'), Decimal('0.000')]},
+            'datetime': {'utc': datetime(2024, 5, 1, 18, 45, 12, 123456, tzinfo=dt_timezone.utc),
+                         'offset': datetime(2024, 5, 1, 20, 45, tzinfo=dt_timezone(timedelta(hours=2))),
+                         'naive': datetime(2024, 5, 1, 18, 45, 12, 999)},
+            'date': {'date': date(2024, 2, 29), 'time': time(18, 45, 0, 500000)},
+            'uuid': {'id': UUID('12345678-1234-5678-1234-567812345678')},
+            'text': {'team': 'Кривбас', 'city': 'Città di Castello', 'note': 'Ümraniye "fc" ✓'},
+        }
+        for name, data in cases.items():
+            with self.subTest(name):
+                self.assertSameJSON(data)
+
+    def test_parser_matches_json_parser(self):
+        body = '{"team": "Кривбас", "points": 1.5, "ids": [1, 2], "ok": true, "none": null}'
+        for encoding in ('utf-8', 'utf-16'):
+            with self.subTest(encoding=encoding):
+                context = {'encoding': encoding}
+                self.assertEqual(
+                    ORJSONParser().parse(BytesIO(body.encode(encoding)), parser_context=context),
+                    JSONParser().parse(BytesIO(body.encode(encoding)), parser_context=context),
+                )
+
+    def test_invalid_json_is_400(self):
+        for body in (b'{"events": [', b'\xff\xfe', b'{"events": [] ,}'):
+            with self.subTest(body=body):
+                response = self.client.post('/api/match/scores/', body, content_type='application/json')
+                self.assertEqual(response.status_code, 400)
+                self.assertTrue(response.json()['detail'].startswith('JSON parse error'))
+
+
+class ValuesSerializerTests(TestCase):
+    """The compiled fast path gives exactly what the serializer gives"""
+
+    viewsets = [
+        views.TeamViewSet, views.CoachViewSet, views.StadiumViewSet, views.CalendarViewSet,
+        views.HistoryViewSet, views.MatchViewSet, views.PlayerDetailedViewSet, views.PlayerTechnicalViewSet,
+    ]
+
+    def setUp(self):
+        seed_league(teams=4, players_per_team=2, matches=6, years=3, events=4)
+        # Null relations behind dotted sources
+        Match.objects.filter(pk=Match.objects.order_by('pk').first().pk).update(event=None)
+        History.objects.filter(pk=History.objects.order_by('pk').first().pk).update(win_coach=None)
+        Calendar.objects.create(event_date=date(2030, 1, 1), event_stadium=None)
+        PlayerTechnical.objects.filter(pk=PlayerTechnical.objects.order_by('pk').first().pk).update(player_team=None)
+
+    def assertSameData(self, serializer_class, queryset, fields=None):
+        fast = ValuesSerializer.for_serializer(serializer_class, fields)
+        self.assertIsNotNone(fast, serializer_class.__name__)
+        serializer = trim(serializer_class(queryset, many=True), fields)
+        expected = serializer.data
+        actual = fast.serialize(queryset)
+        self.assertEqual(actual, expected)
+        # Same key order, so the same bytes
+        renderer = ORJSONRenderer()
+        self.assertEqual(renderer.render(actual), renderer.render(expected))
+
+    def test_base_serializers_of_the_viewsets(self):
+        for viewset in self.viewsets:
+            with self.subTest(viewset=viewset.__name__):
+                queryset = viewset.repository_class().get_all().order_by('pk')
+                self.assertSameData(viewset.base_serializer_class, queryset)
+
+    def test_null_relation_leaves_the_key_out(self):
+        match = Match.objects.filter(event=None).values('pk')
+        [row] = ValuesSerializer.for_serializer(MatchBaseSerializer).serialize(Match.objects.filter(pk__in=match))
+        self.assertNotIn('event_date', row)
+        self.assertIsNone(row['event'])
+        self.assertIn('home_team_name', row)
+
+    def test_choice_field(self):
+        self.assertTrue(PlayerDetailed.objects.exclude(player_foot=None).exists())
+        self.assertSameData(PlayerDetailedBaseSerializer, PlayerDetailed.objects.order_by('pk'))
+
+    def test_fields_subset(self):
+        for fields in (frozenset({'match_id', 'event_date'}), frozenset({'home_team', 'away_team_name'})):
+            with self.subTest(fields=fields):
+                self.assertSameData(MatchBaseSerializer, Match.objects.order_by('pk'), fields)
+
+
+class MatchMixin:
+
+    def setUp(self):
+        super().setUp()
+        self.teams = [
+            Team.objects.create(team_name=name, points=0, wins=0, loses=0, draws=0, goal_difference=0)
+            for name in ("Juventus", "Inter", "Milan")
+        ]
+        self.next_day = date(2024, 8, 1)
+
+    def play(self, home, away, home_score, away_score, day=None):
+        """A match of self.teams[home] vs self.teams[away] on the next (or the given) calendar day"""
+        if day is None:
+            day = self.next_day
+            self.next_day += timedelta(days=1)
+        event = Calendar.objects.create(event_date=day)
+        with self.captureOnCommitCallbacks(execute=True):
+            return Match.objects.create(
+                match_id=(Match.objects.aggregate(last=Max('match_id'))['last'] or 0) + 1,
+                home_team=self.teams[home], away_team=self.teams[away],
+                home_team_score=home_score, away_team_score=away_score, event=event,
+            )
+
+
+class HeadToHeadTests(MatchMixin, ApiUserMixin, TestCase):
+
+    def get(self, **params):
+        return self.client.get('/api/match/head-to-head/', params)
+
+    def test_summary_and_recent_matches(self):
+        first = self.play(0, 1, 2, 0)
+        second = self.play(1, 0, 1, 1)
+        third = self.play(1, 0, 3, 1)
+        self.play(0, 2, 5, 0)
+
+        response = self.get(team_a=self.teams[0].pk, team_b=self.teams[1].pk)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['summary'], {
+            'played': 3, 'team_a_wins': 1, 'team_b_wins': 1, 'draws': 1,
+            'team_a_goals': 4, 'team_b_goals': 4,
+        })
+        self.assertEqual([match['match_id'] for match in response.json()['matches']],
+                         [third.pk, second.pk, first.pk])
+
+        response = self.get(team_a=self.teams[0].pk, team_b=self.teams[1].pk, limit=1)
+        self.assertEqual([match['match_id'] for match in response.json()['matches']], [third.pk])
+
+    def test_never_played(self):
+        response = self.get(team_a=self.teams[1].pk, team_b=self.teams[2].pk)
+        self.assertEqual(response.json()['summary'], {
+            'played': 0, 'team_a_wins': 0, 'team_b_wins': 0, 'draws': 0,
+            'team_a_goals': 0, 'team_b_goals': 0,
+        })
+        self.assertEqual(response.json()['matches'], [])
+
+    def test_bad_parameters(self):
+        a, b = self.teams[0].pk, self.teams[1].pk
+        for params in ({}, {'team_a': a}, {'team_a': a, 'team_b': 'x'}, {'team_a': a, 'team_b': a},
+                       {'team_a': a, 'team_b': b, 'limit': -1}, {'team_a': a, 'team_b': b, 'limit': 'x'}):
+            with self.subTest(params=params):
+                self.assertEqual(self.get(**params).status_code, 400)
+        self.assertEqual(self.get(team_a=a, team_b=999999).status_code, 404)
+
+
+class TeamFormTests(MatchMixin, ApiUserMixin, TestCase):
+
+    def form(self, team):
+        return TeamForm.objects.get(team=self.teams[team])
+
+    def test_recomputed_after_save_and_delete(self):
+        self.play(0, 1, 2, 0)
+        match = self.play(1, 0, 1, 1)
+        self.assertEqual(self.form(0).results, 'DW')
+        self.assertEqual(self.form(1).results, 'DL')
+
+        match.away_team_score = 3
+        with self.captureOnCommitCallbacks(execute=True):
+            match.save()
+        self.assertEqual(self.form(0).results, 'WW')
+        self.assertEqual((self.form(0).points, self.form(0).goals_for), (6, 5))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            match.delete()
+        self.assertEqual(self.form(0).results, 'W')
+        self.assertEqual(self.form(1).results, 'L')
+
+    def test_team_changing_sides(self):
+        match = self.play(0, 1, 1, 0)
+        match.away_team = self.teams[2]
+        with self.captureOnCommitCallbacks(execute=True):
+            match.save()
+        # Inter no longer played it
+        self.assertEqual(self.form(1).results, '')
+        self.assertEqual(self.form(2).results, 'L')
+
+    def test_newest_by_calendar_date(self):
+        self.play(0, 1, 1, 0, day=date(2024, 9, 1))
+        # Higher match_id, earlier date
+        self.play(0, 1, 0, 1, day=date(2024, 8, 1))
+        self.assertEqual(self.form(0).results, 'WL')
+        self.assertEqual(self.form(0).last_match_id, 1)
+
+    def test_api(self):
+        self.play(0, 1, 2, 0)
+        self.play(2, 0, 1, 1)
+        TeamForm.objects.filter(team=self.teams[2]).delete()
+        response = self.client.get('/api/match/form/')
+        self.assertEqual([(form['team_name'], form['results']) for form in response.json()],
+                         [("Juventus", 'DW'), ("Milan", 'D'), ("Inter", 'L')])
+
+        response = self.client.get('/api/match/form/', {'team': f"{self.teams[1].pk}"})
+        self.assertEqual([form['team_name'] for form in response.json()], ["Inter"])
+        self.assertEqual(self.client.get('/api/match/form/', {'team': 'x'}).status_code, 400)
+
+
+class FixturesTests(MatchMixin, ApiUserMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.matches = [
+            self.play(0, 1, 0, 0, day=date(2024, 8, 3)),
+            self.play(1, 2, 0, 0, day=date(2024, 8, 1)),
+            self.play(2, 0, 0, 0, day=date(2024, 8, 2)),
+            self.play(0, 2, 0, 0, day=date(2024, 8, 2)),
+            self.play(1, 0, 0, 0, day=date(2024, 8, 4)),
+        ]
+
+    def test_pages_follow_next(self):
+        url = '/api/calendar/fixtures/?date_from=2024-08-01&limit=2'
+        pages = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            pages.append([(match['event_date'], match['match_id']) for match in response.json()['results']])
+            url = response.json()['next']
+        # The page boundary falls between the two matches of 2024-08-02
+        ids = [match.pk for match in self.matches]
+        self.assertEqual(pages, [
+            [('2024-08-01', ids[1]), ('2024-08-02', ids[2])],
+            [('2024-08-02', ids[3]), ('2024-08-03', ids[0])],
+            [('2024-08-04', ids[4])],
+        ])
+
+    def test_date_range_and_team(self):
+        response = self.client.get('/api/calendar/fixtures/', {
+            'date_from': '2024-08-02', 'date_to': '2024-08-03', 'team': self.teams[1].pk,
+        })
+        self.assertEqual([match['match_id'] for match in response.json()['results']], [self.matches[0].pk])
+        self.assertIsNone(response.json()['next'])
+
+    def test_bad_parameters(self):
+        for params, error in [
+            ({}, "date_from is required (YYYY-MM-DD)"),
+            ({'date_from': '01.08.2024'}, "date_from must be a date (YYYY-MM-DD)"),
+            ({'date_from': '2024-02-30'}, "date_from must be a date (YYYY-MM-DD)"),
+            ({'date_from': '2024-08-01', 'team': 'x'}, "team must be an integer"),
+            ({'date_from': '2024-08-01', 'limit': '0'}, "limit must be positive"),
+            ({'date_from': '2024-08-01', 'after': '2024-08-02'}, "after must be YYYY-MM-DD:match_id"),
+            ({'date_from': '2024-08-01', 'after': '2024-08-02:x'}, "after must be YYYY-MM-DD:match_id"),
+            ({'date_from': '2024-08-01', 'after': 'x:3'}, "after must be YYYY-MM-DD:match_id"),
+        ]:
+            with self.subTest(params=params):
+                response = self.client.get('/api/calendar/fixtures/', params)
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json(), {'error': error})
+
+    def test_expanded_list_reads_matches_in_one_query(self):
+        # The events (with their stadiums), then the matches of all their dates
+        with self.assertNumQueries(2):
+            data = CalendarDetailSerializer(CalendarRepository().get_all().order_by('event_date'), many=True).data
+        matches = {event['event_date']: [match['match_id'] for match in event['matches_on_date']] for event in data}
+        self.assertEqual(matches['2024-08-02'], [self.matches[2].pk, self.matches[3].pk])
+
+        # Through the API: the session and the user, then the same two
+        with self.assertNumQueries(4):
+            response = self.client.get('/api/calendar/', {'expand': 'matches_on_date'})
+        self.assertEqual(len(response.json()), 5)
+
+
+class UpcomingEventsTests(ApiUserMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        seed_league(teams=3, players_per_team=1, matches=1, years=1, events=0)
+        self.stadiums = list(Stadium.objects.order_by('pk'))
+        today = timezone.localdate()
+        # Stadium 0: 7 future events in shuffled order and 2 past ones
+        for days in (6, 1, 7, 3, 0, 5, 2, -1, -30):
+            Calendar.objects.create(event_date=today + timedelta(days=days), event_stadium=self.stadiums[0])
+        # Stadium 1: one future event, stadium 2: none
+        Calendar.objects.create(event_date=today + timedelta(days=4), event_stadium=self.stadiums[1])
+        self.today = today
+
+    def test_first_events_of_each_stadium(self):
+        upcoming = upcoming_events([stadium.pk for stadium in self.stadiums], 5)
+        self.assertEqual(
+            [event['event_date'] for event in upcoming[self.stadiums[0].pk]],
+            [(self.today + timedelta(days=days)).isoformat() for days in (0, 1, 2, 3, 5)]
+        )
+        self.assertEqual(len(upcoming[self.stadiums[1].pk]), 1)
+        self.assertNotIn(self.stadiums[2].pk, upcoming)
+
+    def test_stadium_list_is_not_a_query_per_stadium(self):
+        queryset = StadiumRepository().get_all().order_by('pk')
+        # The stadiums (with their teams), then the events of all of them
+        with self.assertNumQueries(2):
+            data = StadiumDetailSerializer(queryset, many=True).data
+        self.assertEqual([len(stadium['upcoming_matches']) for stadium in data], [5, 1, 0])
+        self.assertTrue(all(
+            event['event_date'] >= self.today.isoformat() for stadium in data for event in stadium['upcoming_matches']
+        ))
+
+        response = self.client.get('/api/stadium/', {'expand': 'upcoming_matches'})
+        self.assertEqual([len(stadium['upcoming_matches']) for stadium in response.json()], [5, 1, 0])
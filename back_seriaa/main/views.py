@@ -5,6 +5,7 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from django.shortcuts import render, get_object_or_404, redirect
+from django.utils.dateparse import parse_date
 
 from .models import (
     Team, Coach, Stadium, Calendar, 
@@ -16,11 +17,13 @@ from .serializers import (
     StadiumBaseSerializer, StadiumDetailSerializer, StadiumCreateSerializer,
     CalendarBaseSerializer, CalendarDetailSerializer, CalendarCreateSerializer,
     HistoryBaseSerializer, HistoryDetailSerializer, HistoryCreateSerializer,
-    MatchBaseSerializer, MatchDetailSerializer, MatchCreateSerializer,
+    MatchBaseSerializer, MatchDetailSerializer, MatchCreateSerializer, TeamFormSerializer,
     PlayerDetailedBaseSerializer, PlayerDetailedDetailSerializer, PlayerDetailedCreateSerializer,
     PlayerTechnicalBaseSerializer, PlayerTechnicalDetailSerializer, PlayerTechnicalCreateSerializer
 )
 
+from .fast_serializers import ValuesSerializer
+from .sparse_fields import query_names, selected_fields, trim
 from .repositories.team_repository import TeamRepository
 from .repositories.coach_repository import CoachRepository
 from .repositories.stadium_repository import StadiumRepository
@@ -29,6 +32,9 @@ from .repositories.history_repository import HistoryRepository
 from .repositories.match_repository import MatchRepository
 from .repositories.player_detailed_repository import PlayerDetailedRepository
 from .repositories.player_technical_repository import PlayerTechnicalRepository
+from .repositories.team_form_repository import TeamFormRepository
+from .repositories.cache import cache_alias, cache_stats, caching_enabled
+from . import score_ingest, search, stat_counters
 
 # main/views.py
 from rest_framework import viewsets, status
@@ -45,6 +51,9 @@ class BaseViewSet(viewsets.ModelViewSet):
     detail_serializer_class = None  
     create_serializer_class = None
     repository_class = None
+    # Build list rows straight from values_list() when the base serializer allows it
+    # (main/fast_serializers.py)
+    fast_list = True
     
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -65,12 +74,54 @@ class BaseViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         return self.repo.get_all()
 
+    def filter_queryset(self, queryset):
+        # ?<field>=, ?ordering=, ?search= declared by the repository
+        return self.repo.filter(super().filter_queryset(queryset), self.request.query_params)
+
+    def list(self, request, *args, **kwargs):
+        # ?expand= needs the method fields of the detail serializer
+        if query_names(request, 'expand'):
+            serializer_class = self.detail_serializer_class
+        else:
+            serializer_class = self.base_serializer_class
+        try:
+            keep = selected_fields(request, serializer_class)
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=400)
+
+        try:
+            queryset = self.filter_queryset(self.get_queryset())
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=400)
+
+        # Fast path: rows from values_list() instead of model instances
+        fast = ValuesSerializer.for_serializer(serializer_class, keep) if self.fast_list else None
+        if fast is not None:
+            page = self.paginate_queryset(fast.rows(queryset))
+            if page is not None:
+                return self.get_paginated_response(fast.build(page))
+            return Response(fast.serialize(queryset))
+
+        page = self.paginate_queryset(queryset)
+        serializer = serializer_class(
+            page if page is not None else queryset, many=True, context=self.get_serializer_context()
+        )
+        data = trim(serializer, keep).data
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
+
     def retrieve(self, request, pk=None):
+        try:
+            keep = selected_fields(request, self.detail_serializer_class)
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=400)
+
         item = self.repo.get_by_id(pk)
         if not item:
             return Response({"error": "Item not found"}, status=404)
         serializer = self.get_serializer(item)
-        return Response(serializer.data)
+        return Response(trim(serializer, keep).data)
 
     def create(self, request):
         serializer = self.get_serializer(data=request.data)
@@ -79,14 +130,14 @@ class BaseViewSet(viewsets.ModelViewSet):
             return Response(self.base_serializer_class(item).data, status=201)
         return Response(serializer.errors, status=400)
 
-    def update(self, request, pk=None):
+    def update(self, request, pk=None, partial=False):
         item = self.repo.get_by_id(pk)
         if not item:
             return Response({"error": "Item not found"}, status=404)
         
-        serializer = self.get_serializer(item, data=request.data)
+        serializer = self.get_serializer(item, data=request.data, partial=partial)
         if serializer.is_valid():
-            updated_item = self.repo.update(pk, serializer.validated_data)
+            updated_item = self.repo.update(pk, **serializer.validated_data)
             return Response(self.base_serializer_class(updated_item).data)
         return Response(serializer.errors, status=400)
 
@@ -128,6 +179,80 @@ class CalendarViewSet(BaseViewSet):
     repository_class = CalendarRepository
     queryset = Calendar.objects.all()  
 
+    default_fixtures_limit = 100
+    max_fixtures_limit = 1000
+
+    @action(detail=False, methods=['get'])
+    def fixtures(self, request):
+        """
+        Matches from ?date_from= (to ?date_to=, of ?team=) by date; ?limit=
+        per page, "next" continues after the last match of the page
+        """
+        params = request.query_params
+        try:
+            date_from = self.parse_date_param(params, 'date_from', required=True)
+            date_to = self.parse_date_param(params, 'date_to')
+            team = self.parse_int_param(params, 'team')
+            limit = self.parse_int_param(params, 'limit')
+            after = self.parse_after_param(params)
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=400)
+        if limit is None:
+            limit = self.default_fixtures_limit
+        limit = min(limit, self.max_fixtures_limit)
+        if limit < 1:
+            return Response({"error": "limit must be positive"}, status=400)
+
+        queryset = MatchRepository().fixtures(date_from, date_to, team, after)[:limit]
+        fast = ValuesSerializer.for_serializer(MatchBaseSerializer)
+        results = fast.serialize(queryset) if fast is not None else MatchBaseSerializer(queryset, many=True).data
+
+        next_url = None
+        if len(results) == limit:
+            last = results[-1]
+            query = params.copy()
+            query['after'] = f"{last['event_date']}:{last['match_id']}"
+            next_url = request.build_absolute_uri(f"{request.path}?{query.urlencode()}")
+        return Response({"results": results, "next": next_url})
+
+    @staticmethod
+    def parse_date_param(params, name, required=False):
+        value = params.get(name)
+        if not value:
+            if required:
+                raise ValueError(f"{name} is required (YYYY-MM-DD)")
+            return None
+        try:
+            parsed = parse_date(value)
+        except ValueError:
+            # Well formed but not a real date, e.g. 2024-02-30
+            parsed = None
+        if parsed is None:
+            raise ValueError(f"{name} must be a date (YYYY-MM-DD)")
+        return parsed
+
+    @staticmethod
+    def parse_int_param(params, name):
+        value = params.get(name)
+        if not value:
+            return None
+        try:
+            return int(value)
+        except ValueError:
+            raise ValueError(f"{name} must be an integer") from None
+
+    @classmethod
+    def parse_after_param(cls, params):
+        """(event date, match_id) from ?after=YYYY-MM-DD:match_id (the "next" link)"""
+        value = params.get('after')
+        if not value:
+            return None
+        after_date, _, after_id = value.partition(':')
+        try:
+            return cls.parse_date_param({'after': after_date}, 'after', required=True), int(after_id)
+        except ValueError:
+            raise ValueError("after must be YYYY-MM-DD:match_id") from None
+
 # History ViewSet
 class HistoryViewSet(BaseViewSet):
     base_serializer_class = HistoryBaseSerializer
@@ -144,6 +269,56 @@ class MatchViewSet(BaseViewSet):
     repository_class = MatchRepository
     queryset = Match.objects.all()  
 
+    # Matches returned by head-to-head
+    default_h2h_limit = 10
+    max_h2h_limit = 50
+
+    @action(detail=False, methods=['get'], url_path='head-to-head')
+    def head_to_head(self, request):
+        """Totals and last matches of ?team_a= vs ?team_b= (&limit=)"""
+        try:
+            team_a = int(request.query_params['team_a'])
+            team_b = int(request.query_params['team_b'])
+        except (KeyError, ValueError):
+            return Response({"error": "team_a and team_b must be team ids"}, status=400)
+        if team_a == team_b:
+            return Response({"error": "team_a and team_b must be different teams"}, status=400)
+        try:
+            limit = min(int(request.query_params.get('limit', self.default_h2h_limit)), self.max_h2h_limit)
+        except ValueError:
+            return Response({"error": "limit must be an integer"}, status=400)
+        if limit < 1:
+            return Response({"error": "limit must be positive"}, status=400)
+        if Team.objects.filter(pk__in=[team_a, team_b]).count() != 2:
+            return Response({"error": "Team not found"}, status=404)
+
+        return Response({
+            "team_a": team_a,
+            "team_b": team_b,
+            "summary": self.repo.head_to_head(team_a, team_b),
+            "matches": MatchBaseSerializer(self.repo.recent_between(team_a, team_b, limit), many=True).data,
+        })
+
+    @action(detail=False, methods=['post'])
+    def scores(self, request):
+        """Batched live score events with idempotency keys (main/score_ingest.py)"""
+        try:
+            result = score_ingest.ingest(request.data)
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=400)
+        return Response(result)
+
+    @action(detail=False, methods=['get'])
+    def form(self, request):
+        """Form over the last matches of every team, or of ?team=1,2"""
+        teams = query_names(request, 'team')
+        try:
+            team_ids = {int(team) for team in teams} if teams is not None else None
+        except ValueError:
+            return Response({"error": "team must be a comma-separated list of team ids"}, status=400)
+        forms = TeamFormRepository().for_teams(team_ids)
+        return Response(TeamFormSerializer(forms, many=True).data)
+
 # PlayerDetailed ViewSet
 class PlayerDetailedViewSet(BaseViewSet):
     base_serializer_class = PlayerDetailedBaseSerializer
@@ -160,6 +335,19 @@ class PlayerTechnicalViewSet(BaseViewSet):
     repository_class = PlayerTechnicalRepository
     queryset = PlayerTechnical.objects.all()  
 
+    @action(detail=True, methods=['post'])
+    def increment(self, request, pk=None):
+        """Add to goal_scored / assist_scored, written behind (main/stat_counters.py)"""
+        try:
+            goals, assists = stat_counters.parse_increment(request.data)
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=400)
+        if not self.repo.get_all().filter(pk=pk).exists():
+            return Response({"error": "Item not found"}, status=404)
+        player_id = int(pk)
+        stat_counters.buffer.increment(player_id, goals, assists)
+        return Response({"player_id": player_id, "queued": stat_counters.buffer.queued(player_id)}, status=202)
+
 class ReportViewSet(viewsets.ViewSet):
     
     queryset = Team.objects.all()
@@ -167,7 +355,7 @@ class ReportViewSet(viewsets.ViewSet):
     def list(self, request):
         return Response({
             "message": "Використовуй /api/report/simple-stats/ для звіту",
-            "available_actions": ["simple-stats"]
+            "available_actions": ["simple-stats", "cache-stats"]
         })
     
     @action(detail=False, methods=['get'])
@@ -189,6 +377,47 @@ class ReportViewSet(viewsets.ViewSet):
             "total_records": sum(repo.get_all().count() for repo in repos.values())
         }
         return Response(report)
+
+    @action(detail=False, methods=['get'], url_path='cache-stats')
+    def cache_stats(self, request):
+        """Хіти / промахи кешу репозиторіїв у цьому процесі"""
+        return Response({
+            "cache": cache_alias(),
+            "enabled": caching_enabled(),
+            "models": cache_stats(),
+        })
+
+
+
+class SearchAPI(APIView):
+    """Ranked team / player search: /api/search/?q=del pi&types=player&limit=10"""
+
+    default_limit = 10
+    max_limit = 50
+
+    def get(self, request):
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response({"error": "Query parameter q is required"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = min(int(request.query_params.get('limit', self.default_limit)), self.max_limit)
+        except ValueError:
+            return Response({"error": "limit must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+        if limit < 1:
+            return Response({"error": "limit must be positive"}, status=status.HTTP_400_BAD_REQUEST)
+
+        types = query_names(request, 'types')
+        labels = {label for _, label, _ in search.SEARCH_MODELS}
+        if types and types - labels:
+            return Response(
+                {"error": f"Unknown types: {', '.join(sorted(types - labels))}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        return Response({
+            "query": query,
+            "results": search.search(query, limit, types),
+        })
     
     
 def teams_list(request):
@@ -0,0 +1,64 @@
+"""
+Cache settings for seriaa, driven by environment variables.
+
+CACHES['repositories'] holds rows cached by the repositories
+(main/repositories/cache.py). SERIAA_CACHE_BACKEND picks the backend:
+
+* locmem (default) - per-process memory, nothing to run. Each worker
+  process would have its own copy, invalidated by its own writes only,
+  so the repositories don't cache rows in it unless
+  REPOSITORY_CACHE_LOCAL = True (a single-process server).
+
+* file - pickled files under SERIAA_CACHE_LOCATION (default
+  BASE_DIR/cache/repositories), shared by all processes on one host.
+
+* redis - Django's RedisCache at SERIAA_CACHE_LOCATION (default
+  redis://127.0.0.1:6379/1), shared by every host; works with any
+  Redis-protocol server (Redis, Valkey, KeyDB). Needs the redis package;
+  without it the locmem stand-in is used and a warning is printed.
+
+Variables: SERIAA_CACHE_BACKEND, SERIAA_CACHE_LOCATION,
+SERIAA_CACHE_MAX_ENTRIES.
+"""
+import importlib.util
+import os
+import warnings
+
+
+BACKENDS = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+    'redis': 'django.core.cache.backends.redis.RedisCache',
+}
+
+
+def redis_available():
+    return importlib.util.find_spec('redis') is not None
+
+
+def cache_settings(base_dir, env=os.environ):
+    """CACHES['repositories'] for SERIAA_CACHE_BACKEND"""
+    backend = env.get('SERIAA_CACHE_BACKEND', 'locmem').lower()
+    if backend not in BACKENDS:
+        raise ValueError(f"SERIAA_CACHE_BACKEND must be one of {tuple(BACKENDS)}, got {backend!r}")
+
+    if backend == 'redis' and not redis_available():
+        warnings.warn("SERIAA_CACHE_BACKEND=redis but the redis package is not installed, using locmem")
+        backend = 'locmem'
+
+    cache = {
+        'BACKEND': BACKENDS[backend],
+        'KEY_PREFIX': 'seriaa',
+        'TIMEOUT': 300,
+    }
+    if backend == 'locmem':
+        cache['LOCATION'] = 'seriaa-repositories'
+    elif backend == 'file':
+        cache['LOCATION'] = env.get('SERIAA_CACHE_LOCATION', str(base_dir / 'cache' / 'repositories'))
+    else:
+        cache['LOCATION'] = env.get('SERIAA_CACHE_LOCATION', 'redis://127.0.0.1:6379/1')
+
+    if backend != 'redis':
+        # Redis evicts by its own maxmemory policy
+        cache['OPTIONS'] = {'MAX_ENTRIES': int(env.get('SERIAA_CACHE_MAX_ENTRIES') or 10000)}
+    return cache
@@ -0,0 +1,107 @@
+"""
+Read replica routing.
+
+ReplicaRoutingMiddleware marks safe (GET/HEAD/OPTIONS) requests under
+REPLICA_READ_PATHS - the dashboard and the /api/ list/retrieve endpoints -
+and ReplicaRouter sends their reads of the league and dashboard tables to
+the REPLICA_DATABASE alias. Everything else reads from 'default', and all
+writes go to 'default'.
+
+Read-your-writes: any unsafe request (POST/PUT/PATCH/DELETE) sets a short
+cookie that pins the same client to 'default' for REPLICA_STICKY_SECONDS,
+long enough for the replica to catch up with what it just wrote. Clients
+that keep no cookies (scripts, the score feed, mobile apps without a
+cookie jar) get no such guarantee from the cookie: they send
+X-Pin-Primary: 1 on the reads that must see their own writes.
+
+Without a replica alias in DATABASES the router does nothing.
+"""
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+# Apps whose tables are replicated and safe to read with a small lag;
+# auth and sessions always use 'default'
+REPLICA_APPS = {'main', 'dashboard'}
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+PIN_COOKIE = 'seriaa_pin_primary'
+# Same as the cookie, for clients without a cookie jar
+PIN_HEADER = 'X-Pin-Primary'
+
+_read_from_replica = ContextVar('seriaa_read_from_replica', default=False)
+
+
+def replica_alias():
+    """Configured replica alias, or None if there is no such database"""
+    alias = getattr(settings, 'REPLICA_DATABASE', 'replica')
+    return alias if alias in connections.databases else None
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label not in REPLICA_APPS or not _read_from_replica.get():
+            return None
+        return replica_alias()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same rows as 'default'
+        databases = {DEFAULT_DB_ALIAS, replica_alias()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    """Turns replica reads on for the request and sets the sticky cookie"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def use_replica(self, request):
+        if request.method not in SAFE_METHODS or PIN_COOKIE in request.COOKIES:
+            return False
+        if request.headers.get(PIN_HEADER, '0') not in ('', '0'):
+            return False
+        paths = getattr(settings, 'REPLICA_READ_PATHS', ('/api/', '/dashboard/'))
+        return request.path_info.startswith(tuple(paths))
+
+    def process_response(self, request, response):
+        if request.method not in SAFE_METHODS:
+            response.set_cookie(
+                PIN_COOKIE, '1',
+                max_age=getattr(settings, 'REPLICA_STICKY_SECONDS', 5),
+                httponly=True, samesite='Lax'
+            )
+        return response
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = _read_from_replica.set(self.use_replica(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            _read_from_replica.reset(token)
+        return self.process_response(request, response)
+
+    async def __acall__(self, request):
+        token = _read_from_replica.set(self.use_replica(request))
+        try:
+            response = await self.get_response(request)
+        finally:
+            _read_from_replica.reset(token)
+        return self.process_response(request, response)
@@ -0,0 +1,133 @@
+"""
+Database settings for seriaa, driven by environment variables.
+
+Connection reuse depends on how the project is served (SERIAA_SERVER_MODE):
+
+* wsgi (default) - gunicorn/uwsgi sync or gthread workers. Each worker
+  thread keeps its own persistent connection (CONN_MAX_AGE) and checks it
+  with CONN_HEALTH_CHECKS before reuse, so a request no longer pays the
+  TCP + auth handshake. The DB sees one connection per worker thread
+  (workers x threads in total); keep max_connections above that.
+
+* asgi - uvicorn/daphne. Sync ORM code runs in asgiref's thread pool,
+  where thread-local persistent connections are not cleaned up reliably,
+  so Django's persistent connections are switched off. If
+  django-db-connection-pool is installed, a SQLAlchemy QueuePool of
+  SERIAA_DB_POOL_SIZE (+ SERIAA_DB_POOL_OVERFLOW) connections per process
+  is used instead; otherwise put a pooler (ProxySQL, MySQL Router) in
+  front of the database.
+
+SERIAA_DB_ENGINE=sqlite switches to a local SQLite file (development,
+benchmarks) with the same connection policy.
+
+A read replica (seriaa/db_router.py) is added as the 'replica' alias when
+SERIAA_DB_REPLICA_HOST (MySQL) or SERIAA_DB_REPLICA_NAME (SQLite) is set;
+it inherits everything else from 'default'.
+
+Variables: SERIAA_DB_ENGINE, SERIAA_DB_NAME, SERIAA_DB_USER,
+SERIAA_DB_PASSWORD, SERIAA_DB_HOST, SERIAA_DB_PORT, SERIAA_SERVER_MODE,
+SERIAA_DB_CONN_MAX_AGE, SERIAA_DB_POOL_SIZE,
+SERIAA_DB_POOL_OVERFLOW, SERIAA_DB_POOL_RECYCLE, SERIAA_DB_CONNECT_TIMEOUT,
+SERIAA_DB_REPLICA_HOST, SERIAA_DB_REPLICA_PORT, SERIAA_DB_REPLICA_NAME,
+SERIAA_DB_REPLICA_USER, SERIAA_DB_REPLICA_PASSWORD.
+"""
+import importlib.util
+import os
+
+
+SERVER_MODES = ('wsgi', 'asgi')
+
+# Persistent connections live this long (seconds) in WSGI mode, well below
+# MySQL's default wait_timeout (8 h) so the server never drops them first
+DEFAULT_CONN_MAX_AGE = 300
+
+ENGINES = {
+    'mysql': 'django.db.backends.mysql',
+    'sqlite': 'django.db.backends.sqlite3',
+}
+
+# django-db-connection-pool backends (ASGI mode, if installed)
+POOL_ENGINES = {
+    'mysql': 'dj_db_conn_pool.backends.mysql',
+    'sqlite': None,
+}
+
+
+def env_int(env, name, default):
+    value = env.get(name)
+    return int(value) if value not in (None, '') else default
+
+
+def server_mode(env=os.environ):
+    mode = env.get('SERIAA_SERVER_MODE', 'wsgi').lower()
+    if mode not in SERVER_MODES:
+        raise ValueError(f"SERIAA_SERVER_MODE must be one of {SERVER_MODES}, got {mode!r}")
+    return mode
+
+
+def pool_available():
+    return importlib.util.find_spec('dj_db_conn_pool') is not None
+
+
+def database_settings(base_dir, env=os.environ):
+    """DATABASES['default'] for the current engine and server mode"""
+    engine = env.get('SERIAA_DB_ENGINE', 'mysql').lower()
+    if engine not in ENGINES:
+        raise ValueError(f"SERIAA_DB_ENGINE must be one of {tuple(ENGINES)}, got {engine!r}")
+    mode = server_mode(env)
+
+    if engine == 'sqlite':
+        database = {
+            'ENGINE': ENGINES[engine],
+            'NAME': env.get('SERIAA_DB_NAME', str(base_dir / 'db.sqlite3')),
+        }
+    else:
+        database = {
+            'ENGINE': ENGINES[engine],
+            'NAME': env.get('SERIAA_DB_NAME', 'seriaa'),
+            'USER': env.get('SERIAA_DB_USER', 'Roman'),
+            'PASSWORD': env.get('SERIAA_DB_PASSWORD', 'FlatBuddy'),
+            'HOST': env.get('SERIAA_DB_HOST', 'localhost'),
+            'PORT': env.get('SERIAA_DB_PORT', '3306'),
+            'OPTIONS': {
+                'connect_timeout': env_int(env, 'SERIAA_DB_CONNECT_TIMEOUT', 5),
+            },
+        }
+
+    if mode == 'wsgi':
+        database['CONN_MAX_AGE'] = env_int(env, 'SERIAA_DB_CONN_MAX_AGE', DEFAULT_CONN_MAX_AGE)
+        database['CONN_HEALTH_CHECKS'] = database['CONN_MAX_AGE'] != 0
+        return database
+
+    # ASGI: no thread-local persistent connections
+    database['CONN_MAX_AGE'] = 0
+    database['CONN_HEALTH_CHECKS'] = False
+    if POOL_ENGINES[engine] and pool_available():
+        database['ENGINE'] = POOL_ENGINES[engine]
+        # Sync ORM calls share asgiref's executor, so at most that many
+        # connections are in use at once
+        pool_size = env_int(env, 'SERIAA_DB_POOL_SIZE', env_int(env, 'ASGI_THREADS', 10))
+        database['POOL_OPTIONS'] = {
+            'POOL_SIZE': pool_size,
+            'MAX_OVERFLOW': env_int(env, 'SERIAA_DB_POOL_OVERFLOW', pool_size // 2),
+            'RECYCLE': env_int(env, 'SERIAA_DB_POOL_RECYCLE', DEFAULT_CONN_MAX_AGE),
+            'PRE_PING': True,
+        }
+    return database
+
+
+def replica_settings(base_dir, env=os.environ):
+    """DATABASES['replica'] or None if no replica is configured"""
+    overrides = {
+        key: env[f'SERIAA_DB_REPLICA_{key}']
+        for key in ('HOST', 'PORT', 'NAME', 'USER', 'PASSWORD')
+        if env.get(f'SERIAA_DB_REPLICA_{key}')
+    }
+    if not ({'HOST', 'NAME'} & overrides.keys()):
+        return None
+
+    database = database_settings(base_dir, env)
+    database.update(overrides)
+    # Tests run against a single database: the replica mirrors 'default'
+    database['TEST'] = {'MIRROR': 'default'}
+    return database
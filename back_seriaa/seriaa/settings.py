@@ -12,6 +12,9 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 
 from pathlib import Path
 
+from .cache_settings import cache_settings
+from .db_settings import database_settings, replica_settings
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -44,10 +47,13 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'seriaa.db_router.ReplicaRoutingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    # ?profile=1 для staff - розклад часу запиту (dashboard/profiling.py)
+    'dashboard.profiling.ProfilingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -76,16 +82,40 @@ WSGI_APPLICATION = 'seriaa.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
+# MySQL (або SQLite через SERIAA_DB_ENGINE=sqlite); постійні з'єднання /
+# пул залежно від SERIAA_SERVER_MODE=wsgi|asgi - див. seriaa/db_settings.py
 DATABASES = {
+    'default': database_settings(BASE_DIR),
+}
+
+# Репліка для читання (SERIAA_DB_REPLICA_HOST / SERIAA_DB_REPLICA_NAME):
+# дашборд і GET /api/* читають з неї, запис - завжди в 'default'
+_replica = replica_settings(BASE_DIR)
+if _replica:
+    DATABASES['replica'] = _replica
+
+DATABASE_ROUTERS = ['seriaa.db_router.ReplicaRouter']
+REPLICA_DATABASE = 'replica'
+REPLICA_READ_PATHS = ('/api/', '/dashboard/')
+# Після запису клієнт читає з 'default' стільки секунд (read-your-writes)
+REPLICA_STICKY_SECONDS = 5
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+# 'repositories' - кеш get_by_id репозиторіїв (locmem / file / redis через
+# SERIAA_CACHE_BACKEND) - див. seriaa/cache_settings.py
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.mysql',   # або 'sqlite3' / 'postgresql'
-        'NAME': 'seriaa',                       # назва бази даних
-        'USER': 'Roman',                        # користувач БД
-        'PASSWORD': 'FlatBuddy',              # пароль
-        'HOST': 'localhost',                    # або IP сервера
-        'PORT': '3306',                         # MySQL порт (5432 для PostgreSQL)
-    }
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'repositories': cache_settings(BASE_DIR),
 }
+REPOSITORY_CACHE_ALIAS = 'repositories'
+# locmem - окрема копія в кожному процесі: репозиторії кешують лише в
+# спільному кеші (file / redis). True - кешувати й у locmem (один процес)
+REPOSITORY_CACHE_LOCAL = False
 
 
 
@@ -124,6 +154,30 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/4.2/howto/static-files/
 
 STATIC_URL = 'static/'
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+
+STATICFILES_FINDERS = [
+    'django.contrib.staticfiles.finders.FileSystemFinder',
+    'django.contrib.staticfiles.finders.AppDirectoriesFinder',
+    # plotly.js / BokehJS з встановлених пакетів (dashboard/vendor/*)
+    'dashboard.staticfiles.VendorFinder',
+]
+
+# ?profile=1 / ?profile=cprofile для staff (dashboard/profiling.py);
+# False вимикає профілювання для всіх
+DASHBOARD_PROFILING = True
+
+# Знімок таблиць ліги для офлайн-аналітики (manage.py export_league_snapshot)
+LEAGUE_SNAPSHOT_DIR = BASE_DIR / 'league_snapshot'
+
+# Прирости goal_scored / assist_scored пишуться в журнал і раз на
+# STAT_COUNTERS_FLUSH_INTERVAL секунд - у БД (main/stat_counters.py)
+STAT_COUNTERS_LOG_DIR = BASE_DIR / 'stat_counters'
+STAT_COUNTERS_FLUSH_INTERVAL = 1.0
+
+# Скільки секунд запис рахунків чекає на інші запити, щоб застосувати
+# їх однією транзакцією (main/score_ingest.py)
+SCORE_INGEST_WINDOW = 0.01
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
@@ -131,9 +185,14 @@ STATIC_URL = 'static/'
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
+    # JSON через orjson (main/renderers.py); Browsable API - лише з DEBUG
     "DEFAULT_RENDERER_CLASSES": [
-        "rest_framework.renderers.JSONRenderer",
-        "rest_framework.renderers.BrowsableAPIRenderer",
+        "main.renderers.ORJSONRenderer",
+    ] + (["rest_framework.renderers.BrowsableAPIRenderer"] if DEBUG else []),
+    "DEFAULT_PARSER_CLASSES": [
+        "main.renderers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework.authentication.BasicAuthentication',
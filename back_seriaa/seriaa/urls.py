@@ -1,7 +1,7 @@
 from django.contrib import admin
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from main import views
+from main import views, async_views
 
 from django.urls import path, include
 
@@ -18,7 +18,20 @@ router.register(r'report', views.ReportViewSet, basename='report')
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('api/search/', views.SearchAPI.as_view(), name='search'),
     path('api/', include(router.urls)),
+
+    # Async-native read paths (ASGI)
+    path('api/async/teams/', async_views.AsyncTeamView.as_view(), name='async_team_list'),
+    path('api/async/teams/<int:pk>/', async_views.AsyncTeamView.as_view(), name='async_team_detail'),
+    path('api/async/match/', async_views.AsyncMatchView.as_view(), name='async_match_list'),
+    path('api/async/match/<int:pk>/', async_views.AsyncMatchView.as_view(), name='async_match_detail'),
+    path('api/async/player-technical/', async_views.AsyncPlayerTechnicalView.as_view(),
+         name='async_player_technical_list'),
+    path('api/async/player-technical/<int:pk>/', async_views.AsyncPlayerTechnicalView.as_view(),
+         name='async_player_technical_detail'),
+    path('api/async/stream/', async_views.LiveStreamView.as_view(), name='live_stream'),
+
     path('teams/', views.teams_list, name='teams_list'),
     path('teams/<int:team_id>/', views.teams_detailed, name='teams_detailed'),
     path('teams/<int:team_id>/delete/', views.teams_delete, name='teams_delete'),